@@ -0,0 +1,85 @@
+"""Guard the cold-start import budget of the home page.
+
+Imports the same support modules as home.py in a fresh interpreter with
+``python -X importtime`` and fails when the total exceeds the budget or when a
+heavy dependency that should load lazily is pulled in.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_import_time [--budget-ms 2500]
+"""
+import argparse
+import subprocess
+import sys
+
+# Modules imported by home.py
+HOME_IMPORTS = [
+    "streamlit",
+    "support.submission_manager",
+    "support.html_builder",
+    "support.session_ui",
+    "support.file_manager",
+    "support.config_manager",
+]
+
+# Dependencies that must only be imported on first use
+LAZY_MODULES = [
+    "weasyprint",
+    "langchain_openai",
+    "langchain_google_genai",
+    "markitdown",
+]
+
+DEFAULT_BUDGET_MS = 2500
+
+
+def measure_imports(modules):
+    """Return {top level module: cumulative import time in us} and all imported names"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {', '.join(modules)}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    top_level = {}
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented by two spaces per level after the bar
+        imported.add(name.strip())
+        if not name[1:].startswith(" "):
+            top_level[name.strip()] = int(cumulative)
+    return top_level, imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    args = parser.parse_args()
+
+    top_level, imported = measure_imports(HOME_IMPORTS)
+    total_ms = sum(top_level.values()) / 1000
+
+    for name, cumulative in sorted(top_level.items(), key=lambda item: -item[1])[:10]:
+        print(f"{name:<40}{cumulative / 1000:>10.1f} ms")
+    print(f"{'total':<40}{total_ms:>10.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    failures = []
+    eager = [name for name in LAZY_MODULES if name in imported]
+    if eager:
+        failures.append(f"heavy modules imported at startup: {', '.join(eager)}")
+    if total_ms > args.budget_ms:
+        failures.append(f"cold start {total_ms:.0f} ms exceeds budget {args.budget_ms:.0f} ms")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ Home page import budget respected")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Measure the local job title/company extractor on a corpus of sample job descriptions.
+
+Reports how often the local path is confident enough to skip the LLM call,
+how accurate it is when it does, and the tokens and latency that saves.
+Run from the repository root:
+
+    python -m benchmarks.bench_jd_extraction --llm-latency-ms 800
+"""
+import argparse
+import json
+import timeit
+
+from support.jd_extractor import extract_jd_information
+from support.settings import jd_local_confidence_threshold
+from support.supportLLM import system_prompt_jd_extraction
+
+SAMPLES_PATH = "benchmarks/data/jd_samples.jsonl"
+ITERATIONS = 200
+# Rough size of the structured JobDescriptionInformation answer
+OUTPUT_TOKENS = 30
+
+
+def load_samples(path=SAMPLES_PATH):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def estimate_tokens(text):
+    """About four characters per token for English text"""
+    return len(text) // 4
+
+
+def llm_prompt_tokens(job_description):
+    """Tokens of the JD extraction prompt the extractor would send"""
+    user_message = f"""
+            This is the Job Description:
+            [JOB DESCRIPTION]
+            {job_description}
+            [END JOB DESCRIPTION]
+        """
+    return estimate_tokens(system_prompt_jd_extraction) + estimate_tokens(user_message)
+
+
+def same_value(found, expected):
+    return (found or "").strip().lower() == (expected or "").strip().lower()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", default=SAMPLES_PATH)
+    parser.add_argument("--threshold", type=float, default=jd_local_confidence_threshold)
+    parser.add_argument("--llm-latency-ms", type=float, default=800.0,
+                        help="Typical latency of the LLM JD extraction call")
+    args = parser.parse_args()
+
+    samples = load_samples(args.samples)
+    hits = correct = 0
+    saved_tokens = 0
+    misses = []
+    for sample in samples:
+        job_title, company_name, confidence = extract_jd_information(sample["job_description"])
+        if confidence < args.threshold:
+            continue
+        hits += 1
+        saved_tokens += llm_prompt_tokens(sample["job_description"]) + OUTPUT_TOKENS
+        if same_value(job_title, sample["job_title"]) and same_value(company_name, sample["company_name"]):
+            correct += 1
+        else:
+            misses.append((sample["job_title"], sample["company_name"], job_title, company_name))
+
+    local_ms = min(timeit.repeat(
+        lambda: [extract_jd_information(sample["job_description"]) for sample in samples],
+        number=ITERATIONS // 10, repeat=5
+    )) / (ITERATIONS // 10) / len(samples) * 1000
+
+    hit_rate = hits / len(samples)
+    print(f"samples:                 {len(samples)}")
+    print(f"threshold:               {args.threshold:.2f}")
+    print(f"local hit rate:          {hit_rate:.0%} ({hits}/{len(samples)})")
+    print(f"accuracy on hits:        {correct / hits:.0%}" if hits else "accuracy on hits:        n/a")
+    print(f"local extraction:        {local_ms:.3f} ms per job description")
+    print(f"tokens saved:            {saved_tokens / len(samples):.0f} per submission on average")
+    print(f"latency saved:           {hit_rate * args.llm_latency_ms - local_ms:.0f} ms per submission on average")
+    for expected_title, expected_company, job_title, company_name in misses:
+        print(f"  wrong: {job_title!r} / {company_name!r}, expected {expected_title!r} / {expected_company!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Compare the precompiled template registry with the legacy str.format path.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_templates
+"""
+import pickle
+import timeit
+
+from itertools import count
+
+from support import html_builder
+from support.html_builder import CVBuilder, CoverLetterBuilder
+from support.html_templates.html_templates import CVTemplates, CoverLetterTemplates
+from support.html_templates.template_registry import get_template
+
+FIXTURES_DIR = "test"
+ITERATIONS = 2000
+
+
+def load_fixture(filename):
+    with open(f"{FIXTURES_DIR}/{filename}", "rb") as f:
+        return pickle.load(f)
+
+
+def legacy_render(templates, template_id, data):
+    """Rebuild the template string and run str.format, as the builders used to"""
+    return getattr(templates, f"template_{template_id}")().format(**data)
+
+
+def time_call(func, iterations=ITERATIONS):
+    """Return the best per-call time in microseconds"""
+    best = min(timeit.repeat(func, number=iterations, repeat=5))
+    return best / iterations * 1e6
+
+
+def main():
+    final_cv = load_fixture("final_cv.pkl")
+    final_cover_letter = load_fixture("final_cover_letter.pkl")
+
+    cv_data = CVBuilder().build_template_data(final_cv)
+    cover_letter_data = CoverLetterBuilder().build_template_data(final_cover_letter)
+
+    cases = []
+    for template_id in ("1", "2"):
+        template = get_template("cv", template_id)
+        cases.append((
+            f"cv template {template_id}",
+            lambda tid=template_id: legacy_render(CVTemplates, tid, cv_data),
+            lambda template=template: template.render(cv_data),
+        ))
+    template = get_template("cover_letter", "1")
+    cases.append((
+        "cover letter template 1",
+        lambda: legacy_render(CoverLetterTemplates, "1", cover_letter_data),
+        lambda: template.render(cover_letter_data),
+    ))
+
+    print(f"{'case':<28}{'legacy (us)':>14}{'compiled (us)':>16}{'speedup':>10}")
+    for name, legacy, compiled in cases:
+        legacy_us = time_call(legacy)
+        compiled_us = time_call(compiled)
+        print(f"{name:<28}{legacy_us:>14.1f}{compiled_us:>16.1f}{legacy_us / compiled_us:>9.1f}x")
+
+    bench_live_editing(final_cv)
+
+
+def clear_fragment_caches():
+    for fragment_function in (
+        html_builder.render_entry_fragment,
+        html_builder.render_contact_info_fragment,
+        html_builder.render_skills_fragment,
+        html_builder.join_fragments,
+    ):
+        fragment_function.cache_clear()
+
+
+def bench_live_editing(final_cv):
+    """Full CV rebuild with cold fragment caches vs. a rerun editing one entry"""
+    cv_builder = CVBuilder()
+    edited_entry = (final_cv.experiences or final_cv.projects)[0]
+    original_description = edited_entry.description or ''
+    keystrokes = count()
+
+    def cold_rebuild():
+        clear_fragment_caches()
+        cv_builder.build_html_from_cv(final_cv)
+
+    def single_edit_rerun():
+        edited_entry.description = f"{original_description}{next(keystrokes)}"
+        cv_builder.build_html_from_cv(final_cv)
+
+    cold_us = time_call(cold_rebuild, iterations=500)
+    warm_us = time_call(single_edit_rerun, iterations=500)
+    edited_entry.description = original_description
+    print(f"{'live edit (1 entry changed)':<28}{cold_us:>14.1f}{warm_us:>16.1f}{cold_us / warm_us:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
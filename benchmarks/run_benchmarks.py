@@ -0,0 +1,337 @@
+"""Benchmark suite for the document pipeline, built on the test/ fixtures.
+
+Measures HTML building, WeasyPrint rendering, the submission storage paths at
+several table sizes, file conversion and the generation pipeline against a
+stubbed LLM, and writes the results as JSON so runs on different commits can
+be compared. Everything the code under test writes goes to a scratch
+directory.
+
+Run from the repository root:
+
+    python -m benchmarks.run_benchmarks [--suites html,pdf,storage,ingestion,pipeline]
+        [--rows 10,1000,100000] [--llm-latency-ms 0] [--output results.json]
+        [--compare previous.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import pickle
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(REPO_ROOT, "test")
+SUITES = ("html", "pdf", "storage", "ingestion", "pipeline")
+DEFAULT_ROWS = "10,1000,100000"
+# A fixed private workspace keeps benchmark rows apart from real data
+BENCH_NAMESPACE = "workspace-benchmark-namespace-0000000000000"
+
+
+def measure(func, repeat, warmup=1):
+    """Time func and return summary statistics in milliseconds"""
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    samples.sort()
+    return {
+        'repeat': repeat,
+        'min_ms': samples[0],
+        'mean_ms': statistics.fmean(samples),
+        'p50_ms': statistics.median(samples),
+        'p95_ms': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+    }
+
+
+def load_fixture(filename):
+    with open(f"{FIXTURES_DIR}/{filename}", "rb") as f:
+        return pickle.load(f)
+
+
+def load_fixtures():
+    return {
+        'structured_cv': load_fixture("structured_cv.pkl"),
+        'new_cv': load_fixture("new_cv.pkl"),
+        'cover_letter': load_fixture("cover_letter.pkl"),
+        'jd_information': load_fixture("jd_info.pkl"),
+    }
+
+
+def build_final_documents(fixtures):
+    """Assemble the final CV and cover letter the way the New Submission page does"""
+    from support.extractor import InformationExtractor
+
+    information_extractor = InformationExtractor(namespace=BENCH_NAMESPACE)
+    information_extractor.structured_cv = fixtures['structured_cv']
+    information_extractor.new_cv = fixtures['new_cv']
+    information_extractor.cover_letter = fixtures['cover_letter']
+    information_extractor.jd_information = fixtures['jd_information']
+    information_extractor.build_final_cv()
+    information_extractor.build_final_cover_letter()
+    return information_extractor.final_cv, information_extractor.final_cover_letter
+
+
+def template_ids(templates):
+    return sorted(name[len("template_"):] for name in dir(templates) if name.startswith("template_"))
+
+
+def bench_html(fixtures, args):
+    """Build the HTML of every template, with cold and warm fragment caches"""
+    from benchmarks.bench_templates import clear_fragment_caches
+    from support.html_builder import CVBuilder, CoverLetterBuilder
+    from support.html_templates.html_templates import CVTemplates, CoverLetterTemplates
+
+    final_cv, final_cover_letter = build_final_documents(fixtures)
+    cv_builder = CVBuilder()
+    cover_letter_builder = CoverLetterBuilder()
+
+    results = {}
+    for template_id in template_ids(CVTemplates):
+        def cold(template_id=template_id):
+            clear_fragment_caches()
+            cv_builder.build_html_from_cv(final_cv, template_id)
+
+        results[f"html.build_html_from_cv[{template_id}].cold"] = measure(cold, repeat=200)
+        results[f"html.build_html_from_cv[{template_id}].warm"] = measure(
+            lambda template_id=template_id: cv_builder.build_html_from_cv(final_cv, template_id), repeat=200
+        )
+    for template_id in template_ids(CoverLetterTemplates):
+        results[f"html.build_html_from_cover_letter[{template_id}]"] = measure(
+            lambda template_id=template_id: cover_letter_builder.build_html_from_cover_letter(
+                final_cover_letter, template_id
+            ),
+            repeat=200
+        )
+    return results
+
+
+def bench_pdf(fixtures, args):
+    """Render the CV and cover letter PDFs with WeasyPrint"""
+    import weasyprint
+    from support.html_builder import CVBuilder, CoverLetterBuilder
+    from support.page_fit import measure_layout
+
+    final_cv, final_cover_letter = build_final_documents(fixtures)
+    cv_html = CVBuilder().build_html_from_cv(final_cv)
+    cover_letter_html = CoverLetterBuilder().build_html_from_cover_letter(final_cover_letter)
+
+    return {
+        "pdf.write_pdf.cv": measure(lambda: weasyprint.HTML(string=cv_html).write_pdf(), repeat=5),
+        "pdf.write_pdf.cover_letter": measure(
+            lambda: weasyprint.HTML(string=cover_letter_html).write_pdf(), repeat=5
+        ),
+        # Layout-only pass behind the page-fit check (uncached)
+        "pdf.page_fit.cv": measure(lambda: measure_layout(cv_html), repeat=5),
+    }
+
+
+def fill_submissions(conn, rows):
+    """Clone submission 1 until the table holds the requested number of rows"""
+    conn.execute("""
+        WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < ?)
+        INSERT INTO submissions (company, position, submission_date, cv_data,
+            cover_letter_data, jd_information_data, namespace, portfolio_snapshot_id,
+            cv_template_id, cover_letter_template_id, cv_html, cover_letter_html)
+        SELECT company, position, submission_date, cv_data,
+            cover_letter_data, jd_information_data, namespace, portfolio_snapshot_id,
+            cv_template_id, cover_letter_template_id, cv_html, cover_letter_html
+        FROM submissions, seq WHERE id = 1
+    """, (rows - 1,))
+    conn.commit()
+
+
+def bench_storage(fixtures, args):
+    """Save, list and load submissions in tables of increasing size"""
+    import sqlite3
+    from support import submission_manager
+
+    final_cv, final_cover_letter = build_final_documents(fixtures)
+
+    def save():
+        submission_manager.save_submission(
+            fixtures['jd_information'].company_name,
+            fixtures['jd_information'].job_title,
+            final_cv,
+            final_cover_letter,
+            fixtures['jd_information'],
+            namespace=BENCH_NAMESPACE,
+            portfolio=fixtures['structured_cv']
+        )
+
+    results = {}
+    for rows in args.rows:
+        submission_manager.DB_PATH = os.path.abspath(f"storage_{rows}.db")
+        save()
+        if rows > 1:
+            with sqlite3.connect(submission_manager.DB_PATH) as conn:
+                fill_submissions(conn, rows)
+
+        ids = [row[0] for row in submission_manager.get_all_submissions(BENCH_NAMESPACE)]
+        results[f"storage.save_submission[{rows}]"] = measure(save, repeat=20)
+        results[f"storage.get_all_submissions[{rows}]"] = measure(
+            lambda: submission_manager.get_all_submissions(BENCH_NAMESPACE), repeat=10
+        )
+        results[f"storage.get_submission_objects[{rows}]"] = measure(
+            lambda: submission_manager.get_submission_objects(random.choice(ids), BENCH_NAMESPACE), repeat=50
+        )
+        results[f"storage.get_submission_html[{rows}]"] = measure(
+            lambda: submission_manager.get_submission_html(random.choice(ids), namespace=BENCH_NAMESPACE), repeat=50
+        )
+        results[f"storage.count_submissions[{rows}]"] = measure(
+            lambda: submission_manager.count_submissions(BENCH_NAMESPACE), repeat=20
+        )
+        os.remove(submission_manager.DB_PATH)
+    return results
+
+
+def bench_ingestion(fixtures, args):
+    """Convert the Markdown and PDF CV fixtures"""
+    from support.manage_ingestion import process_file
+
+    def convert(filename):
+        with open(f"{FIXTURES_DIR}/{filename}", "rb") as f:
+            uploaded_file = io.BytesIO(f.read())
+        uploaded_file.name = filename
+
+        def run():
+            uploaded_file.seek(0)
+            if process_file(uploaded_file, namespace=BENCH_NAMESPACE) is None:
+                raise RuntimeError(f"process_file failed on {filename}")
+        return run
+
+    return {
+        "ingestion.process_file.md": measure(convert("user_curriculum.md"), repeat=20),
+        "ingestion.process_file.pdf": measure(convert("cv_output.pdf"), repeat=3),
+    }
+
+
+def bench_pipeline(fixtures, args):
+    """Tailor the CV and cover letter end to end against the stubbed LLM"""
+    from benchmarks.stub_llm import load_stub_llm
+    from support.extractor import InformationExtractor
+
+    model = load_stub_llm(FIXTURES_DIR, latency_s=args.llm_latency_ms / 1000)
+    jd_information = fixtures['jd_information']
+    job_description = f"{jd_information.job_title} at {jd_information.company_name}"
+
+    def generate():
+        information_extractor = InformationExtractor(namespace=BENCH_NAMESPACE)
+        information_extractor.MODEL = model
+        information_extractor.structured_cv = fixtures['structured_cv']
+        information_extractor.create_new_cv(fixtures['structured_cv'], job_description)
+        information_extractor.create_new_cover_letter(fixtures['structured_cv'], job_description)
+        information_extractor.build_final_cv()
+        information_extractor.build_final_cover_letter()
+
+    result = measure(generate, repeat=5)
+    model.calls.clear()
+    generate()
+    result['llm_latency_ms'] = args.llm_latency_ms
+    result['llm_calls_per_run'] = len(model.calls)
+    return {"pipeline.generate_documents": result}
+
+
+BENCHMARKS = {
+    "html": bench_html,
+    "pdf": bench_pdf,
+    "storage": bench_storage,
+    "ingestion": bench_ingestion,
+    "pipeline": bench_pipeline,
+}
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_summary(results, baseline=None):
+    """Print a table of p50 timings (and the change against a baseline) to stderr"""
+    baseline = baseline or {}
+    for name, result in results.items():
+        line = f"{name:<52}{result['p50_ms']:>12.2f} ms"
+        if name in baseline:
+            line += f"{result['p50_ms'] / baseline[name]['p50_ms']:>9.2f}x"
+        print(line, file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--suites", default=",".join(SUITES))
+    parser.add_argument("--rows", default=DEFAULT_ROWS)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0)
+    parser.add_argument("--output", default=None, help="Write the JSON results to this file instead of stdout")
+    parser.add_argument("--compare", default=None, help="JSON results of a previous run to compare against")
+    args = parser.parse_args()
+    args.rows = [int(rows) for rows in args.rows.split(",")]
+
+    suites = args.suites.split(",")
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suites: {', '.join(sorted(unknown))}")
+
+    output_path = os.path.abspath(args.output) if args.output else None
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+
+    # The app writes relative to the working directory (dest_dir), so run the
+    # code under test from a scratch directory
+    sys.path.insert(0, REPO_ROOT)
+    os.environ.setdefault("TAILOR_CV_MAX_SUBMISSIONS", str(max(args.rows) * 2))
+    scratch_dir = tempfile.mkdtemp(prefix="tailor_cv_bench_")
+    os.chdir(scratch_dir)
+
+    results = {}
+    try:
+        fixtures = load_fixtures()
+        for suite in suites:
+            print(f"Running {suite} benchmarks...", file=sys.stderr)
+            # The extractor logs every LLM call to stdout, which holds the JSON
+            with contextlib.redirect_stdout(io.StringIO()):
+                results.update(BENCHMARKS[suite](fixtures, args))
+    finally:
+        os.chdir(REPO_ROOT)
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    print_summary(results, baseline)
+    report = {
+        'commit': git_commit(),
+        'created_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'suites': suites,
+        'rows': args.rows,
+        'llm_latency_ms': args.llm_latency_ms,
+        'results': results,
+    }
+    if output_path:
+        with open(output_path, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""A stand-in for the LangChain chat models that answers from the test/ fixtures.
+
+It supports the only call pattern the extractor uses,
+``model.with_structured_output(Schema, method=..., include_raw=...).invoke(messages)``, and
+sleeps for a configurable latency before answering so end-to-end timings
+include a realistic provider round trip without network access or API keys.
+"""
+import copy
+import pickle
+import time
+
+
+class StubMessage:
+    """Raw answer carrying token usage estimated at four characters per token"""
+
+    def __init__(self, messages, parsed):
+        self.usage_metadata = {
+            'input_tokens': sum(len(message["content"]) for message in messages) // 4,
+            'output_tokens': len(repr(parsed)) // 4,
+        }
+
+
+class StubStructuredLLM:
+    def __init__(self, model, schema, include_raw=False):
+        self.model = model
+        self.schema = schema
+        self.include_raw = include_raw
+
+    def invoke(self, messages):
+        self.model.calls.append((self.schema.__name__, messages))
+        time.sleep(self.model.latency_s)
+        parsed = copy.deepcopy(self.model.responses[self.schema.__name__])
+        if self.include_raw:
+            return {'raw': StubMessage(messages, parsed), 'parsed': parsed, 'parsing_error': None}
+        return parsed
+
+
+class StubLLM:
+    """Chat model returning canned structured outputs after a fixed latency"""
+
+    model_name = "stub"
+
+    def __init__(self, responses, latency_s=0.0):
+        # Schema class name -> object returned by invoke
+        self.responses = responses
+        self.latency_s = latency_s
+        self.calls = []
+
+    def with_structured_output(self, schema, include_raw=False, **kwargs):
+        return StubStructuredLLM(self, schema, include_raw)
+
+
+def load_stub_llm(fixtures_dir, latency_s=0.0):
+    """Build a StubLLM answering with the extraction and generation fixtures"""
+    def load(filename):
+        with open(f"{fixtures_dir}/{filename}", "rb") as f:
+            return pickle.load(f)
+
+    return StubLLM({
+        "Curriculum": load("structured_cv.pkl"),
+        "NewCurriculum": load("new_cv.pkl"),
+        "CoverLetter": load("cover_letter.pkl"),
+        "JobDescriptionInformation": load("jd_info.pkl"),
+    }, latency_s=latency_s)
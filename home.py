@@ -1,15 +1,18 @@
 import streamlit as st
 from support.submission_manager import get_all_submissions
 from support.html_builder import render_submissions_html
+from support.session_ui import get_session_namespace, profile_page
 from support.file_manager import FileManager
 from support.config_manager import ConfigManager
 import os
 
 st.set_page_config(page_title="AI CV Builder - Home", layout="wide")
+profile_page("home")
 
-# Initialize managers
-file_manager = FileManager()
-config_manager = ConfigManager()
+# Initialize managers for the current user's namespace
+namespace = get_session_namespace()
+file_manager = FileManager(namespace)
+config_manager = ConfigManager(namespace)
 
 # Auto-load saved configuration if not in session state
 if "selected_model" not in st.session_state:
@@ -87,6 +90,8 @@ with col3:
 with col4:
     st.page_link("pages/my_submissions.py", label="My Submissions", icon="📬")
     st.markdown("*View your application history*")
+    st.page_link("pages/triage.py", label="Triage Postings", icon="🗂️")
+    st.markdown("*Rank many job descriptions before tailoring*")
 
 st.markdown("---")
 
@@ -128,7 +133,7 @@ st.markdown("---")
 st.subheader("📬 Recent Applications")
 
 try:
-    submissions = get_all_submissions()
+    submissions = get_all_submissions(namespace)
     
     if not submissions:
         if has_portfolio:
@@ -154,7 +159,7 @@ col1, col2, col3 = st.columns(3)
 
 with col1:
     try:
-        submission_count = len(get_all_submissions()) if 'submissions' in locals() else 0
+        submission_count = len(get_all_submissions(namespace)) if 'submissions' in locals() else 0
         st.metric("Total Applications", submission_count)
     except:
         st.metric("Total Applications", 0)
@@ -2,11 +2,14 @@ import os
 import streamlit as st
 from support.settings import gemini_api_key_value, openai_api_key_value
 from support.config_manager import ConfigManager
+from support.session_ui import create_private_workspace, get_session_namespace, profile_page
+from support.load_models import MODEL_PRICES, MODEL_TASKS, PROVIDER_MODELS, get_task_models
 
 st.set_page_config(page_title="Manage Settings", layout="wide")
+profile_page("manage_settings")
 
-# Initialize config manager
-config_manager = ConfigManager()
+# Initialize config manager for the current user's namespace
+config_manager = ConfigManager(get_session_namespace())
 
 st.title("⚙️ Manage Settings")
 st.markdown("Configure your API keys and model preferences.")
@@ -97,8 +100,9 @@ if st.button("💾 Save Configuration"):
     st.session_state.gemini_api_key = gemini_api_key
     st.session_state.selected_model = model_choice
     
-    # Save to persistent storage
+    # Save to persistent storage, keeping settings managed elsewhere on this page
     config_data = {
+        **config_manager.load_config(),
         "openai_api_key": openai_api_key,
         "gemini_api_key": gemini_api_key,
         "selected_model": model_choice
@@ -110,6 +114,56 @@ if st.button("💾 Save Configuration"):
     else:
         st.error("❌ Failed to save configuration. Please try again.")
 
+# Models per task
+st.subheader("🧠 Models per Task")
+st.markdown(
+    "Filling schemas (portfolio extraction, job description parsing) runs on smaller, faster models "
+    "by default; tailoring and cover letters keep the large model."
+)
+saved_task_models = saved_config.get("task_models", {})
+task_models = get_task_models(model_choice, saved_task_models)
+task_columns = st.columns(len(MODEL_TASKS))
+for task_column, (task, task_label) in zip(task_columns, MODEL_TASKS.items()):
+    with task_column:
+        task_models[task] = st.selectbox(
+            task_label,
+            options=PROVIDER_MODELS[model_choice],
+            index=(
+                PROVIDER_MODELS[model_choice].index(task_models[task])
+                if task_models[task] in PROVIDER_MODELS[model_choice] else 0
+            ),
+            format_func=lambda name: f"{name} (${MODEL_PRICES[name][0]:.2f}/${MODEL_PRICES[name][1]:.2f} per 1M tokens)",
+            key=f"task_model_{model_choice}_{task}"
+        )
+if task_models != get_task_models(model_choice, saved_task_models):
+    config_manager.set_config_value("task_models", {**saved_task_models, model_choice: task_models})
+    st.rerun()
+st.caption("Per-task latency and cost of each run are shown in the debug trace panel of New Submission.")
+
+# Private workspace for sessions without a login
+if not getattr(st.user, "is_logged_in", False):
+    st.subheader("🔒 Private Workspace")
+    if get_session_namespace():
+        st.info("Your data is stored in a private workspace. Bookmark this page's link: it is the only way back in.")
+    else:
+        st.markdown("You are using the shared workspace. A private workspace keeps your data behind a secret link.")
+    if st.button("🔒 Create a new private workspace"):
+        create_private_workspace()
+
+# Profiling
+st.subheader("⏱️ Profiling")
+profiling_enabled = st.toggle(
+    "Profile page runs and background jobs",
+    value=bool(saved_config.get("profiling_enabled", False)),
+    help="Samples the call stack of every script run and job and saves flamegraph-ready profiles. "
+         "Can also be enabled for all users with TAILOR_CV_PROFILE=1."
+)
+if profiling_enabled != bool(saved_config.get("profiling_enabled", False)):
+    config_manager.set_config_value("profiling_enabled", profiling_enabled)
+    st.rerun()
+if profiling_enabled:
+    st.page_link("pages/profiles.py", label="Browse the slowest runs", icon="⏱️")
+
 # Configuration Status
 st.markdown("---")
 st.subheader("📁 Configuration Status")
@@ -1,13 +1,29 @@
+import os
 import streamlit as st
-from support.submission_manager import get_all_submissions, generate_pdf_from_submission, cleanup_temp_files
+from datetime import date
+from support.submission_manager import (
+    get_all_submissions, cleanup_temp_files, get_submission_trace_id, get_submissions_between,
+    get_submission_html
+)
 from support.html_builder import render_submissions_html
-import os
+from support.session_ui import (
+    submit_session_job, pop_finished_session_job, get_session_namespace, render_trace_panel, profile_page,
+    file_download_button, get_session_thumbnails
+)
+from support.job_queue import DONE
+from support.pdf_prerender import get_prerendered_pdfs
+from support.thumbnails import thumbnail_key, thumbnails_available
 
 st.set_page_config(page_title="My Submissions", layout="wide")
+profile_page("my_submissions")
+
+# Gallery thumbnails are loaded this many at a time
+GALLERY_PAGE_SIZE = 12
+GALLERY_COLUMNS = 4
 
 st.title("📁 My Submissions")
 
-submissions = get_all_submissions()
+submissions = get_all_submissions(get_session_namespace())
 
 if not submissions:
     st.info("No applications yet. Once you generate CVs and cover letters, they will appear here.")
@@ -33,6 +49,33 @@ if "download_cl_id" not in st.session_state:
 html_content = render_submissions_html(submissions)
 st.components.v1.html(html_content, height=500, scrolling=True)
 
+# Gallery of CV first pages, newest first; only the shown rows get thumbnails
+if not thumbnails_available():
+    st.caption("🖼️ Install the optional pypdfium2 package to browse your CVs as a gallery.")
+elif st.toggle("🖼️ Show gallery", key="show_gallery"):
+    shown = st.session_state.setdefault("gallery_shown", GALLERY_PAGE_SIZE)
+    gallery = submissions[::-1][:shown]
+    gallery_htmls = [get_submission_html(s[0], namespace=get_session_namespace())[0] for s in gallery]
+    thumbnails = get_session_thumbnails(
+        [(thumbnail_key(html), lambda html=html: html) for html in gallery_htmls],
+        slot="submission_thumbnails"
+    )
+    for row_start in range(0, len(gallery), GALLERY_COLUMNS):
+        columns = st.columns(GALLERY_COLUMNS)
+        for column, (submission_id, company, position, submission_date), thumbnail in zip(
+            columns, gallery[row_start:row_start + GALLERY_COLUMNS], thumbnails[row_start:row_start + GALLERY_COLUMNS]
+        ):
+            with column:
+                if thumbnail:
+                    st.image(thumbnail, use_container_width=True)
+                else:
+                    st.caption("⏳ Preview pending")
+                st.caption(f"**{company}** - {position} ({submission_date.split('T')[0]})")
+    if shown < len(submissions):
+        if st.button("⬇️ Show more", key="gallery_more"):
+            st.session_state.gallery_shown = shown + GALLERY_PAGE_SIZE
+            st.rerun()
+
 # Add download buttons below the table
 st.subheader("⬇️ Download Documents")
 st.info("Select a submission from the dropdown below to download your documents.")
@@ -42,8 +85,8 @@ if submissions:
     # Create a list of submission options for the dropdown
     submission_options = []
     for submission in submissions:
-        submission_id, company, position, date = submission
-        date_str = date.split("T")[0]
+        submission_id, company, position, submission_date = submission
+        date_str = submission_date.split("T")[0]
         submission_options.append(f"{company} - {position} ({date_str})")
     
     # Add a "Select submission" option at the beginning
@@ -61,9 +104,12 @@ if submissions:
         # Find the selected submission
         selected_index = submission_options.index(selected_submission_label) - 1  # -1 because we added the placeholder
         selected_submission = submissions[selected_index]
-        submission_id, company, position, date = selected_submission
+        submission_id, company, position, submission_date = selected_submission
         
         st.success(f"✅ Selected: {company} - {position}")
+        trace_id = get_submission_trace_id(submission_id, get_session_namespace())
+        if trace_id:
+            render_trace_panel(trace_id)
         
         # Create download buttons for the selected submission
         col1, col2 = st.columns(2)
@@ -81,64 +127,102 @@ else:
     st.warning("No submissions available for download.")
 
 # Handle downloads using session state
-if st.session_state.download_cv_id:
-    submission_id = st.session_state.download_cv_id
-    with st.spinner("Generating CV PDF..."):
-        try:
-            cv_path, cl_path, temp_dir = generate_pdf_from_submission(submission_id)
-            if cv_path and os.path.exists(cv_path):
-                # Get submission details for filename
-                submission_details = [s for s in submissions if s[0] == submission_id][0]
-                company, position = submission_details[1], submission_details[2]
-                
-                with open(cv_path, 'rb') as f:
-                    st.download_button(
-                        label="📥 Download CV PDF",
-                        data=f.read(),
-                        file_name=f"CV_{company}_{position}.pdf",
-                        mime="application/pdf"
-                    )
-                
-                # Clean up temp files
-                cleanup_temp_files(temp_dir)
-                st.success("✅ CV PDF ready for download!")
-            else:
-                st.error("❌ Failed to generate CV PDF")
-        except Exception as e:
-            st.error(f"❌ Error generating CV: {e}")
-    
-    # Clear the download request
-    st.session_state.download_cv_id = None
+for document in ("cv", "cl"):
+    requested_id = st.session_state[f"download_{document}_id"]
+    prerendered = requested_id and get_prerendered_pdfs(requested_id, namespace=get_session_namespace())
+    if prerendered:
+        # Rendered speculatively when the submission was last saved
+        cv_path, cl_path = prerendered
+        submission_details = [s for s in submissions if s[0] == requested_id][0]
+        company, position = submission_details[1], submission_details[2]
+        if document == "cv":
+            file_download_button("📥 Download CV PDF", cv_path, f"CV_{company}_{position}.pdf")
+        else:
+            file_download_button("📥 Download Cover Letter PDF", cl_path, f"Cover_Letter_{company}_{position}.pdf")
+    elif requested_id:
+        # Both PDFs are rendered in a background worker
+        submit_session_job("submission_pdfs", "render_pdfs", {
+            "submission_id": requested_id,
+            "trace_id": get_submission_trace_id(requested_id, get_session_namespace()),
+        })
+        st.session_state.download_document = document
+    if requested_id:
+        st.session_state[f"download_{document}_id"] = None
+
+pdf_job = pop_finished_session_job("submission_pdfs", "Generating PDF...")
+if pdf_job:
+    if pdf_job['status'] == DONE:
+        result = pdf_job['result']
+        document = st.session_state.get("download_document", "cv")
+
+        # Get submission details for filename
+        submission_details = [s for s in submissions if s[0] == result['submission_id']][0]
+        company, position = submission_details[1], submission_details[2]
+
+        if document == "cv":
+            pdf_path = result['cv_path']
+            label = "📥 Download CV PDF"
+            file_name = f"CV_{company}_{position}.pdf"
+        else:
+            pdf_path = result['cl_path']
+            label = "📥 Download Cover Letter PDF"
+            file_name = f"Cover_Letter_{company}_{position}.pdf"
 
-# Handle Cover Letter download
-if st.session_state.download_cl_id:
-    submission_id = st.session_state.download_cl_id
-    with st.spinner("Generating Cover Letter PDF..."):
         try:
-            cv_path, cl_path, temp_dir = generate_pdf_from_submission(submission_id)
-            if cl_path and os.path.exists(cl_path):
-                # Get submission details for filename
-                submission_details = [s for s in submissions if s[0] == submission_id][0]
-                company, position = submission_details[1], submission_details[2]
-                
-                with open(cl_path, 'rb') as f:
-                    st.download_button(
-                        label="📥 Download Cover Letter PDF",
-                        data=f.read(),
-                        file_name=f"Cover_Letter_{company}_{position}.pdf",
-                        mime="application/pdf"
-                    )
-                
-                # Clean up temp files
-                cleanup_temp_files(temp_dir)
-                st.success("✅ Cover Letter PDF ready for download!")
-            else:
-                st.error("❌ Failed to generate Cover Letter PDF")
-        except Exception as e:
-            st.error(f"❌ Error generating Cover Letter: {e}")
-    
-    # Clear the download request
-    st.session_state.download_cl_id = None
+            # Streamlit keeps its own copy for the download, the file can go
+            if file_download_button(label, pdf_path, file_name):
+                st.success("✅ PDF ready for download!")
+        finally:
+            # Clean up temp files
+            cleanup_temp_files(result['temp_dir'])
+    else:
+        st.error(f"❌ Failed to generate PDF: {pdf_job['error']}")
+
+# Bulk export of every application in a date range
+st.subheader("📦 Bulk Export")
+# Submissions may all have been deleted since the table above was read
+all_dates = [date.fromisoformat(s[3][:10]) for s in get_all_submissions(get_session_namespace())]
+if all_dates:
+    export_range = st.date_input(
+        "Submission dates",
+        value=(min(all_dates), max(all_dates)),
+        min_value=min(all_dates),
+        max_value=max(all_dates),
+        key="export_range"
+    )
+    if len(export_range) == 2:
+        submissions_in_range = get_submissions_between(*export_range, namespace=get_session_namespace())
+        selected_exports = st.multiselect(
+            f"Submissions to export ({len(submissions_in_range)} in range)",
+            options=submissions_in_range,
+            default=submissions_in_range,
+            format_func=lambda s: f"{s[1]} - {s[2]} ({s[3][:10]})",
+            key="export_selection"
+        )
+        if st.button("📦 Export CVs and Cover Letters as ZIP", disabled=not selected_exports):
+            # Rendered in parallel by a background worker into a ZIP on disk
+            submit_session_job("bulk_export", "export_zip", {
+                "submissions": [tuple(s) for s in selected_exports],
+            })
+
+export_job = pop_finished_session_job("bulk_export", "Rendering and archiving PDFs...")
+if export_job:
+    if export_job['status'] == DONE:
+        st.session_state.export_result = export_job['result']
+    else:
+        st.error(f"❌ Bulk export failed: {export_job['error']}")
+
+export_result = st.session_state.get("export_result")
+if export_result and os.path.exists(export_result['archive_path']):
+    st.success(f"✅ {export_result['exported']} submissions exported")
+    for submission_id, error in export_result['failures']:
+        st.warning(f"⚠️ Submission {submission_id} could not be exported: {error}")
+    file_download_button(
+        "📥 Download ZIP",
+        export_result['archive_path'],
+        os.path.basename(export_result['archive_path']),
+        mime="application/zip"
+    )
 
 # Navigation
 st.markdown("---")
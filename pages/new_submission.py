@@ -3,18 +3,28 @@ import pickle
 import time
 import streamlit as st
 from support.extractor import InformationExtractor
-from support.load_models import load_openAI_model, load_gemini_model
-from support.html_builder import render_editable_cv, render_editable_cover_letter
+from support.session_ui import (
+    render_editable_cv, render_editable_cover_letter, render_document_preview,
+    submit_session_job, has_session_job, pop_finished_session_job, get_session_namespace,
+    render_trace_panel, profile_page, file_download_button, prerender_session_pdfs, render_page_fit,
+    get_session_templates, update_session_submission
+)
+from support.job_queue import DONE
 from support.file_manager import FileManager
+from support.jd_preprocessor import encoder_ready, preprocess_job_description
+from support.keyword_matcher import get_portfolio_matcher
 from support.settings import TESTING
+from support.tracing import new_trace_id, use_trace
 
 st.set_page_config(page_title="New Submission", layout="wide")
+profile_page("new_submission")
 
 st.title("📝 New Job Submission")
 st.markdown("Create tailored CV and cover letter for a specific job application.")
 
-# Initialize file manager
-file_manager = FileManager()
+# Initialize file manager for the current user's namespace
+namespace = get_session_namespace()
+file_manager = FileManager(namespace)
 
 # Initialize submission tracking
 if "current_submission_id" not in st.session_state:
@@ -25,7 +35,7 @@ if "is_new_submission" not in st.session_state:
 # Check if portfolio exists in session state or load from file
 if "structured_cv" not in st.session_state:
     # Try to load existing portfolio from file
-    existing_portfolio = file_manager.load_portfolio_data()
+    existing_portfolio = file_manager.load_portfolio_data(mutable=True)
     if existing_portfolio:
         st.session_state.structured_cv = existing_portfolio
         st.success("✅ Existing portfolio loaded automatically!")
@@ -51,6 +61,17 @@ if openai_api_key:
 if gemini_api_key:
     os.environ["GOOGLE_API_KEY"] = gemini_api_key
 
+@st.cache_data(max_entries=32, show_spinner=False)
+def clean_job_description(job_description, exact_tokens):
+    """
+    Strip the boilerplate of a job description once per text
+
+    exact_tokens only keys the cache, so token counts estimated before
+    tiktoken was loaded are recomputed once it is.
+    """
+    return preprocess_job_description(job_description)
+
+
 # Job Description Input
 st.subheader("📋 Job Description")
 job_description = st.text_area(
@@ -59,99 +80,129 @@ job_description = st.text_area(
     placeholder="Paste the complete job description including requirements, responsibilities, and company information..."
 )
 
+# Instant keyword match of the portfolio against the posting, before any LLM call
+if job_description:
+    keyword_match = get_portfolio_matcher(st.session_state.structured_cv).match(job_description)
+    with st.expander(f"🎯 ATS keyword coverage: {keyword_match['coverage']:.0%}", expanded=True):
+        st.progress(keyword_match['coverage'])
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown(f"**✅ Matched ({len(keyword_match['matched'])})**")
+            st.markdown(" ".join(f"`{term}`" for term in keyword_match['matched']) or "_None_")
+        with col2:
+            st.markdown(f"**❌ Missing from your portfolio ({len(keyword_match['missing'])})**")
+            st.markdown(" ".join(f"`{term}`" for term in keyword_match['missing']) or "_None_")
+
+    # Preview of the boilerplate stripped before prompting, so nothing important gets cut unnoticed
+    cleaned_jd = clean_job_description(job_description, encoder_ready())
+    saved_share = 1 - cleaned_jd['tokens_after'] / cleaned_jd['tokens_before'] if cleaned_jd['tokens_before'] else 0.0
+    with st.expander(
+        f"✂️ Sent to the model: {cleaned_jd['tokens_after']:,} of {cleaned_jd['tokens_before']:,} tokens "
+        f"({saved_share:.0%} boilerplate removed)"
+    ):
+        if not cleaned_jd['removed']:
+            st.markdown("_Nothing removed._")
+        for block in cleaned_jd['removed']:
+            st.markdown(f"**{block['reason'].capitalize()}**")
+            st.text(block['text'])
+        st.markdown("**Text sent to the model**")
+        st.text(cleaned_jd['text'])
+
+def build_final_documents():
+    """Build the final CV and cover letter and store them in session state"""
+    information_extractor = st.session_state.information_extractor
+
+    st.info("🔄 Building final CV...")
+    generated_html = information_extractor.build_final_cv()
+    st.info("🔄 Building final cover letter...")
+    generated_html_cover_letter = information_extractor.build_final_cover_letter()
+
+    st.session_state.final_cv_content = information_extractor.final_cv
+    st.session_state.generated_html = generated_html
+    st.session_state.final_cover_letter_content = information_extractor.final_cover_letter
+    st.session_state.generated_html_cover_letter = generated_html_cover_letter
+
+
 # Generate Button
-if st.button("🪄 Generate Tailored Documents", type="primary"):
+if st.button("🪄 Generate Tailored Documents", type="primary", disabled=has_session_job("generate_documents")):
     if not job_description:
         st.error("Please provide a job description.")
     else:
         # Reset submission state for new generation
         st.session_state.is_new_submission = True
         st.session_state.current_submission_id = None
-        
-        with st.spinner("Generating your tailored CV and cover letter..."):
-            try:
-                # Initialize information extractor if not present
-                if "information_extractor" not in st.session_state:
-                    st.session_state.information_extractor = InformationExtractor()
-                
-                # Load the appropriate model
-                if selected_model == "gemini" and gemini_api_key:
-                    st.session_state.information_extractor.MODEL = load_gemini_model()
-                elif selected_model == "openai" and openai_api_key:
-                    st.session_state.information_extractor.MODEL = load_openAI_model()
-                else:
-                    st.error("❌ No valid API key found for the selected model")
-                    st.stop()
-                
-                # Set the structured CV
-                st.session_state.information_extractor.structured_cv = st.session_state.structured_cv
-                
-                # Debug information
-                st.info(f"🔍 Debug Info: Using {selected_model.upper()} model")
-                st.info(f"🔍 Debug Info: Structured CV loaded: {st.session_state.structured_cv is not None}")
-                
-                if not TESTING:
-                    # Generate new CV
-                    st.info("🔄 Generating new CV...")
-                    new_cv = st.session_state.information_extractor.create_new_cv(
-                        structured_curriculum=st.session_state.structured_cv,
-                        job_description=job_description,
-                    )
-                    
-                    # Generate cover letter
-                    st.info("🔄 Generating cover letter...")
-                    cover_letter = st.session_state.information_extractor.create_new_cover_letter(
-                        structured_curriculum=st.session_state.structured_cv,
-                        job_description=job_description,
-                    )
-                else:
-                    # Load test data
-                    with open(st.session_state.information_extractor.new_cv_path, "rb") as file:
-                        new_cv = pickle.load(file)
-                    with open(st.session_state.information_extractor.cover_letter_path, "rb") as file:
-                        cover_letter = pickle.load(file)
-                    with open(st.session_state.information_extractor.jd_information_path, "rb") as file:
-                        jd_information = pickle.load(file)
-                    
-                    st.session_state.information_extractor.new_cv = new_cv
-                    st.session_state.information_extractor.cover_letter = cover_letter
-                    st.session_state.information_extractor.jd_information = jd_information
-                
-                # Build final documents
-                st.info("🔄 Building final CV...")
-                generated_html = st.session_state.information_extractor.build_final_cv()
-                st.info("🔄 Building final cover letter...")
-                generated_html_cover_letter = st.session_state.information_extractor.build_final_cover_letter()
-                
-                # Store in session state
-                st.session_state.final_cv_content = st.session_state.information_extractor.final_cv
-                st.session_state.generated_html = generated_html
-                st.session_state.final_cover_letter_content = st.session_state.information_extractor.final_cover_letter
-                st.session_state.generated_html_cover_letter = generated_html_cover_letter
-                
-                st.success("✅ Tailored documents generated successfully!")
-                
-            except Exception as e:
-                st.error(f"❌ Failed to process the CV with the model: {e}")
-                st.error(f"❌ Error type: {type(e).__name__}")
-                
-                # Show more detailed error information
-                import traceback
-                st.error("📋 Full error traceback:")
-                st.code(traceback.format_exc())
-                
-                # Show debug information
-                st.info("🔍 Debug Information:")
-                st.info(f"   - Selected model: {selected_model}")
-                st.info(f"   - OpenAI API key configured: {bool(openai_api_key)}")
-                st.info(f"   - Gemini API key configured: {bool(gemini_api_key)}")
-                st.info(f"   - Structured CV in session: {bool('structured_cv' in st.session_state)}")
-                st.info(f"   - Information extractor in session: {bool('information_extractor' in st.session_state)}")
-                
-                if 'information_extractor' in st.session_state:
-                    st.info(f"   - Model initialized: {st.session_state.information_extractor.MODEL is not None}")
-                    if st.session_state.information_extractor.MODEL:
-                        st.info(f"   - Model type: {type(st.session_state.information_extractor.MODEL)}")
+        st.session_state.prerender_job_id = None
+        # Every span of this submission, in the page or in workers, shares this trace
+        st.session_state.trace_id = new_trace_id()
+
+        # Initialize information extractor if not present
+        if "information_extractor" not in st.session_state:
+            st.session_state.information_extractor = InformationExtractor(namespace=namespace)
+
+        # Set the structured CV
+        st.session_state.information_extractor.structured_cv = st.session_state.structured_cv
+
+        if not TESTING:
+            api_key = gemini_api_key if selected_model == "gemini" else openai_api_key
+            if not api_key:
+                st.error("❌ No valid API key found for the selected model")
+                st.stop()
+
+            # Debug information
+            st.info(f"🔍 Debug Info: Using {selected_model.upper()} model")
+            st.info(f"🔍 Debug Info: Structured CV loaded: {st.session_state.structured_cv is not None}")
+
+            # Generation runs in a background worker, the page polls for the result
+            submit_session_job("generate_documents", "generate_documents", {
+                "structured_cv": st.session_state.structured_cv,
+                # Every prompt gets the text shown in the preview, without boilerplate
+                "job_description": clean_job_description(job_description, encoder_ready())['text'],
+                "selected_model": selected_model,
+                "api_key": api_key,
+                "trace_id": st.session_state.trace_id,
+            })
+        else:
+            # Load test data
+            with open(st.session_state.information_extractor.new_cv_path, "rb") as file:
+                new_cv = pickle.load(file)
+            with open(st.session_state.information_extractor.cover_letter_path, "rb") as file:
+                cover_letter = pickle.load(file)
+            with open(st.session_state.information_extractor.jd_information_path, "rb") as file:
+                jd_information = pickle.load(file)
+
+            st.session_state.information_extractor.new_cv = new_cv
+            st.session_state.information_extractor.cover_letter = cover_letter
+            st.session_state.information_extractor.jd_information = jd_information
+
+            with use_trace(st.session_state.trace_id, namespace):
+                build_final_documents()
+            st.success("✅ Tailored documents generated successfully!")
+
+generation_job = pop_finished_session_job(
+    "generate_documents", "Generating your tailored CV and cover letter..."
+)
+if generation_job:
+    if generation_job['status'] == DONE:
+        result = generation_job['result']
+        st.session_state.information_extractor.new_cv = result['new_cv']
+        st.session_state.information_extractor.cover_letter = result['cover_letter']
+        st.session_state.information_extractor.jd_information = result['jd_information']
+
+        with use_trace(st.session_state.get("trace_id"), namespace):
+            build_final_documents()
+        st.success("✅ Tailored documents generated successfully!")
+    else:
+        st.error("❌ Failed to process the CV with the model")
+        st.error("📋 Full error traceback:")
+        st.code(generation_job['error'])
+
+        # Show debug information
+        st.info("🔍 Debug Information:")
+        st.info(f"   - Selected model: {selected_model}")
+        st.info(f"   - OpenAI API key configured: {bool(openai_api_key)}")
+        st.info(f"   - Gemini API key configured: {bool(gemini_api_key)}")
+        st.info(f"   - Structured CV in session: {bool('structured_cv' in st.session_state)}")
+        st.info(f"   - Information extractor in session: {bool('information_extractor' in st.session_state)}")
 
 # Document Editor and Preview
 if "generated_html" in st.session_state and "generated_html_cover_letter" in st.session_state:
@@ -170,10 +221,13 @@ if "generated_html" in st.session_state and "generated_html_cover_letter" in st.
         
         with col2:
             st.markdown("**👀 CV Preview**")
-            st.components.v1.html(
-                st.session_state.generated_html, 
-                height=1300, 
-                scrolling=True
+            render_page_fit(st.session_state.final_cv_content, template_id=st.session_state.get("template_id", "1"))
+            render_document_preview(
+                "cv",
+                st.session_state.final_cv_content,
+                template_id=st.session_state.get("template_id", "1"),
+                key="cv_preview",
+                height=1300
             )
     
     with tab2:
@@ -186,10 +240,12 @@ if "generated_html" in st.session_state and "generated_html_cover_letter" in st.
         
         with col2:
             st.markdown("**👀 Cover Letter Preview**")
-            st.components.v1.html(
-                st.session_state.generated_html_cover_letter, 
-                height=1300, 
-                scrolling=True
+            render_document_preview(
+                "cover_letter",
+                st.session_state.final_cover_letter_content,
+                template_id=st.session_state.get("cover_letter_template_id", "1"),
+                key="cover_letter_preview",
+                height=1300
             )
     
     # Save and Download Section
@@ -232,28 +288,21 @@ if "generated_html" in st.session_state and "generated_html_cover_letter" in st.
                 elif not st.session_state.information_extractor.jd_information.job_title:
                     st.error("❌ Job title is missing. Please check the job description or update the cover letter.")
                 else:
-                    if st.session_state.is_new_submission:
-                        # Create new submission
-                        st.session_state.information_extractor.create_pdf()
-                        st.session_state.is_new_submission = False
-                        st.session_state.current_submission_id = "new"  # Will be set after save
-                        st.success("✅ New submission created in database!")
-                    else:
-                        # Update existing submission
-                        from support.submission_manager import update_submission, get_all_submissions
-                        all_submissions = get_all_submissions()
-                        if all_submissions:
-                            latest_submission_id = all_submissions[-1][0]
-                            update_submission(
-                                latest_submission_id,
-                                st.session_state.information_extractor.final_cv,
-                                st.session_state.information_extractor.final_cover_letter,
-                                st.session_state.information_extractor.jd_information
-                            )
-                            st.session_state.current_submission_id = latest_submission_id
-                            st.success("✅ Existing submission updated in database!")
+                    with use_trace(st.session_state.get("trace_id"), namespace):
+                        if st.session_state.is_new_submission:
+                            # Create new submission
+                            submission_id = st.session_state.information_extractor.create_pdf(**get_session_templates())
+                            st.session_state.is_new_submission = False
+                            st.session_state.current_submission_id = submission_id
+                            # Render the PDFs now, the download usually follows
+                            prerender_session_pdfs(submission_id)
+                            st.success("✅ New submission created in database!")
                         else:
-                            st.error("❌ No existing submission found to update")
+                            # Update the submission this session created
+                            if update_session_submission():
+                                st.success("✅ Existing submission updated in database!")
+                            else:
+                                st.error("❌ No existing submission found to update")
                     
                     st.rerun()  # Refresh to show updated status
             except Exception as e:
@@ -288,39 +337,50 @@ if st.session_state.show_downloads and not st.session_state.download_generated:
         try:
             st.info("🔄 Generating PDFs for download...")
             
-            # Use current submission ID if available, otherwise get latest
+            # Only the submission this session saved; the latest row may belong to a background job
             submission_id_to_use = None
             if st.session_state.current_submission_id and st.session_state.current_submission_id != "new":
                 submission_id_to_use = st.session_state.current_submission_id
-            else:
-                # Get the latest submission ID from database
-                from support.submission_manager import get_all_submissions
-                all_submissions = get_all_submissions()
-                if all_submissions:
-                    submission_id_to_use = all_submissions[-1][0]  # Get the most recent submission
-                    # Update current submission ID
-                    st.session_state.current_submission_id = submission_id_to_use
-            
+
+            prerendered = None
             if submission_id_to_use:
-                # Generate PDFs
-                from support.submission_manager import generate_pdf_from_submission, cleanup_temp_files
-                cv_path, cl_path, temp_dir = generate_pdf_from_submission(submission_id_to_use)
-                
-                if cv_path and cl_path and os.path.exists(cv_path) and os.path.exists(cl_path):
-                    # Store paths in session state for download buttons
-                    st.session_state.cv_path = cv_path
-                    st.session_state.cl_path = cl_path
-                    st.session_state.temp_dir = temp_dir
-                    st.session_state.download_generated = True
-                    st.rerun()
-                else:
-                    st.error("❌ Failed to generate PDFs")
+                from support.pdf_prerender import get_prerendered_pdfs
+                prerendered = get_prerendered_pdfs(submission_id_to_use, namespace=namespace)
+
+            if prerendered:
+                # Rendered speculatively right after saving
+                st.session_state.cv_path, st.session_state.cl_path = prerendered
+                st.session_state.temp_dir = None
+                st.session_state.download_generated = True
+                st.rerun()
+            elif submission_id_to_use and st.session_state.get("prerender_job_id"):
+                # The speculative render is still running, wait for it instead of starting over
+                st.session_state.setdefault("job_ids", {})["submission_pdfs"] = st.session_state.prerender_job_id
+                st.session_state.prerender_job_id = None
+            elif submission_id_to_use:
+                # Render the PDFs in a background worker
+                submit_session_job("submission_pdfs", "render_pdfs", {
+                    "submission_id": submission_id_to_use,
+                    "trace_id": st.session_state.get("trace_id"),
+                })
             else:
-                st.error("❌ No submission found to generate PDFs from")
+                st.error("❌ Save the submission to the database before downloading its PDFs")
                 
         except Exception as e:
             st.error(f"❌ Error generating PDFs: {e}")
 
+    pdf_job = pop_finished_session_job("submission_pdfs", "Generating PDFs for download...")
+    if pdf_job:
+        if pdf_job['status'] == DONE:
+            # Store paths in session state for download buttons
+            st.session_state.cv_path = pdf_job['result']['cv_path']
+            st.session_state.cl_path = pdf_job['result']['cl_path']
+            st.session_state.temp_dir = pdf_job['result']['temp_dir']
+            st.session_state.download_generated = True
+            st.rerun()
+        else:
+            st.error(f"❌ Failed to generate PDFs: {pdf_job['error']}")
+
 # Show download buttons if PDFs are ready
 if st.session_state.download_generated and "cv_path" in st.session_state:
     st.success("✅ PDFs generated and ready for download!")
@@ -328,28 +388,10 @@ if st.session_state.download_generated and "cv_path" in st.session_state:
     col1, col2 = st.columns(2)
     
     with col1:
-        try:
-            with open(st.session_state.cv_path, 'rb') as f:
-                st.download_button(
-                    label="📥 Download CV PDF",
-                    data=f.read(),
-                    file_name="CV.pdf",
-                    mime="application/pdf"
-                )
-        except Exception as e:
-            st.error(f"❌ Error reading CV PDF: {e}")
+        file_download_button("📥 Download CV PDF", st.session_state.cv_path, "CV.pdf")
     
     with col2:
-        try:
-            with open(st.session_state.cl_path, 'rb') as f:
-                st.download_button(
-                    label="📥 Download Cover Letter PDF",
-                    data=f.read(),
-                    file_name="Cover_Letter.pdf",
-                    mime="application/pdf"
-                )
-        except Exception as e:
-            st.error(f"❌ Error reading Cover Letter PDF: {e}")
+        file_download_button("📥 Download Cover Letter PDF", st.session_state.cl_path, "Cover_Letter.pdf")
     
     # Clean up button
     if st.button("🧹 Clean Up Temporary Files"):
@@ -398,6 +440,10 @@ if st.session_state.download_generated and "cv_path" in st.session_state:
         except Exception as e:
             st.error(f"❌ Error during auto-cleanup: {e}")
 
+# Timings of this submission's generation, storage and rendering
+if st.session_state.get("trace_id"):
+    render_trace_panel(st.session_state.trace_id)
+
 # Navigation
 st.markdown("---")
 col1, col2, col3 = st.columns(3)
@@ -1,17 +1,25 @@
 import os
 import streamlit as st
-from support.extractor import InformationExtractor
-from support.manage_ingestion import process_file
-from support.load_models import load_openAI_model, load_gemini_model
 from support.file_manager import FileManager
+from support.portfolio_store import diff_snapshots, get_snapshot_id
+from support.submission_manager import get_portfolio_snapshot, get_portfolio_snapshots
+from support.session_ui import (
+    submit_session_job, has_session_job, pop_finished_session_job, get_session_namespace,
+    profile_page
+)
+from support.job_queue import DONE
+from support.tracing import new_trace_id
 
 st.set_page_config(page_title="Portfolio", layout="wide")
+profile_page("portfolio")
 
 st.title("📁 Portfolio Management")
 st.markdown("Manage your CV data and uploaded files.")
 
-# Initialize file manager
-file_manager = FileManager()
+UPLOADS_PAGE_SIZE = 20
+
+# Initialize file manager for the current user's namespace
+file_manager = FileManager(get_session_namespace())
 
 # Check if API keys are configured
 if "selected_model" not in st.session_state:
@@ -35,6 +43,8 @@ existing_portfolio = file_manager.load_portfolio_data()
 
 # Auto-load existing portfolio if available
 if existing_portfolio and "structured_cv" not in st.session_state:
+    # The editor changes the portfolio in place, so it works on a private copy
+    existing_portfolio = file_manager.load_portfolio_data(mutable=True)
     st.session_state.structured_cv = existing_portfolio
     st.session_state.final_cv = existing_portfolio
     st.session_state.exps = existing_portfolio.experiences or []
@@ -60,10 +70,11 @@ with col1:
         st.markdown("*Upload a CV to get started*")
 
 with col2:
-    uploaded_files = file_manager.get_uploaded_files()
-    st.info(f"📁 {len(uploaded_files)} Uploaded Files")
-    if uploaded_files:
-        st.markdown(f"**Latest:** {uploaded_files[0]['original_name']}")
+    uploaded_files_count = file_manager.count_uploaded_files()
+    st.info(f"📁 {uploaded_files_count} Uploaded Files")
+    if uploaded_files_count:
+        latest_upload = file_manager.get_uploaded_files(limit=1)[0]
+        st.markdown(f"**Latest:** {latest_upload['original_name']}")
 
 with col3:
     if "structured_cv" in st.session_state:
@@ -112,58 +123,70 @@ with tab1:
             st.markdown(f"**Size:** {uploaded_file.size} bytes")
         with col2:
             st.markdown(f"**Type:** {uploaded_file.type}")
+
+        duplicate_upload = file_manager.find_duplicate_upload(uploaded_file)
+        if duplicate_upload:
+            st.info(
+                f"ℹ️ This file is identical to **{duplicate_upload['original_name']}**, "
+                f"uploaded on {duplicate_upload['modified'].strftime('%Y-%m-%d %H:%M')}. "
+                "Processing it will not store a second copy."
+            )
         
         # Process button
-        if st.button("🔄 Process CV", type="primary"):
-            with st.spinner("Processing your CV..."):
-                try:
-                    # Save uploaded file
+        if st.button("🔄 Process CV", type="primary", disabled=has_session_job("extract_portfolio")):
+            try:
+                api_key = gemini_api_key if selected_model == "gemini" else openai_api_key
+                if not api_key:
+                    st.error("❌ No valid API key found for the selected model")
+                    st.stop()
+
+                # Save uploaded file, reusing an identical earlier upload
+                if duplicate_upload:
+                    safe_filename = duplicate_upload['filename']
+                else:
                     file_path, safe_filename = file_manager.save_uploaded_file(
                         uploaded_file, uploaded_file.name
                     )
-                    
-                    # Process the file
-                    markdown_cv = process_file(uploaded_file)
-                    
-                    if markdown_cv:
-                        # Initialize information extractor
-                        if "information_extractor" not in st.session_state:
-                            st.session_state.information_extractor = InformationExtractor()
-                        
-                        # Load the appropriate model
-                        if selected_model == "gemini" and gemini_api_key:
-                            st.session_state.information_extractor.MODEL = load_gemini_model()
-                        elif selected_model == "openai" and openai_api_key:
-                            st.session_state.information_extractor.MODEL = load_openAI_model()
-                        else:
-                            st.error("❌ No valid API key found for the selected model")
-                            st.stop()
-                        
-                        # Extract structured data
-                        structured_cv = st.session_state.information_extractor.extract_data(
-                            markdown_cv=markdown_cv, is_new_cv=True
-                        )
-                        
-                        # Store in session state
-                        st.session_state.structured_cv = structured_cv
-                        st.session_state.final_cv = structured_cv
-                        
-                        # Initialize editable lists
-                        st.session_state.exps = structured_cv.experiences or []
-                        st.session_state.projs = structured_cv.projects or []
-                        st.session_state.edus = structured_cv.education or []
-                        
-                        # Save to portfolio directory
-                        file_manager.save_portfolio_data(structured_cv)
-                        
-                        st.success("✅ CV processed successfully!")
-                        st.rerun()
-                        
-                    else:
-                        st.error("❌ Failed to process file. Please check the file format.")
-                        
-                except Exception as e:
-                    st.error(f"❌ Error processing CV: {str(e)}")
+                st.session_state.extract_portfolio_upload = safe_filename
+
+                # Conversion and extraction run in a background worker
+                submit_session_job("extract_portfolio", "extract_portfolio", {
+                    "file_name": uploaded_file.name,
+                    "file_bytes": uploaded_file.getvalue(),
+                    "selected_model": selected_model,
+                    "api_key": api_key,
+                    "trace_id": new_trace_id(),
+                })
+
+            except Exception as e:
+                st.error(f"❌ Error processing CV: {str(e)}")
+
+    extraction_job = pop_finished_session_job("extract_portfolio", "Processing your CV...")
+    if extraction_job:
+        if extraction_job['status'] == DONE:
+            structured_cv = extraction_job['result']
+
+            # Store in session state
+            st.session_state.structured_cv = structured_cv
+            st.session_state.final_cv = structured_cv
+
+            # Initialize editable lists
+            st.session_state.exps = structured_cv.experiences or []
+            st.session_state.projs = structured_cv.projects or []
+            st.session_state.edus = structured_cv.education or []
+
+            # Save to portfolio directory
+            file_manager.save_portfolio_data(structured_cv)
+            if "extract_portfolio_upload" in st.session_state:
+                file_manager.link_portfolio_version(
+                    st.session_state.pop("extract_portfolio_upload"),
+                    get_snapshot_id(structured_cv)
+                )
+
+            st.success("✅ CV processed successfully!")
+            st.rerun()
+        else:
+            st.error(f"❌ Error processing CV: {extraction_job['error']}")
 
 with tab2:
     if "structured_cv" in st.session_state:
@@ -346,7 +369,16 @@ with tab3:
     
     # Uploaded Files Section
     st.markdown("**📤 Uploaded CV Files**")
-    uploaded_files = file_manager.get_uploaded_files()
+    uploaded_files_pages = max(1, -(-uploaded_files_count // UPLOADS_PAGE_SIZE))
+    uploads_page = 1
+    if uploaded_files_pages > 1:
+        uploads_page = st.number_input(
+            f"Page (of {uploaded_files_pages})", min_value=1, max_value=uploaded_files_pages,
+            value=1, step=1, key="uploads_page"
+        )
+    uploaded_files = file_manager.get_uploaded_files(
+        limit=UPLOADS_PAGE_SIZE, offset=(uploads_page - 1) * UPLOADS_PAGE_SIZE
+    )
     
     if uploaded_files:
         for file_info in uploaded_files:
@@ -354,6 +386,8 @@ with tab3:
             with col1:
                 st.markdown(f"**{file_info['original_name']}**")
                 st.caption(f"Uploaded: {file_info['modified'].strftime('%Y-%m-%d %H:%M')}")
+                if file_info['portfolio_version']:
+                    st.caption(f"Portfolio version: {file_info['portfolio_version'][:12]}")
             with col2:
                 st.markdown(f"{file_info['size']:,} bytes")
             with col3:
@@ -374,6 +408,41 @@ with tab3:
     else:
         st.info("No uploaded files yet.")
     
+    # Portfolio History Section
+    st.markdown("**🕘 Portfolio History**")
+    snapshots = get_portfolio_snapshots(get_session_namespace())
+    if len(snapshots) < 2:
+        st.info("Save your portfolio again after editing it to compare versions.")
+    else:
+        snapshot_labels = {
+            snapshot_id: f"{created_at[:16].replace('T', ' ')} ({snapshot_id[:8]})"
+            for snapshot_id, created_at in snapshots
+        }
+        col1, col2 = st.columns(2)
+        with col1:
+            old_snapshot_id = st.selectbox(
+                "Compare version", list(snapshot_labels), index=1,
+                format_func=snapshot_labels.get, key="history_old_snapshot"
+            )
+        with col2:
+            new_snapshot_id = st.selectbox(
+                "With version", list(snapshot_labels), index=0,
+                format_func=snapshot_labels.get, key="history_new_snapshot"
+            )
+        changes = diff_snapshots(
+            get_portfolio_snapshot(old_snapshot_id, get_session_namespace()),
+            get_portfolio_snapshot(new_snapshot_id, get_session_namespace())
+        )
+        if not changes:
+            st.info("No differences between these versions.")
+        for field, change in changes.items():
+            st.markdown(f"**{field.replace('_', ' ').title()}**")
+            for item in change['removed']:
+                st.markdown(f"- ➖ {item}")
+            for item in change['added']:
+                st.markdown(f"- ➕ {item}")
+    st.markdown("---")
+
     # Portfolio Files Section
     st.markdown("**💾 Portfolio Data Files**")
     portfolio_files = file_manager.get_portfolio_files()
@@ -0,0 +1,95 @@
+import streamlit as st
+from support.session_ui import get_session_namespace, profile_page
+from support.profiling import (
+    is_profiling_enabled, list_profiles, load_folded_stacks, summarize_folded_stacks
+)
+
+st.set_page_config(page_title="Profiles", layout="wide")
+profile_page("profiles")
+
+st.title("⏱️ Profiles")
+st.markdown("Browse the slowest recorded page runs and background jobs.")
+
+if not is_profiling_enabled(get_session_namespace()):
+    st.info("💡 Profiling is disabled. Enable it in 'Manage Settings' or with TAILOR_CV_PROFILE=1.")
+    st.page_link("pages/manage_settings.py", label="Go to Manage Settings", icon="⚙️")
+
+profiles = list_profiles(get_session_namespace())
+if not profiles:
+    st.info("No profiles recorded yet.")
+    st.stop()
+
+# Filters
+col1, col2 = st.columns(2)
+with col1:
+    kinds = st.multiselect(
+        "Run type", options=["script", "job"], default=["script", "job"],
+        format_func=lambda kind: "Page runs" if kind == "script" else "Background jobs"
+    )
+with col2:
+    labels = sorted({profile['label'] for profile in profiles})
+    selected_labels = st.multiselect("Page or job", options=labels, default=labels)
+
+profiles = [
+    profile for profile in profiles
+    if profile['kind'] in kinds and profile['label'] in selected_labels
+]
+
+# Slowest runs first
+st.subheader("🐢 Slowest Runs")
+st.dataframe(
+    [
+        {
+            'started': profile['started_at'].replace("T", " ")[:19],
+            'type': profile['kind'],
+            'page / job': profile['label'],
+            'duration ms': round(profile['duration_ms']),
+            'samples': profile['samples'],
+        }
+        for profile in profiles
+    ],
+    hide_index=True,
+    use_container_width=True
+)
+
+if profiles:
+    selected_profile = st.selectbox(
+        "Inspect a run",
+        options=profiles,
+        format_func=lambda profile: (
+            f"{profile['label']} ({profile['kind']}) - {profile['duration_ms']:,.0f} ms "
+            f"at {profile['started_at'].replace('T', ' ')[:19]}"
+        )
+    )
+
+    folded = load_folded_stacks(selected_profile['id'], get_session_namespace())
+    st.markdown(
+        f"**{selected_profile['samples']} samples** every {selected_profile['interval_ms']:.0f} ms. "
+        "Self samples are spent in the function itself, total samples include its callees."
+    )
+    st.dataframe(
+        [
+            {'function': label, 'self samples': self_samples, 'total samples': total_samples}
+            for label, self_samples, total_samples in summarize_folded_stacks(folded)
+        ],
+        hide_index=True,
+        use_container_width=True
+    )
+
+    st.download_button(
+        label="📥 Download collapsed stacks",
+        data=folded,
+        file_name=f"{selected_profile['id']}.folded",
+        mime="text/plain",
+        help="Open in https://www.speedscope.app or render with flamegraph.pl"
+    )
+
+# Navigation
+st.markdown("---")
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.page_link("home.py", label="Back to Home", icon="🏠")
+with col2:
+    st.page_link("pages/manage_settings.py", label="Manage Settings", icon="⚙️")
+with col3:
+    st.page_link("pages/my_submissions.py", label="My Submissions", icon="📁")
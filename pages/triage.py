@@ -0,0 +1,142 @@
+import hashlib
+import streamlit as st
+from support.file_manager import FileManager
+from support.session_ui import (
+    get_session_namespace, get_session_templates, pop_finished_session_job, profile_page, submit_session_job
+)
+from support.jd_preprocessor import preprocess_job_description
+from support.job_queue import DONE
+from support.keyword_matcher import get_portfolio_matcher
+from support.portfolio_store import get_snapshot_id
+from support.tracing import new_trace_id
+from support.triage import rank_job_descriptions, split_postings
+
+st.set_page_config(page_title="Triage", layout="wide")
+profile_page("triage")
+
+# LLM calls made per tailored posting (CV, job details, cover letter)
+LLM_CALLS_PER_POSTING = 3
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def rank_postings(postings, snapshot_id, _structured_cv):
+    """Rank postings and match their keywords, once per list of postings and portfolio version"""
+    matcher = get_portfolio_matcher(_structured_cv)
+    return rank_job_descriptions(postings, _structured_cv), [matcher.match(posting) for posting in postings]
+
+
+st.title("🗂️ Triage Job Postings")
+st.markdown("Rank many job descriptions by fit with your portfolio, then tailor only the best ones.")
+
+namespace = get_session_namespace()
+file_manager = FileManager(namespace)
+
+if "structured_cv" not in st.session_state:
+    existing_portfolio = file_manager.load_portfolio_data(mutable=True)
+    if not existing_portfolio:
+        st.warning("⚠️ Please create your portfolio first in the 'Portfolio' page.")
+        st.page_link("pages/portfolio.py", label="Go to Portfolio", icon="📁")
+        st.stop()
+    st.session_state.structured_cv = existing_portfolio
+
+if "triage_slots" not in st.session_state:
+    st.session_state.triage_slots = {}
+if "triage_results" not in st.session_state:
+    st.session_state.triage_results = []
+
+# Job descriptions
+st.subheader("📋 Job Descriptions")
+pasted_postings = st.text_area(
+    "Paste job descriptions, separated by a line of dashes (---)",
+    height=300,
+    placeholder="First job description...\n---\nSecond job description..."
+)
+uploaded_postings = st.file_uploader(
+    "Or upload one text file per job description", type=["txt", "md"], accept_multiple_files=True
+)
+
+postings = split_postings(pasted_postings)
+for uploaded_file in uploaded_postings or []:
+    postings += split_postings(uploaded_file.getvalue().decode("utf-8", errors="replace"))
+
+if not postings:
+    st.info("💡 Add at least one job description to rank it.")
+    st.stop()
+
+# Ranking runs locally when the postings or the portfolio change, no LLM involved
+ranking, keyword_matches = rank_postings(
+    postings, get_snapshot_id(st.session_state.structured_cv), st.session_state.structured_cv
+)
+
+st.subheader(f"🏆 Ranking of {len(postings)} postings")
+st.dataframe(
+    [
+        {
+            'rank': rank,
+            'posting': entry['title'],
+            'fit': f"{entry['relative_fit']:.0%}",
+            'BM25 score': round(entry['score'], 2),
+            'keyword coverage': f"{keyword_matches[entry['index']]['coverage']:.0%}",
+            'missing keywords': ", ".join(keyword_matches[entry['index']]['missing'][:5]),
+        }
+        for rank, entry in enumerate(ranking, start=1)
+    ],
+    hide_index=True,
+    use_container_width=True
+)
+
+# Tailoring of the best postings
+st.subheader("🪄 Tailor the Best Postings")
+top_n = st.number_input(
+    "Number of postings to tailor", min_value=1, max_value=len(postings), value=min(5, len(postings))
+)
+st.caption(
+    f"Tailoring the top {top_n} of {len(postings)} postings skips "
+    f"{(len(postings) - top_n) * LLM_CALLS_PER_POSTING} LLM calls."
+)
+
+selected_model = st.session_state.get("selected_model")
+api_key = st.session_state.get("gemini_api_key" if selected_model == "gemini" else "openai_api_key")
+if not selected_model or not api_key:
+    st.warning("⚠️ Please configure your API keys in 'Manage Settings' first.")
+    st.page_link("pages/manage_settings.py", label="Go to Manage Settings", icon="🔑")
+elif st.button(f"🪄 Tailor the top {top_n}", type="primary"):
+    for entry in ranking[:top_n]:
+        job_description = postings[entry['index']]
+        slot = f"triage_{hashlib.sha1(job_description.encode('utf-8')).hexdigest()[:12]}"
+        if slot in st.session_state.triage_slots:
+            continue
+        # Each posting is tailored and saved by a background worker; workers run in parallel
+        submit_session_job(slot, "tailor_submission", {
+            "structured_cv": st.session_state.structured_cv,
+            "job_description": preprocess_job_description(job_description)['text'],
+            "selected_model": selected_model,
+            "api_key": api_key,
+            "trace_id": new_trace_id(),
+            **get_session_templates(),
+        })
+        st.session_state.triage_slots[slot] = entry['title']
+
+for slot, title in list(st.session_state.triage_slots.items()):
+    job = pop_finished_session_job(slot, f"Tailoring '{title}'...")
+    if job:
+        del st.session_state.triage_slots[slot]
+        if job['status'] == DONE:
+            st.session_state.triage_results.append(job['result'])
+        else:
+            st.error(f"❌ Tailoring '{title}' failed: {job['error'].splitlines()[0]}")
+
+for result in st.session_state.triage_results:
+    st.success(f"✅ Saved {result['company']} - {result['position']} (submission {result['submission_id']})")
+if st.session_state.triage_results:
+    st.page_link("pages/my_submissions.py", label="Open My Submissions", icon="📁")
+
+# Navigation
+st.markdown("---")
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.page_link("home.py", label="Back to Home", icon="🏠")
+with col2:
+    st.page_link("pages/new_submission.py", label="New Submission", icon="📝")
+with col3:
+    st.page_link("pages/my_submissions.py", label="My Submissions", icon="📁")
@@ -0,0 +1,120 @@
+import multiprocessing
+import os
+import re
+import tempfile
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from support.namespace_manager import get_namespace_dir
+from support.tracing import current_trace_id, set_span_attributes, traced, use_trace
+
+# Renders queued per pool process; finished PDFs wait at most this long in
+# memory before they are written to the archive
+IN_FLIGHT_PER_WORKER = 2
+# Most recent exports kept per namespace
+EXPORT_RETENTION = 3
+
+
+def _safe_name(value):
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", value or "").strip("_") or "unknown"
+
+
+def _render_in_worker(submission_id, template_id, namespace, trace_id):
+    """Render both PDFs of a submission (runs in a pool process)"""
+    from support.submission_manager import render_submission_pdfs
+
+    with use_trace(trace_id, namespace):
+        return render_submission_pdfs(submission_id, template_id, namespace)
+
+
+def get_exports_dir(namespace=None):
+    """Get (and create) the directory holding the exported archives of a namespace"""
+    exports_dir = f"{get_namespace_dir(namespace)}/exports"
+    os.makedirs(exports_dir, exist_ok=True)
+    return exports_dir
+
+
+def prune_exports(exports_dir, keep=EXPORT_RETENTION):
+    """Delete the oldest archives of an exports directory"""
+    archives = sorted(
+        (
+            entry for entry in os.scandir(exports_dir)
+            if entry.name.endswith(".zip") and not entry.name.startswith(".")
+        ),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True
+    )
+    for entry in archives[keep:]:
+        os.remove(entry.path)
+
+
+@traced("export_submissions_zip")
+def export_submissions_zip(submissions, template_id=None, namespace=None, max_workers=None):
+    """
+    Render the PDFs of many submissions in parallel into a ZIP archive
+
+    submissions are (id, company, position, submission_date) rows. Renders run
+    in a process pool with a bounded number of submissions in flight, and each
+    result is written to the archive as soon as it finishes, so memory use does
+    not grow with the number of submissions. Without a template id each
+    submission keeps the template it was saved with. Returns (archive path, failures).
+    """
+    max_workers = max(1, min(max_workers or os.cpu_count() or 1, len(submissions)))
+    set_span_attributes(**{'export.submissions': len(submissions), 'export.workers': max_workers})
+
+    exports_dir = get_exports_dir(namespace)
+    archive_path = f"{exports_dir}/submissions_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+    folders = {
+        submission_id: f"{submission_id:05d}_{date[:10]}_{_safe_name(company)}_{_safe_name(position)}"
+        for submission_id, company, position, date in submissions
+    }
+    remaining = iter(folders)
+    failures = []
+
+    fd, tmp_path = tempfile.mkstemp(dir=exports_dir, prefix=".export_", suffix=".zip")
+    os.close(fd)
+    try:
+        # spawn: the parent may run other threads (e.g. the profiler sampler)
+        with ProcessPoolExecutor(max_workers, mp_context=multiprocessing.get_context("spawn")) as pool, \
+                zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_STORED) as archive:
+            in_flight = {}
+
+            def submit_next():
+                while len(in_flight) < max_workers * IN_FLIGHT_PER_WORKER:
+                    submission_id = next(remaining, None)
+                    if submission_id is None:
+                        return
+                    future = pool.submit(
+                        _render_in_worker, submission_id, template_id, namespace, current_trace_id()
+                    )
+                    in_flight[future] = submission_id
+
+            submit_next()
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    submission_id = in_flight.pop(future)
+                    try:
+                        cv_pdf, cl_pdf = future.result()
+                    except Exception as e:
+                        print(f"❌ Export of submission {submission_id} failed: {e}")
+                        failures.append((submission_id, str(e)))
+                        continue
+                    # PDFs are already compressed, store them as they are
+                    archive.writestr(f"{folders[submission_id]}/CV.pdf", cv_pdf)
+                    archive.writestr(f"{folders[submission_id]}/Cover_Letter.pdf", cl_pdf)
+                submit_next()
+
+            if failures:
+                archive.writestr("export_errors.txt", "\n".join(
+                    f"Submission {submission_id}: {error}" for submission_id, error in failures
+                ))
+
+        os.replace(tmp_path, archive_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    prune_exports(exports_dir)
+    return archive_path, failures
@@ -1,14 +1,16 @@
 import os
-import pickle
-from support.settings import dest_dir
+from support.namespace_manager import get_namespace_dir
+from support.persistence import (
+    atomic_pickle_dump, cached_pickle_load, file_lock, invalidate_cached
+)
 
 
 class ConfigManager:
     """Manages persistent configuration storage for user settings using 
     pickle"""
     
-    def __init__(self):
-        self.config_dir = f"{dest_dir}/config"
+    def __init__(self, namespace=None):
+        self.config_dir = f"{get_namespace_dir(namespace)}/config"
         self.config_file = f"{self.config_dir}/user_config.pkl"
         self._ensure_config_dir()
     
@@ -19,20 +21,17 @@ class ConfigManager:
     def save_config(self, config_data):
         """Save configuration to pickle file"""
         try:
-            with open(self.config_file, 'wb') as f:
-                pickle.dump(config_data, f)
+            atomic_pickle_dump(config_data, self.config_file)
             return True
         except Exception as e:
             print(f"Error saving config: {e}")
             return False
     
     def load_config(self):
-        """Load configuration from pickle file"""
+        """Load configuration from pickle file (cached while unchanged on 
+        disk)"""
         try:
-            if os.path.exists(self.config_file):
-                with open(self.config_file, 'rb') as f:
-                    return pickle.load(f)
-            return {}
+            return cached_pickle_load(self.config_file, default={})
         except Exception as e:
             print(f"Error loading config: {e}")
             return {}
@@ -44,9 +43,12 @@ class ConfigManager:
     
     def set_config_value(self, key, value):
         """Set a specific configuration value"""
-        config = self.load_config()
-        config[key] = value
-        return self.save_config(config)
+        # Hold the file lock so concurrent updates of other keys are not lost
+        with file_lock(self.config_file):
+            # The loaded config is the shared cached dict, update a copy
+            config = dict(self.load_config())
+            config[key] = value
+            return self.save_config(config)
     
     def has_config(self):
         """Check if configuration file exists"""
@@ -57,6 +59,7 @@ class ConfigManager:
         try:
             if os.path.exists(self.config_file):
                 os.remove(self.config_file)
+            invalidate_cached(self.config_file)
             return True
         except Exception as e:
             print(f"Error clearing config: {e}")
@@ -1,9 +1,13 @@
-import pickle
 import os
 
 from datetime import datetime
 from support.html_builder import CVBuilder, CoverLetterBuilder
-from support.settings import dest_dir
+from support.jd_extractor import extract_jd_information
+from support.load_models import estimate_cost, get_baseline_model
+from support.namespace_manager import get_namespace_dir
+from support.persistence import atomic_pickle_dump, cached_pickle_load
+from support.settings import jd_local_confidence_threshold
+from support.tracing import set_span_attributes, span
 from support.supportClasses import (
     Curriculum, FinalCurriculum, NewCurriculum, 
     JobDescriptionInformation, CoverLetter, FinalCoverLetter
@@ -15,7 +19,7 @@ from support.supportLLM import (
 
 
 class InformationExtractor:
-    def __init__(self):
+    def __init__(self, namespace=None):
 
         self.system_prompt_data_extraction = system_prompt_data_extraction
         self.system_prompt_curriculum_creation = system_prompt_curriculum_creation
@@ -23,24 +27,33 @@ class InformationExtractor:
         self.system_prompt_jd_extraction = system_prompt_jd_extraction
 
         self.MODEL = None
+        # Per-task models (see support.load_models.MODEL_TASKS); tasks without one use MODEL
+        self.MODELS = {}
+
+        self.namespace = namespace
+        namespace_dir = get_namespace_dir(namespace)
 
         self.structured_cv = None
+        # Copy of the portfolio the final CV was built from, saved with its submission
+        self.tailored_portfolio = None
         self.new_cv = None
         self.final_cv = None
         self.jd_information = None
         self.cover_letter = None
         self.final_cover_letter = None
 
-        self.generated_pdf_path = f"{dest_dir}/cv_output.pdf"
-        self.generated_cover_letter_pdf_path = f"{dest_dir}/cover_letter_output.pdf"
+        self.generated_pdf_path = f"{namespace_dir}/cv_output.pdf"
+        self.generated_cover_letter_pdf_path = f"{namespace_dir}/cover_letter_output.pdf"
 
-        self.structured_cv_path = f"{dest_dir}/structured_cv.pkl"
-        self.new_cv_path = f"{dest_dir}/new_cv.pkl"
-        self.cover_letter_path = f"{dest_dir}/cover_letter.pkl"
-        self.jd_information_path = f"{dest_dir}/jd_info.pkl"
+        self.structured_cv_path = f"{namespace_dir}/structured_cv.pkl"
+        self.new_cv_path = f"{namespace_dir}/new_cv.pkl"
+        self.cover_letter_path = f"{namespace_dir}/cover_letter.pkl"
+        self.jd_information_path = f"{namespace_dir}/jd_info.pkl"
 
         self.generated_html = None
         self.generated_html_cover_letter = None
+        self.cv_template_id = "1"
+        self.cover_letter_template_id = "1"
 
     def validate_model(self):
         """Validate that the model is properly initialized"""
@@ -58,15 +71,57 @@ class InformationExtractor:
         
         return True
 
+    def get_model(self, task):
+        """Model of a pipeline task, or the default MODEL when the task has none"""
+        return self.MODELS.get(task) or self.MODEL
+
+    def invoke_structured_llm(self, schema, messages, task):
+        """
+        Ask the model of a task for a structured output, timed as a tracing span
+
+        The span records the task, model, token usage and estimated cost,
+        next to what the same call would cost on the single large model every
+        task used before per-task tiers.
+        """
+        model = self.get_model(task)
+        structured_llm = model.with_structured_output(
+            schema,
+            method="function_calling",
+            include_raw=True
+        )
+
+        model_name = str(getattr(model, 'model_name', None) or getattr(model, 'model', None))
+        with span("llm.invoke", **{
+            'llm.task': task,
+            'llm.schema': schema.__name__,
+            'llm.model': model_name,
+            'llm.prompt_chars': sum(len(message["content"]) for message in messages),
+        }):
+            response = structured_llm.invoke(messages)
+
+            usage = getattr(response["raw"], 'usage_metadata', None)
+            if usage:
+                input_tokens, output_tokens = usage.get('input_tokens', 0), usage.get('output_tokens', 0)
+                cost = estimate_cost(model_name, input_tokens, output_tokens)
+                baseline_cost = estimate_cost(get_baseline_model(model_name), input_tokens, output_tokens)
+                set_span_attributes(**{
+                    'llm.input_tokens': input_tokens,
+                    'llm.output_tokens': output_tokens,
+                    'llm.cost_usd': round(cost, 6) if cost is not None else None,
+                    'llm.baseline_cost_usd': round(baseline_cost, 6) if baseline_cost is not None else None,
+                })
+
+            if response.get("parsing_error"):
+                raise response["parsing_error"]
+            return response["parsed"]
+
     def load_existing_structured_cv(self):
         """Load existing structured CV data if available"""
         try:
-            if os.path.exists(self.structured_cv_path):
-                with open(self.structured_cv_path, 'rb') as file:
-                    structured_cv = pickle.load(file)
+            structured_cv = cached_pickle_load(self.structured_cv_path)
+            if structured_cv is not None:
                 self.structured_cv = structured_cv
-                return structured_cv
-            return None
+            return structured_cv
         except Exception as e:
             print(f"Error loading existing structured CV: {e}")
             return None
@@ -97,12 +152,7 @@ class InformationExtractor:
             ]
 
             try:
-                structured_llm = self.MODEL.with_structured_output(
-                    Curriculum,
-                    method="function_calling"
-                )
-
-                structured_cv = structured_llm.invoke(messages)
+                structured_cv = self.invoke_structured_llm(Curriculum, messages, "extraction")
                 
                 # Validate the response
                 if structured_cv is None:
@@ -135,12 +185,10 @@ class InformationExtractor:
                     print(f"   - Model name: {self.MODEL.model_name}")
                 raise e
 
-            with open(self.structured_cv_path, 'wb') as f:
-                pickle.dump(structured_cv, f)
+            atomic_pickle_dump(structured_cv, self.structured_cv_path)
 
         else:
-            with open(self.structured_cv_path, 'rb') as file:
-                structured_cv = pickle.load(file)
+            structured_cv = cached_pickle_load(self.structured_cv_path)
 
         self.structured_cv = structured_cv
 
@@ -170,12 +218,7 @@ class InformationExtractor:
         ]
 
         try:
-            structured_llm = self.MODEL.with_structured_output(
-                CoverLetter,
-                method="function_calling"
-            )
-
-            cover_letter = structured_llm.invoke(messages)
+            cover_letter = self.invoke_structured_llm(CoverLetter, messages, "cover_letter")
             
             # Validate the response
             if cover_letter is None:
@@ -206,8 +249,7 @@ class InformationExtractor:
                 print(f"   - Model name: {self.MODEL.model_name}")
             raise e
 
-        with open(self.cover_letter_path, 'wb') as f:
-            pickle.dump(cover_letter, f)
+        atomic_pickle_dump(cover_letter, self.cover_letter_path)
 
         return cover_letter
 
@@ -234,16 +276,15 @@ class InformationExtractor:
 
             self.final_cover_letter = final_cover_letter
 
-            with open(f'{dest_dir}/final_cover_letter.pkl', 'wb') as f:
-                pickle.dump(final_cover_letter, f)
+            atomic_pickle_dump(final_cover_letter, f'{get_namespace_dir(self.namespace)}/final_cover_letter.pkl')
 
         cover_letter_builder = CoverLetterBuilder()
         html_content = cover_letter_builder.build_html_from_cover_letter(
             cover_letter=self.final_cover_letter,
-            template_id=template_id,
-            dest_dir=dest_dir
+            template_id=template_id
         )
         self.generated_html_cover_letter = html_content
+        self.cover_letter_template_id = template_id
 
         return self.generated_html_cover_letter
 
@@ -273,12 +314,7 @@ class InformationExtractor:
         ]
 
         try:
-            structured_llm = self.MODEL.with_structured_output(
-                NewCurriculum,
-                method="function_calling"
-            )
-
-            new_structured_cv = structured_llm.invoke(messages)
+            new_structured_cv = self.invoke_structured_llm(NewCurriculum, messages, "tailoring")
             
             # Validate the response
             if new_structured_cv is None:
@@ -309,7 +345,36 @@ class InformationExtractor:
                 print(f"   - Model name: {self.MODEL.model_name}")
             raise e
 
-        # Continue with JD extraction
+        # Continue with JD extraction, locally when the heuristics are confident enough
+        jd_information = self.extract_jd_locally(job_description)
+        if jd_information is None:
+            jd_information = self.extract_jd_with_llm(job_description)
+
+        atomic_pickle_dump(new_structured_cv, self.new_cv_path)
+
+        atomic_pickle_dump(jd_information, self.jd_information_path)
+
+        return new_structured_cv
+
+    def extract_jd_locally(self, job_description):
+        """Read the job title and company without an LLM call, or None when not confident"""
+        with span("jd.local_extract"):
+            job_title, company_name, confidence = extract_jd_information(job_description)
+            hit = confidence >= jd_local_confidence_threshold
+            set_span_attributes(**{'jd.local_confidence': round(confidence, 2), 'jd.local_hit': hit})
+
+        if not hit:
+            print(f"ℹ️ Local JD extraction not confident enough ({confidence:.2f}), asking the LLM")
+            return None
+
+        print("✅ JD extraction successful (local):")
+        print(f"   - Company: {company_name}")
+        print(f"   - Job Title: {job_title}")
+        self.jd_information = JobDescriptionInformation(job_title=job_title, company_name=company_name)
+        return self.jd_information
+
+    def extract_jd_with_llm(self, job_description):
+        """Ask the LLM for the job title and company of a job description"""
         user_message = f"""
             This is the Job Description:
             [JOB DESCRIPTION]
@@ -323,12 +388,7 @@ class InformationExtractor:
         ]
 
         try:
-            structured_llm = self.MODEL.with_structured_output(
-                JobDescriptionInformation,
-                method="function_calling"
-            )
-
-            jd_information = structured_llm.invoke(messages)
+            jd_information = self.invoke_structured_llm(JobDescriptionInformation, messages, "jd_parsing")
             
             # Validate JD response
             if jd_information is None:
@@ -351,13 +411,7 @@ class InformationExtractor:
             print(f"   - Messages sent to LLM: {messages}")
             raise e
 
-        with open(self.new_cv_path, 'wb') as f:
-            pickle.dump(new_structured_cv, f)
-
-        with open(self.jd_information_path, 'wb') as f:
-            pickle.dump(jd_information, f)
-
-        return new_structured_cv
+        return jd_information
 
     def update_jd_from_cover_letter(self, cover_letter):
         """
@@ -374,8 +428,7 @@ class InformationExtractor:
         
         # Save updated information
         try:
-            with open(self.jd_information_path, 'wb') as f:
-                pickle.dump(self.jd_information, f)
+            atomic_pickle_dump(self.jd_information, self.jd_information_path)
             
             print("✅ Job description information updated from cover letter:")
             print(f"   - Job Title: {self.jd_information.job_title}")
@@ -389,33 +442,57 @@ class InformationExtractor:
     def build_final_cv(self, update_final_cv=False, template_id="1"):
 
         if not update_final_cv:
+            # Edits of the final CV are made in place, so it must not share objects with the portfolio
+            self.tailored_portfolio = self.structured_cv.model_copy(deep=True)
+            portfolio = self.structured_cv.model_copy(deep=True)
             final_CV = FinalCurriculum(
-                personality=self.structured_cv.personality,
-                job_title=self.structured_cv.personality.job_title,  # self.new_cv.job_title,
+                personality=portfolio.personality,
+                job_title=portfolio.personality.job_title,  # self.new_cv.job_title,
                 summary=self.new_cv.summary,
                 experiences=self.new_cv.experiences,
                 projects=self.new_cv.projects,
-                hard_skills=self.structured_cv.hard_skills,
-                soft_skills=self.structured_cv.soft_skills,
-                education=self.structured_cv.education
+                hard_skills=portfolio.hard_skills,
+                soft_skills=portfolio.soft_skills,
+                education=portfolio.education
             )
 
             self.final_cv = final_CV
 
-            with open(f'{dest_dir}/final_cv.pkl', 'wb') as f:
-                pickle.dump(final_CV, f)
+            atomic_pickle_dump(final_CV, f'{get_namespace_dir(self.namespace)}/final_cv.pkl')
 
         cv_builder = CVBuilder()
         html_content = cv_builder.build_html_from_cv(
             cv=self.final_cv,
-            template_id=template_id,
-            dest_dir=dest_dir
+            template_id=template_id
         )
         self.generated_html = html_content
+        self.cv_template_id = template_id
 
         return self.generated_html
 
-    def create_pdf(self):
+    def get_rendered_documents(self, cv_template_id=None, cover_letter_template_id=None):
+        """
+        Templates and final HTML of the current documents, as stored with a submission
+
+        The HTML is rebuilt from the final objects, so edits made in place
+        since the last build_final_cv/build_final_cover_letter are included.
+        Templates that are not given stay the last ones used.
+        """
+        self.cv_template_id = cv_template_id or self.cv_template_id
+        self.cover_letter_template_id = cover_letter_template_id or self.cover_letter_template_id
+        self.generated_html = CVBuilder().build_html_from_cv(self.final_cv, self.cv_template_id)
+        self.generated_html_cover_letter = CoverLetterBuilder().build_html_from_cover_letter(
+            self.final_cover_letter, self.cover_letter_template_id
+        )
+        return {
+            'cv_template_id': self.cv_template_id,
+            'cover_letter_template_id': self.cover_letter_template_id,
+            'cv_html': self.generated_html,
+            'cover_letter_html': self.generated_html_cover_letter,
+        }
+
+    def create_pdf(self, cv_template_id=None, cover_letter_template_id=None):
+        """Save the final documents, rendered with the given templates, as a new submission; return its id"""
         # Validate job description information before saving to database
         if not self.jd_information:
             raise ValueError("Job description information is missing. Please ensure job description was processed.")
@@ -440,15 +517,19 @@ class InformationExtractor:
         # Save structured objects to database instead of generating PDF files
         from support.submission_manager import save_submission
         
-        save_submission(
+        submission_id = save_submission(
             self.jd_information.company_name,
             self.jd_information.job_title,
             self.final_cv,
             self.final_cover_letter,
-            self.jd_information
+            self.jd_information,
+            namespace=self.namespace,
+            portfolio=self.tailored_portfolio,
+            **self.get_rendered_documents(cv_template_id, cover_letter_template_id)
         )
         
         print("✅ Submission saved to database successfully!")
         print("   - CV object saved")
         print("   - Cover letter object saved")
         print("   - Job description information saved")
+        return submission_id
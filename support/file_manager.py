@@ -1,79 +1,180 @@
+import hashlib
 import os
-import pickle
+import re
+import sqlite3
 from datetime import datetime
-from support.settings import dest_dir
+from support.namespace_manager import check_upload_quota, get_namespace_dir
+from support.persistence import (
+    atomic_pickle_dump, atomic_write_bytes, cached_pickle_load, file_lock, file_stamp,
+    invalidate_cached
+)
+
+
+UPLOADS_MANIFEST_VERSION = 1
+
+
+def _scan_uploaded_files(uploaded_files_dir):
+    """Describe the files of an uploads directory that predate the manifest"""
+    for filename in os.listdir(uploaded_files_dir):
+        # Skip lock and in-flight temporary files of atomic writes
+        if filename.startswith('.'):
+            continue
+        file_path = os.path.join(uploaded_files_dir, filename)
+        if os.path.isfile(file_path):
+            with open(file_path, 'rb') as f:
+                sha256 = hashlib.file_digest(f, "sha256").hexdigest()
+            yield (
+                filename,
+                # Strip the "%Y%m%d_%H%M%S_" prefix added by save_uploaded_file
+                re.sub(r"^\d{8}_\d{6}_", "", filename),
+                os.path.getsize(file_path),
+                sha256,
+                datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat(),
+            )
 
 
 class FileManager:
     """Manages uploaded CV files and portfolio data"""
     
-    def __init__(self):
-        self.uploaded_files_dir = f"{dest_dir}/uploaded_files"
+    def __init__(self, namespace=None):
+        self.namespace = namespace
+        namespace_dir = get_namespace_dir(namespace)
+        self.uploaded_files_dir = f"{namespace_dir}/uploaded_files"
+        self.manifest_path = f"{namespace_dir}/uploads_manifest.db"
         # Use the same path as extractor's structured_cv_path
-        self.portfolio_dir = dest_dir
+        self.portfolio_dir = namespace_dir
         self._ensure_directories()
     
     def _ensure_directories(self):
         """Create necessary directories if they don't exist"""
         os.makedirs(self.uploaded_files_dir, exist_ok=True)
         # Portfolio directory is the same as dest_dir, so no need to create
+
+    def _connect_manifest(self):
+        """Open the uploads manifest, creating and backfilling it on first use"""
+        conn = sqlite3.connect(self.manifest_path, timeout=30)
+        if conn.execute("PRAGMA user_version").fetchone()[0] < UPLOADS_MANIFEST_VERSION:
+            with conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS uploads (
+                        filename TEXT PRIMARY KEY,
+                        original_name TEXT NOT NULL,
+                        size INTEGER NOT NULL,
+                        sha256 TEXT NOT NULL,
+                        uploaded_at TEXT NOT NULL,
+                        portfolio_version TEXT
+                    )
+                """)
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_uploads_uploaded_at ON uploads (uploaded_at)")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_uploads_sha256 ON uploads (sha256)")
+                # Files uploaded before the manifest existed
+                conn.executemany("""
+                    INSERT OR IGNORE INTO uploads (filename, original_name, size, sha256, uploaded_at)
+                    VALUES (?, ?, ?, ?, ?)
+                """, _scan_uploaded_files(self.uploaded_files_dir))
+                conn.execute(f"PRAGMA user_version = {UPLOADS_MANIFEST_VERSION}")
+        return conn
+
+    def _file_info(self, row):
+        """Build the metadata dict of a manifest row"""
+        filename, original_name, size, sha256, uploaded_at, portfolio_version = row
+        return {
+            'filename': filename,
+            'path': os.path.join(self.uploaded_files_dir, filename),
+            'size': size,
+            'modified': datetime.fromisoformat(uploaded_at),
+            'original_name': original_name,
+            'sha256': sha256,
+            'portfolio_version': portfolio_version,
+        }
     
     def save_uploaded_file(self, uploaded_file, original_filename):
         """Save uploaded file to the uploaded_files directory"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        safe_filename = f"{timestamp}_{original_filename}"
-        file_path = os.path.join(self.uploaded_files_dir, safe_filename)
-        
-        with open(file_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
-        
+        # The quota check, write and manifest insert happen under one lock, so
+        # concurrent uploads cannot both pass the quota
+        with file_lock(self.manifest_path):
+            check_upload_quota(self.get_uploaded_files_size(), uploaded_file.size)
+
+            uploaded_at = datetime.now()
+            timestamp = uploaded_at.strftime("%Y%m%d_%H%M%S")
+            safe_filename = f"{timestamp}_{original_filename}"
+            file_path = os.path.join(self.uploaded_files_dir, safe_filename)
+
+            data = uploaded_file.getbuffer()
+            atomic_write_bytes(file_path, data)
+
+            with self._connect_manifest() as conn:
+                conn.execute("""
+                    INSERT OR REPLACE INTO uploads (filename, original_name, size, sha256, uploaded_at)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (safe_filename, original_filename, len(data),
+                      hashlib.sha256(data).hexdigest(), uploaded_at.isoformat()))
+
         return file_path, safe_filename
+
+    def find_duplicate_upload(self, uploaded_file):
+        """Get the metadata of an earlier upload with the same content, or None"""
+        sha256 = hashlib.sha256(uploaded_file.getbuffer()).hexdigest()
+        with self._connect_manifest() as conn:
+            row = conn.execute("""
+                SELECT filename, original_name, size, sha256, uploaded_at, portfolio_version
+                FROM uploads WHERE sha256 = ? ORDER BY uploaded_at DESC LIMIT 1
+            """, (sha256,)).fetchone()
+        return self._file_info(row) if row else None
+
+    def link_portfolio_version(self, filename, portfolio_version):
+        """Record which portfolio version was extracted from an upload"""
+        with self._connect_manifest() as conn:
+            conn.execute(
+                "UPDATE uploads SET portfolio_version = ? WHERE filename = ?",
+                (portfolio_version, filename)
+            )
     
-    def get_uploaded_files(self):
-        """Get list of all uploaded files with metadata"""
-        files = []
-        if os.path.exists(self.uploaded_files_dir):
-            for filename in os.listdir(self.uploaded_files_dir):
-                file_path = os.path.join(self.uploaded_files_dir, filename)
-                if os.path.isfile(file_path):
-                    stat = os.stat(file_path)
-                    files.append({
-                        'filename': filename,
-                        'path': file_path,
-                        'size': stat.st_size,
-                        'modified': datetime.fromtimestamp(stat.st_mtime),
-                        'original_name': filename.split('_', 1)[1] 
-                        if '_' in filename else filename
-                    })
-        
-        # Sort by modification time (newest first)
-        files.sort(key=lambda x: x['modified'], reverse=True)
-        return files
+    def get_uploaded_files(self, limit=None, offset=0):
+        """Get a page of uploaded files with metadata (newest first)"""
+        with self._connect_manifest() as conn:
+            rows = conn.execute("""
+                SELECT filename, original_name, size, sha256, uploaded_at, portfolio_version
+                FROM uploads ORDER BY uploaded_at DESC, filename DESC LIMIT ? OFFSET ?
+            """, (-1 if limit is None else limit, offset)).fetchall()
+        return [self._file_info(row) for row in rows]
+
+    def count_uploaded_files(self):
+        """Count the uploaded files"""
+        with self._connect_manifest() as conn:
+            return conn.execute("SELECT COUNT(*) FROM uploads").fetchone()[0]
+    
+    def get_uploaded_files_size(self):
+        """Get the total size in bytes of all uploaded files"""
+        with self._connect_manifest() as conn:
+            return conn.execute("SELECT COALESCE(SUM(size), 0) FROM uploads").fetchone()[0]
     
     def delete_uploaded_file(self, filename):
         """Delete a specific uploaded file"""
         file_path = os.path.join(self.uploaded_files_dir, filename)
+        with self._connect_manifest() as conn:
+            removed = conn.execute("DELETE FROM uploads WHERE filename = ?", (filename,)).rowcount
         if os.path.exists(file_path):
             os.remove(file_path)
+            invalidate_cached(file_path)
             return True
-        return False
+        return bool(removed)
     
     def save_portfolio_data(self, structured_cv, filename="structured_cv.pkl"):
         """Save portfolio data to the same location as extractor's 
-        structured_cv_path"""
+        structured_cv_path and record it as a portfolio snapshot"""
+        from support.submission_manager import save_portfolio_snapshot
+
         file_path = os.path.join(self.portfolio_dir, filename)
-        with open(file_path, 'wb') as f:
-            pickle.dump(structured_cv, f)
+        atomic_pickle_dump(structured_cv, file_path)
+        save_portfolio_snapshot(structured_cv, self.namespace)
         return file_path
     
-    def load_portfolio_data(self, filename="structured_cv.pkl"):
+    def load_portfolio_data(self, filename="structured_cv.pkl", mutable=False):
         """Load portfolio data from the same location as extractor's 
-        structured_cv_path"""
+        structured_cv_path; pass mutable=True for a copy that may be edited"""
         file_path = os.path.join(self.portfolio_dir, filename)
-        if os.path.exists(file_path):
-            with open(file_path, 'rb') as f:
-                return pickle.load(f)
-        return None
+        return cached_pickle_load(file_path, mutable=mutable)
     
     def has_portfolio_data(self, filename="structured_cv.pkl"):
         """Check if portfolio data exists in the same location as 
@@ -84,22 +185,18 @@ class FileManager:
     def get_portfolio_files(self):
         """Get list of portfolio data files from the same location as 
         extractor"""
+        # Only the extractor's structured_cv.pkl is portfolio data, so stat it
+        # directly instead of listing the whole directory on every rerun
         files = []
-        if os.path.exists(self.portfolio_dir):
-            for filename in os.listdir(self.portfolio_dir):
-                # Only include pickle files that could be portfolio data
-                if filename.lower() == "structured_cv.pkl":
-                # if (filename.endswith('.pkl') and 
-                #         'cv' in filename.lower()):
-                    file_path = os.path.join(self.portfolio_dir, filename)
-                    if os.path.isfile(file_path):
-                        stat = os.stat(file_path)
-                        files.append({
-                            'filename': filename,
-                            'path': file_path,
-                            'size': stat.st_size,
-                            'modified': datetime.fromtimestamp(stat.st_mtime)
-                        })
-        
-        files.sort(key=lambda x: x['modified'], reverse=True)
+        filename = "structured_cv.pkl"
+        file_path = os.path.join(self.portfolio_dir, filename)
+        stamp = file_stamp(file_path)
+        if stamp is not None:
+            mtime_ns, size, _ = stamp
+            files.append({
+                'filename': filename,
+                'path': file_path,
+                'size': size,
+                'modified': datetime.fromtimestamp(mtime_ns / 1e9)
+            })
         return files
@@ -0,0 +1,71 @@
+import hashlib
+import html
+from functools import lru_cache
+from string import Formatter
+
+from support.html_templates.html_templates import CVTemplates, CoverLetterTemplates
+
+
+TEMPLATE_SOURCES = {
+    "cv": CVTemplates,
+    "cover_letter": CoverLetterTemplates,
+}
+
+
+class SafeHTML(str):
+    """String holding markup that is already escaped and must be injected as is"""
+
+
+def escape(value):
+    """Escape a value for HTML output, leaving SafeHTML fragments untouched"""
+    if value is None:
+        return ''
+    if isinstance(value, SafeHTML):
+        return value
+    return html.escape(str(value), quote=True)
+
+
+class CompiledTemplate:
+    """Template parsed once into literal segments and placeholder names"""
+
+    def __init__(self, template_string):
+        # Identifies the template source, e.g. in cache keys of rendered output
+        self.digest = hashlib.sha256(template_string.encode("utf-8")).hexdigest()
+        segments = []
+        literal_parts = []
+        for literal, field_name, format_spec, conversion in Formatter().parse(template_string):
+            literal_parts.append(literal)
+            if field_name is None:
+                continue
+            if not field_name or format_spec or conversion:
+                raise ValueError(f"Unsupported placeholder '{{{field_name}}}' in template")
+            segments.append((''.join(literal_parts), field_name))
+            literal_parts = []
+
+        self.segments = tuple(segments)
+        self.tail = ''.join(literal_parts)
+        self.fields = frozenset(field_name for _, field_name in self.segments)
+
+    def prepare(self, data):
+        """Return the escaped value of every placeholder used by the template"""
+        return {field_name: escape(data[field_name]) for field_name in self.fields}
+
+    def render(self, data):
+        """Render the template, escaping every value that is not SafeHTML"""
+        values = self.prepare(data)
+        parts = []
+        for literal, field_name in self.segments:
+            parts.append(literal)
+            parts.append(values[field_name])
+        parts.append(self.tail)
+        return ''.join(parts)
+
+
+@lru_cache(maxsize=None)
+def get_template(kind, template_id):
+    """Compile a template once per process; returns None if it does not exist"""
+    templates = TEMPLATE_SOURCES.get(kind)
+    template_method = getattr(templates, f"template_{template_id}", None) if templates else None
+    if not template_method:
+        return None
+    return CompiledTemplate(template_method())
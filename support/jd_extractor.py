@@ -0,0 +1,141 @@
+import re
+
+# Words that end (or make up) a job title
+ROLE_NOUNS = frozenset("""
+accountant administrator advisor analyst architect assistant associate consultant coordinator designer
+developer director engineer executive head intern lead manager marketer officer programmer recruiter
+representative researcher scientist specialist strategist technician tester writer
+""".split())
+# Legal forms that identify a company name
+COMPANY_SUFFIXES = (
+    "inc", "inc.", "ltd", "ltd.", "llc", "gmbh", "ag", "plc", "corp", "corp.", "corporation", "co.",
+    "s.p.a.", "spa", "srl", "s.r.l.", "sa", "s.a.", "bv", "b.v.", "nv", "oy", "ab", "limited",
+)
+# Labeled lines, e.g. "Position: Data Engineer" or "Company - Acme"
+TITLE_LABEL = re.compile(r"^(?:job\s+title|position|role|job|title|vacancy)\s*[:\-–|]\s*(.+)$", re.IGNORECASE)
+COMPANY_LABEL = re.compile(r"^(?:company(?:\s+name)?|employer|organi[sz]ation|client|hiring\s+company)\s*[:\-–|]\s*(.+)$",
+                           re.IGNORECASE)
+# "Senior Engineer at Acme", "Senior Engineer - Acme", "Senior Engineer | Acme"
+HEADING_WITH_COMPANY = re.compile(r"^(.+?)\s+(?:at|@|-|–|—|\|)\s+(.+)$", re.IGNORECASE)
+LOOKING_FOR = re.compile(
+    r"\b(?:looking\s+for|hiring|seeking|searching\s+for|recruiting)\s+(?:an?\s+|our\s+next\s+|a\s+new\s+)?"
+    r"((?:[A-Z][\w+#/-]*(?:\.\w+)*\s+){0,5}[A-Z][\w+#/-]*(?:\.\w+)*)"
+)
+COMPANY_SENTENCE = re.compile(
+    r"(?:^|[.!?]\s+)((?:[A-Z][\w&.'-]*\s+){0,3}[A-Z][\w&.'-]*)\s+(?:is|are)\s+"
+    r"(?:looking|hiring|seeking|searching|recruiting|an?\s+(?:leading|global|fast|growing|innovative))",
+    re.MULTILINE
+)
+JOIN_COMPANY = re.compile(r"\bjoin\s+((?:[A-Z][\w&.'-]*\s+){0,3}[A-Z][\w&.'-]*)")
+ABOUT_COMPANY = re.compile(r"^about\s+(.+)$", re.IGNORECASE)
+# Gender and location tags appended to titles, e.g. "(m/f/d)" or "- Remote"
+TITLE_NOISE = re.compile(r"\s*(?:\((?:[mwfdx]\s*/\s*)+[mwfdx]\)|\((?:remote|hybrid|on-?site)[^)]*\)|[-–|]\s*(?:remote|hybrid|on-?site)\b.*)$",
+                         re.IGNORECASE)
+GENERIC_WORDS = frozenset({"us", "the company", "the role", "the team", "the job", "the position", "you", "our team"})
+
+
+def _clean(value):
+    """Strip Markdown emphasis, tags and punctuation around an extracted value"""
+    value = re.sub(r"[*_#`>]+", "", value or "").strip()
+    value = TITLE_NOISE.sub("", value)
+    return value.strip(" \t.,:;!-–|\"'")
+
+
+def _is_title(value):
+    words = value.lower().replace("/", " ").split()
+    return 0 < len(words) <= 8 and any(word.strip("(),") in ROLE_NOUNS for word in words)
+
+
+def _is_company(value):
+    if not value or value.lower() in GENERIC_WORDS or len(value.split()) > 6:
+        return False
+    return value[0].isupper() or value[0].isdigit()
+
+
+def _has_company_suffix(value):
+    return value.lower().split()[-1] in COMPANY_SUFFIXES if value else False
+
+
+def _lines(job_description):
+    return [_clean(line) for line in job_description.splitlines() if _clean(line)]
+
+
+def _title_candidates(job_description, lines):
+    for line in lines[:15]:
+        match = TITLE_LABEL.match(line)
+        if match and _is_title(_clean(match.group(1))):
+            yield _clean(match.group(1)), 0.95, "label"
+
+    if lines:
+        heading = lines[0]
+        split = HEADING_WITH_COMPANY.match(heading)
+        if split and _is_title(_clean(split.group(1))):
+            yield _clean(split.group(1)), 0.9, "heading"
+        elif _is_title(heading):
+            yield heading, 0.85, "heading"
+
+    for match in LOOKING_FOR.finditer(job_description):
+        if _is_title(_clean(match.group(1))):
+            yield _clean(match.group(1)), 0.8, "sentence"
+
+
+def _company_candidates(job_description, lines):
+    for line in lines[:15]:
+        match = COMPANY_LABEL.match(line)
+        if match and _is_company(_clean(match.group(1))):
+            yield _clean(match.group(1)), 0.95, "label"
+
+    if lines:
+        split = HEADING_WITH_COMPANY.match(lines[0])
+        if split and _is_title(_clean(split.group(1))) and _is_company(_clean(split.group(2))):
+            yield _clean(split.group(2)), 0.9, "heading"
+
+    for line in lines:
+        match = ABOUT_COMPANY.match(line)
+        if match and _is_company(_clean(match.group(1))):
+            yield _clean(match.group(1)), 0.85, "about"
+
+    for pattern, confidence in ((COMPANY_SENTENCE, 0.8), (JOIN_COMPANY, 0.7)):
+        for match in pattern.finditer(job_description):
+            value = _clean(match.group(1))
+            if _is_company(value) and value.lower() not in ("we", "you", "our") and not _is_title(value):
+                yield value, confidence, "sentence"
+
+
+def _best(candidates, boost_suffix=False):
+    """
+    Pick the most confident candidate value
+
+    Rules that agree on the same value raise its confidence, and so does a
+    legal form such as Inc. or GmbH for company names.
+    """
+    scores = {}
+    for value, confidence, _ in candidates:
+        key = value.lower()
+        if boost_suffix and _has_company_suffix(value):
+            confidence += 0.05
+        if key in scores:
+            best_value, best_confidence = scores[key]
+            scores[key] = (best_value, max(best_confidence, confidence) + 0.05)
+        else:
+            scores[key] = (value, confidence)
+    if not scores:
+        return None, 0.0
+    value, confidence = max(scores.values(), key=lambda item: item[1])
+    return value, min(confidence, 0.99)
+
+
+def extract_jd_information(job_description):
+    """
+    Find the job title and company name of a job description without an LLM
+
+    Headings, labeled lines and common phrasings are matched against a small
+    rules table. Returns (job title, company name, confidence); the confidence
+    is the lower of the two, and 0.0 when either is missing.
+    """
+    lines = _lines(job_description or "")
+    job_title, title_confidence = _best(_title_candidates(job_description or "", lines))
+    company_name, company_confidence = _best(_company_candidates(job_description or "", lines), boost_suffix=True)
+    if not job_title or not company_name:
+        return job_title, company_name, 0.0
+    return job_title, company_name, min(title_confidence, company_confidence)
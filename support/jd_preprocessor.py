@@ -0,0 +1,240 @@
+import functools
+import re
+import threading
+import unicodedata
+from support.keyword_matcher import extract_terms
+from support.tracing import set_span_attributes, traced
+
+# Paragraphs saying nothing about the job itself, matched on their text
+BOILERPLATE_PATTERNS = {
+    "equal opportunity statement": re.compile(
+        r"\bequal (?:employment )?opportunit|\bwithout regard to\b|\bregardless of (?:their )?(?:race|gender|age|"
+        r"religion|sex|sexual|background)|\bwe (?:do not|don't) discriminate\b|\breasonable accommodations?\b|"
+        r"\bprotected (?:veteran|characteristic)", re.IGNORECASE
+    ),
+    "cookie banner": re.compile(
+        r"\b(?:we|this (?:site|website)) uses? cookies\b|\baccept (?:all )?cookies\b|\bcookie (?:policy|settings|"
+        r"preferences)\b|\bmanage (?:your )?cookies\b", re.IGNORECASE
+    ),
+    "privacy notice": re.compile(
+        r"\bprivacy (?:policy|notice|statement)\b|\bprocessing of (?:your )?personal data\b|\bdata protection\b|"
+        r"\bGDPR\b", re.IGNORECASE
+    ),
+    "application instructions": re.compile(
+        r"\bclick (?:on )?(?:the )?[\"']?apply\b|\bapply now\b|\bsend (?:us )?your (?:cv|resume|application)\b|"
+        r"\bsubmit your (?:cv|resume|application)\b|\bapplications? (?:are|will be) reviewed\b|"
+        r"\bonly shortlisted candidates\b", re.IGNORECASE
+    ),
+    "recruitment agencies": re.compile(r"\brecruit(?:ment|ing) agenc|\bunsolicited (?:resumes|cvs)\b", re.IGNORECASE),
+    "social links": re.compile(r"\bshare this job\b|\bfollow us on\b|\bjob id\s*[:#]", re.IGNORECASE),
+}
+# Sections whose heading marks them as boilerplate
+SECTION_PATTERNS = {
+    "benefits": re.compile(
+        r"^(?:(?:our |the )?benefits|perks(?: (?:and|&) benefits)?|what we offer|what's in it for you|we offer|"
+        r"our offer|why (?:join|work (?:with|for)) us|compensation (?:and|&) benefits)\b", re.IGNORECASE
+    ),
+    "about the company": re.compile(r"^(?:about|who we are|our (?:story|company|mission))\b", re.IGNORECASE),
+    "equal opportunity statement": re.compile(r"^(?:equal (?:employment )?opportunity|eeo|diversity)\b", re.IGNORECASE),
+    "company culture": re.compile(r"^(?:our (?:values|culture)|life at)\b", re.IGNORECASE),
+    "application instructions": re.compile(r"^(?:how to apply|application process|next steps)\b", re.IGNORECASE),
+}
+# "About the role" and "About you" describe the job, not the company
+ABOUT_THE_JOB = re.compile(r"^about (?:the |this )?(?:role|position|job|you|opportunity|team)\b", re.IGNORECASE)
+# Words signalling tasks and requirements
+RELEVANCE_CUES = re.compile(
+    r"\b(?:experience[sd]?|years?|require[sd]?|requirements?|responsib\w*|must|skills?|proficien\w*|knowledge|"
+    r"familiar\w*|degree|qualif\w*|you will|you'll|develop\w*|design\w*|build\w*|maintain\w*|lead\w*|"
+    r"implement\w*|nice to have|plus)\b", re.IGNORECASE
+)
+# Boilerplate paragraphs at or above this relevance are kept anyway, except
+# for page chrome that never describes the job
+RELEVANCE_THRESHOLD = 0.25
+ALWAYS_REMOVED = frozenset({"cookie banner", "social links"})
+# Later paragraphs of an "About us" section only go when they talk about the company
+COMPANY_VOICE = re.compile(r"\b(?:we|our|us)\b", re.IGNORECASE)
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+ZERO_WIDTH = re.compile(r"[\u200b\u200c\u200d\u2060\ufeff]")
+BULLETS = re.compile(r"^[ \t]*[\u2022\u00b7\u25aa\u25cf\u25e6\u2023\u2219\u2013]\s*", re.MULTILINE)
+
+_encoder_thread = None
+_encoder_thread_lock = threading.Lock()
+
+
+def normalize_text(text):
+    """Normalize unicode, whitespace and bullets of pasted text"""
+    text = ZERO_WIDTH.sub("", unicodedata.normalize("NFKC", text or ""))
+    text = text.replace("\r\n", "\n").replace("\r", "\n").replace("\t", " ")
+    text = BULLETS.sub("- ", text)
+    text = re.sub(r" {2,}", " ", text)
+    text = "\n".join(line.rstrip() for line in text.split("\n"))
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def _heading_text(line):
+    return re.sub(r"[*_#`]+", "", line).strip().rstrip(":").strip()
+
+
+def _is_heading(line, opens_paragraph=True):
+    """
+    Short lines without sentence punctuation, e.g. "## Benefits" or "What we offer:"
+
+    Unmarked lines only count at the start of a paragraph, so list items
+    such as "Learning Budget" do not open a new section.
+    """
+    text = _heading_text(line)
+    if not text or line.lstrip().startswith("- ") or len(text.split()) > 8 or text[-1] in ".!?,;":
+        return False
+    if line.lstrip().startswith(("#", "**")) or line.rstrip().endswith(":") or text.isupper():
+        return True
+    return opens_paragraph and len(text.split()) <= 6
+
+
+def split_blocks(text):
+    """Split normalized text into (section heading, paragraph) blocks; headings open new blocks"""
+    blocks = []
+    heading = ""
+    paragraph = []
+
+    def flush():
+        if paragraph:
+            blocks.append((heading, "\n".join(paragraph)))
+            paragraph.clear()
+
+    for line in text.split("\n"):
+        if not line.strip():
+            flush()
+        elif _is_heading(line, opens_paragraph=not paragraph):
+            flush()
+            heading = _heading_text(line)
+            paragraph.append(line)
+        else:
+            paragraph.append(line)
+    flush()
+    return blocks
+
+
+def relevance_score(paragraph):
+    """Share of the words of a paragraph that are requirement cues or skill-like terms"""
+    words = len(paragraph.split())
+    if not words:
+        return 0.0
+    return min(1.0, (len(RELEVANCE_CUES.findall(paragraph)) + len(extract_terms(paragraph))) / words)
+
+
+def _boilerplate_reason(heading, paragraph):
+    for reason, pattern in BOILERPLATE_PATTERNS.items():
+        if pattern.search(paragraph):
+            return reason
+    if heading and not ABOUT_THE_JOB.match(heading):
+        for reason, pattern in SECTION_PATTERNS.items():
+            if pattern.match(heading):
+                return reason
+    return None
+
+
+@functools.lru_cache(maxsize=1)
+def _get_encoder():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        # tiktoken comes with langchain_openai but downloads its vocabulary on first use
+        print(f"⚠️ tiktoken unavailable ({e}), estimating 4 characters per token")
+        return None
+
+
+def prefetch_encoder():
+    """Start loading the tiktoken encoding in a background thread, once per process"""
+    global _encoder_thread
+    with _encoder_thread_lock:
+        if _encoder_thread is None:
+            _encoder_thread = threading.Thread(target=_get_encoder, daemon=True)
+            _encoder_thread.start()
+
+
+def encoder_ready():
+    """Check if the tiktoken encoding is loaded (or known to be unavailable)"""
+    return _get_encoder.cache_info().currsize > 0
+
+
+def _ready_encoder():
+    """
+    The tiktoken encoding if it is loaded, or None to estimate token counts
+
+    The encoding may have to download its vocabulary, so it is loaded in the
+    background and counts are estimated until it is ready.
+    """
+    prefetch_encoder()
+    return _get_encoder() if encoder_ready() else None
+
+
+def _count_tokens(encoder, text):
+    if encoder is None:
+        return len(text or "") // 4
+    return len(encoder.encode(text or "", disallowed_special=()))
+
+
+def count_tokens(text):
+    """Count the tokens of a text with tiktoken, or estimate them at four characters per token"""
+    return _count_tokens(_ready_encoder(), text)
+
+
+@traced("jd.preprocess")
+def preprocess_job_description(job_description):
+    """
+    Strip boilerplate from a job description before it is sent to the model
+
+    Normalizes the text, drops repeated paragraphs and removes boilerplate
+    blocks (EEO statements, benefits, cookie banners, ...) unless they score
+    as relevant to the job. "About us" sections are cut to their first
+    sentence, which usually names the company. Returns the cleaned text, the
+    removed blocks with their reason and the token counts before and after.
+    """
+    normalized = normalize_text(job_description)
+    kept, removed = [], []
+    seen = set()
+    # "About us" sections whose introducing sentence is already kept
+    introduced = set()
+
+    for heading, paragraph in split_blocks(normalized):
+        key = re.sub(r"\W+", " ", paragraph.lower()).strip()
+        if len(key.split()) >= 3 and key in seen:
+            removed.append({'reason': "duplicate", 'text': paragraph})
+            continue
+        seen.add(key)
+
+        reason = _boilerplate_reason(heading, paragraph)
+        if reason is None or (reason not in ALWAYS_REMOVED and relevance_score(paragraph) >= RELEVANCE_THRESHOLD):
+            kept.append(paragraph)
+        elif reason == "about the company" and heading not in introduced:
+            # Keep the heading and the sentence introducing the company
+            lines = paragraph.split("\n")
+            heading_lines = lines[:1] if _is_heading(lines[0]) else []
+            content = " ".join(lines[len(heading_lines):]).strip()
+            sentences = SENTENCE_END.split(content, maxsplit=1) if content else []
+            kept.append("\n".join(heading_lines + sentences[:1]))
+            if len(sentences) > 1:
+                removed.append({'reason': reason, 'text': sentences[1]})
+            if sentences:
+                introduced.add(heading)
+        elif reason == "about the company" and not COMPANY_VOICE.search(paragraph):
+            kept.append(paragraph)
+        else:
+            removed.append({'reason': reason, 'text': paragraph})
+
+    text = "\n\n".join(paragraph for paragraph in kept if paragraph)
+    # Both counts use the same encoder, which may finish loading in between
+    encoder = _ready_encoder()
+    result = {
+        'text': text,
+        'removed': removed,
+        'tokens_before': _count_tokens(encoder, job_description),
+        'tokens_after': _count_tokens(encoder, text),
+    }
+    set_span_attributes(**{
+        'jd.tokens_before': result['tokens_before'],
+        'jd.tokens_after': result['tokens_after'],
+        'jd.removed_blocks': len(removed),
+    })
+    return result
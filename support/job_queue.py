@@ -0,0 +1,322 @@
+import argparse
+import os
+import pickle
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+from support.settings import dest_dir, job_retention_hours, job_workers
+from support.profiling import is_profiling_enabled, profile_run
+from support.tracing import new_trace_id, span, use_trace
+
+JOBS_DB_PATH = f"{dest_dir}/jobs.db"
+POLL_INTERVAL = 0.5
+# A running job renews its lease every HEARTBEAT_INTERVAL seconds; one not
+# renewed for HEARTBEAT_TIMEOUT seconds lost its worker
+HEARTBEAT_INTERVAL = 5
+HEARTBEAT_TIMEOUT = 30
+# Idle workers fail orphaned jobs and delete expired ones this often (seconds)
+MAINTENANCE_INTERVAL = 60
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# Job kind -> handler(payload) -> result, filled by @job_handler in support.jobs
+HANDLERS = {}
+
+_workers = []
+_workers_lock = threading.Lock()
+
+
+def job_handler(kind):
+    """Register a function as the handler of a job kind"""
+    def decorator(func):
+        HANDLERS[kind] = func
+        return func
+    return decorator
+
+
+def _connect():
+    conn = sqlite3.connect(JOBS_DB_PATH, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+def initialize_jobs_db():
+    """Initialize the jobs database and create tables if they don't exist"""
+    os.makedirs(os.path.dirname(JOBS_DB_PATH), exist_ok=True)
+
+    with _connect() as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                dedupe_key TEXT UNIQUE,
+                status TEXT NOT NULL,
+                payload BLOB,
+                result BLOB,
+                error TEXT,
+                worker_pid INTEGER,
+                created_at TEXT NOT NULL,
+                started_at TEXT,
+                heartbeat_at TEXT,
+                finished_at TEXT
+            )
+        """)
+        # Databases created before job leases existed
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(jobs)")]
+        if "heartbeat_at" not in columns:
+            conn.execute("ALTER TABLE jobs ADD COLUMN heartbeat_at TEXT")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, id)")
+        conn.commit()
+
+
+def submit_job(kind, payload, dedupe_key=None):
+    """
+    Queue a job and return its id
+
+    Submitting again with the same dedupe_key returns the id of the existing
+    job instead of queuing a second one, so a job runs exactly once even if
+    the page that submitted it reruns. The key is free again once the job is
+    deleted (see delete_job and purge_finished_jobs).
+    """
+    initialize_jobs_db()
+
+    with _connect() as conn:
+        cursor = conn.execute("""
+            INSERT OR IGNORE INTO jobs (kind, dedupe_key, status, payload, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, (kind, dedupe_key, QUEUED, pickle.dumps(payload), datetime.now().isoformat()))
+        conn.commit()
+        if cursor.rowcount:
+            return cursor.lastrowid
+        return conn.execute(
+            "SELECT id FROM jobs WHERE dedupe_key = ?", (dedupe_key,)
+        ).fetchone()[0]
+
+
+def get_job(job_id):
+    """Get status, result and error of a job, or None if it does not exist"""
+    initialize_jobs_db()
+
+    with _connect() as conn:
+        row = conn.execute(
+            "SELECT id, kind, status, result, error, created_at, started_at, finished_at FROM jobs WHERE id = ?",
+            (job_id,)
+        ).fetchone()
+
+    if not row:
+        return None
+    return {
+        'id': row[0],
+        'kind': row[1],
+        'status': row[2],
+        'result': pickle.loads(row[3]) if row[3] is not None else None,
+        'error': row[4],
+        'created_at': row[5],
+        'started_at': row[6],
+        'finished_at': row[7],
+    }
+
+
+def cancel_queued_jobs(dedupe_key_prefix, keep=None):
+    """Cancel the queued jobs whose dedupe key starts with a prefix, except keep"""
+    initialize_jobs_db()
+
+    with _connect() as conn:
+        cursor = conn.execute("""
+            UPDATE jobs SET status = ?, error = ?, payload = NULL, finished_at = ?
+            WHERE status = ? AND substr(dedupe_key, 1, ?) = ? AND dedupe_key IS NOT ?
+        """, (
+            CANCELLED, "Cancelled: superseded by a newer job", datetime.now().isoformat(),
+            QUEUED, len(dedupe_key_prefix), dedupe_key_prefix, keep
+        ))
+        conn.commit()
+        return cursor.rowcount
+
+
+def claim_next_job(worker_pid):
+    """
+    Atomically move the oldest queued job to running and return (id, kind, payload)
+
+    The payload is removed from the database as the job is claimed, so the
+    API keys it may hold only live in the memory of the worker running it.
+    """
+    with _connect() as conn:
+        conn.isolation_level = None
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT id, kind, payload FROM jobs WHERE status = ? ORDER BY id LIMIT 1",
+                (QUEUED,)
+            ).fetchone()
+            if row:
+                now = datetime.now().isoformat()
+                conn.execute("""
+                    UPDATE jobs SET status = ?, payload = NULL, worker_pid = ?, started_at = ?, heartbeat_at = ?
+                    WHERE id = ?
+                """, (RUNNING, worker_pid, now, now, row[0]))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    if not row:
+        return None
+    return row[0], row[1], pickle.loads(row[2])
+
+
+def finish_job(job_id, result=None, error=None):
+    """Store the outcome of a job"""
+    with _connect() as conn:
+        conn.execute("""
+            UPDATE jobs SET status = ?, result = ?, error = ?, payload = NULL, finished_at = ?
+            WHERE id = ?
+        """, (
+            FAILED if error else DONE,
+            pickle.dumps(result) if error is None else None,
+            error,
+            datetime.now().isoformat(),
+            job_id
+        ))
+        conn.commit()
+
+
+def delete_job(job_id):
+    """Delete a job whose outcome was consumed"""
+    initialize_jobs_db()
+
+    with _connect() as conn:
+        conn.execute("DELETE FROM jobs WHERE id = ? AND status NOT IN (?, ?)", (job_id, QUEUED, RUNNING))
+        conn.commit()
+
+
+def purge_finished_jobs(max_age_hours=None):
+    """Delete the finished jobs (and their pickled results) older than the retention"""
+    max_age_hours = job_retention_hours if max_age_hours is None else max_age_hours
+    cutoff = (datetime.now() - timedelta(hours=max_age_hours)).isoformat()
+
+    with _connect() as conn:
+        cursor = conn.execute(
+            "DELETE FROM jobs WHERE status IN (?, ?, ?) AND finished_at < ?",
+            (DONE, FAILED, CANCELLED, cutoff)
+        )
+        conn.commit()
+        return cursor.rowcount
+
+
+def _renew_lease(job_id, stopped):
+    """Update the heartbeat of a running job until stopped is set"""
+    while not stopped.wait(HEARTBEAT_INTERVAL):
+        try:
+            with _connect() as conn:
+                conn.execute(
+                    "UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND status = ?",
+                    (datetime.now().isoformat(), job_id, RUNNING)
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"⚠️ Could not renew the lease of job {job_id}: {e}")
+
+
+def run_job(job_id, kind, payload):
+    """Run a claimed job with its registered handler and record the outcome"""
+    handler = HANDLERS.get(kind)
+    if handler is None:
+        finish_job(job_id, error=f"No handler registered for job kind '{kind}'")
+        return
+
+    stopped = threading.Event()
+    threading.Thread(target=_renew_lease, args=(job_id, stopped), daemon=True).start()
+    namespace = payload.get("namespace")
+    # Jobs join the trace of the page that submitted them, or start their own
+    try:
+        with profile_run("job", kind, namespace, enabled=is_profiling_enabled(namespace)), \
+                use_trace(payload.get("trace_id") or new_trace_id(), namespace), \
+                span(f"job.{kind}", **{'job.id': job_id}):
+            result = handler(payload)
+    except Exception as e:
+        print(f"❌ Job {job_id} ({kind}) failed: {e}")
+        finish_job(job_id, error=f"{type(e).__name__}: {e}\n{traceback.format_exc()}")
+    else:
+        finish_job(job_id, result=result)
+    finally:
+        stopped.set()
+
+
+def run_worker(parent_pid=None):
+    """Serve jobs until the parent process exits"""
+    import support.jobs  # noqa: F401 - registers the job handlers
+
+    initialize_jobs_db()
+    worker_pid = os.getpid()
+    print(f"✅ Job worker {worker_pid} started")
+
+    last_maintenance = 0
+    while parent_pid is None or os.getppid() == parent_pid:
+        claimed = claim_next_job(worker_pid)
+        if claimed is None:
+            if time.monotonic() - last_maintenance > MAINTENANCE_INTERVAL:
+                fail_orphaned_jobs()
+                purge_finished_jobs()
+                last_maintenance = time.monotonic()
+            time.sleep(POLL_INTERVAL)
+            continue
+        run_job(*claimed)
+
+
+def fail_orphaned_jobs():
+    """Mark running jobs whose lease expired, i.e. whose worker process died, as failed"""
+    cutoff = (datetime.now() - timedelta(seconds=HEARTBEAT_TIMEOUT)).isoformat()
+    with _connect() as conn:
+        cursor = conn.execute("""
+            UPDATE jobs SET status = ?, error = ?, finished_at = ?
+            WHERE status = ? AND (heartbeat_at IS NULL OR heartbeat_at < ?)
+        """, (
+            FAILED, "Worker process exited before the job finished", datetime.now().isoformat(),
+            RUNNING, cutoff
+        ))
+        conn.commit()
+        return cursor.rowcount
+
+
+def start_workers(count=None):
+    """Start the worker processes once per server process"""
+    count = job_workers if count is None else count
+
+    with _workers_lock:
+        _workers[:] = [worker for worker in _workers if worker.poll() is None]
+        if len(_workers) >= count:
+            return
+
+        initialize_jobs_db()
+        if not _workers:
+            fail_orphaned_jobs()
+            purge_finished_jobs()
+
+        # Workers share the server's working directory so dest_dir resolves
+        # to the same place
+        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [project_root, env.get("PYTHONPATH")]))
+        for _ in range(count - len(_workers)):
+            _workers.append(subprocess.Popen(
+                [sys.executable, "-m", "support.job_queue", "--parent-pid", str(os.getpid())],
+                env=env
+            ))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a background job worker")
+    parser.add_argument("--parent-pid", type=int, default=None)
+    args = parser.parse_args()
+
+    # Import through the package so handlers register on the same module
+    from support.job_queue import run_worker as package_run_worker
+    package_run_worker(args.parent_pid)
@@ -0,0 +1,185 @@
+import io
+import os
+
+from support.job_queue import job_handler
+
+# Environment variable read by each LangChain provider
+API_KEY_ENV_VARS = {
+    "openai": "OPENAI_API_KEY",
+    "gemini": "GOOGLE_API_KEY",
+}
+
+
+def load_task_models(payload):
+    """Load the model of every pipeline task inside a worker process"""
+    from support.config_manager import ConfigManager
+    from support.load_models import MODEL_TASKS, get_task_models, load_model
+
+    selected_model, api_key = payload["selected_model"], payload["api_key"]
+    if not api_key:
+        raise ValueError("No valid API key found for the selected model")
+
+    # A worker runs one job at a time, so setting the key per job is safe
+    os.environ[API_KEY_ENV_VARS[selected_model]] = api_key
+    overrides = ConfigManager(payload.get("namespace")).get_config_value("task_models", {})
+
+    # Tasks sharing a model share one client
+    task_models = get_task_models(selected_model, overrides)
+    clients = {}
+    for task in MODEL_TASKS:
+        if task_models[task] not in clients:
+            clients[task_models[task]] = load_model(selected_model, task, overrides)
+    return {task: clients[task_models[task]] for task in MODEL_TASKS}
+
+
+def set_task_models(information_extractor, payload):
+    """Give the extractor its per-task models; the tailoring model is the default"""
+    information_extractor.MODELS = load_task_models(payload)
+    information_extractor.MODEL = information_extractor.MODELS["tailoring"]
+
+
+def tailor_documents(payload):
+    """Run the LLM calls tailoring a CV and cover letter, return the extractor holding them"""
+    from support.extractor import InformationExtractor
+
+    information_extractor = InformationExtractor(namespace=payload.get("namespace"))
+    set_task_models(information_extractor, payload)
+    information_extractor.structured_cv = payload["structured_cv"]
+
+    # The page already stripped the boilerplate (see jd_preprocessor)
+    job_description = payload["job_description"]
+    information_extractor.create_new_cv(
+        structured_curriculum=payload["structured_cv"],
+        job_description=job_description,
+    )
+    information_extractor.create_new_cover_letter(
+        structured_curriculum=payload["structured_cv"],
+        job_description=job_description,
+    )
+    return information_extractor
+
+
+@job_handler("generate_documents")
+def generate_documents(payload):
+    """Tailor the CV and write the cover letter for a job description"""
+    information_extractor = tailor_documents(payload)
+
+    return {
+        'new_cv': information_extractor.new_cv,
+        'cover_letter': information_extractor.cover_letter,
+        'jd_information': information_extractor.jd_information,
+    }
+
+
+@job_handler("tailor_submission")
+def tailor_submission(payload):
+    """Tailor the documents for a job description and save them as a new submission"""
+    information_extractor = tailor_documents(payload)
+    information_extractor.build_final_cv()
+    information_extractor.build_final_cover_letter()
+
+    return {
+        'submission_id': information_extractor.create_pdf(
+            cv_template_id=payload.get("cv_template_id"),
+            cover_letter_template_id=payload.get("cover_letter_template_id"),
+        ),
+        'company': information_extractor.jd_information.company_name,
+        'position': information_extractor.jd_information.job_title,
+    }
+
+
+@job_handler("extract_portfolio")
+def extract_portfolio(payload):
+    """Convert an uploaded CV file and extract the structured portfolio"""
+    from support.extractor import InformationExtractor
+    from support.manage_ingestion import process_file
+
+    uploaded_file = io.BytesIO(payload["file_bytes"])
+    uploaded_file.name = payload["file_name"]
+
+    markdown_cv = process_file(uploaded_file, namespace=payload.get("namespace"))
+    if not markdown_cv:
+        raise ValueError("Failed to process file. Please check the file format.")
+
+    information_extractor = InformationExtractor(namespace=payload.get("namespace"))
+    set_task_models(information_extractor, payload)
+    return information_extractor.extract_data(markdown_cv=markdown_cv, is_new_cv=True)
+
+
+@job_handler("export_zip")
+def export_zip(payload):
+    """Render the PDFs of many submissions into a ZIP archive"""
+    from support.bulk_export import export_submissions_zip
+
+    archive_path, failures = export_submissions_zip(
+        payload["submissions"], payload.get("template_id"), namespace=payload.get("namespace")
+    )
+    return {
+        'archive_path': archive_path,
+        'exported': len(payload["submissions"]) - len(failures),
+        'failures': failures,
+    }
+
+
+@job_handler("render_pdfs")
+def render_pdfs(payload):
+    """Render the CV and cover letter PDFs of a stored submission"""
+    from support.submission_manager import generate_pdf_from_submission
+
+    cv_path, cl_path, temp_dir = generate_pdf_from_submission(
+        payload["submission_id"], payload.get("template_id"), namespace=payload.get("namespace")
+    )
+    if not cv_path or not cl_path:
+        raise ValueError("Failed to generate PDFs")
+
+    return {
+        'submission_id': payload["submission_id"],
+        'cv_path': cv_path,
+        'cl_path': cl_path,
+        'temp_dir': temp_dir,
+    }
+
+
+@job_handler("prerender_pdfs")
+def prerender_pdfs(payload):
+    """Speculatively render the PDFs of a just saved submission revision"""
+    from support.pdf_prerender import prerender_submission_pdfs
+
+    cv_path, cl_path = prerender_submission_pdfs(
+        payload["submission_id"],
+        payload["revision"],
+        namespace=payload.get("namespace"),
+    )
+    # Same shape as render_pdfs, the files stay in place for later downloads
+    return {
+        'submission_id': payload["submission_id"],
+        'cv_path': cv_path,
+        'cl_path': cl_path,
+        'temp_dir': None,
+    }
+
+
+@job_handler("render_thumbnails")
+def render_thumbnails(payload):
+    """Rasterize the first pages of documents into cached thumbnails"""
+    from support.thumbnails import render_thumbnails as render_documents
+
+    return {'rendered': render_documents(payload["documents"])}
+
+
+@job_handler("estimate_page_fit")
+def estimate_page_fit(payload):
+    """Lay out a CV and measure how far it overflows its page budget"""
+    from support.page_fit import estimate_page_fit as estimate
+
+    return estimate(payload["html"], payload["max_pages"])
+
+
+@job_handler("trim_projects_to_fit")
+def trim_projects_to_fit(payload):
+    """Find how many of a CV's projects fit in its page budget; returns the number to keep"""
+    from support.page_fit import trim_projects_to_fit as trim_projects
+
+    final_cv = payload["final_cv"]
+    trim_projects(final_cv, payload["template_id"], payload["max_pages"])
+    return len(final_cv.projects or [])
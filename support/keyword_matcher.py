@@ -0,0 +1,236 @@
+import re
+import threading
+from collections import OrderedDict, deque
+from support.jd_extractor import extract_jd_information
+from support.portfolio_store import get_snapshot_id
+
+# Portfolio versions whose automaton is kept in memory
+MATCHER_CACHE_SIZE = 8
+
+# Skill-like tokens: words, acronyms and names such as C++, C#, Node.js or CI/CD
+TOKEN_PATTERN = re.compile(r"[A-Za-z][A-Za-z0-9]*(?:[+#]+|(?:[./\-][A-Za-z0-9]+)+)?")
+# Words often capitalized in CVs and postings that never name a skill
+STOPWORDS = frozenset("""
+a about above after all also an and any are as at be been being both but by can could did do does
+during each either etc for from had has have having he her here his how i if in into is it its
+just may me might more most must my no nor not of on once only or other our ours out over own per
+same she should so some such than that the their them then there these they this those through to
+too under until up us very was we were what when where which while who whom why will with within
+would you your yours
+ability able across based being build built candidate company create created day days degree
+develop developed environment excellent experience experienced good great help highly ideal
+including join knowledge looking make new opportunity plus position preferred required requirements
+responsibilities responsible role skills strong team teams understanding using work working world
+year years
+associate engineer developer intern junior lead manager senior specialist
+""".split())
+# Capitalized words of postings that are never missing skills: places, dates,
+# work arrangements and legal forms
+POSTING_STOPWORDS = frozenset("""
+remote hybrid onsite on-site office offices full-time part-time fulltime parttime freelance contract
+permanent temporary internship apprenticeship relocation visa salary eur usd gbp chf k
+january february march april may june july august september october november december
+monday tuesday wednesday thursday friday saturday sunday q1 q2 q3 q4
+inc ltd llc gmbh ag plc corp corporation co spa srl sa bv nv oy ab limited group holding
+africa america americas apac asia australia dach emea europe european latam nordics
+austria belgium canada denmark finland france germany india ireland italy netherlands norway poland
+portugal spain sweden switzerland uk usa us eu england scotland
+amsterdam barcelona berlin boston chicago copenhagen dublin hamburg helsinki lisbon london
+madrid milan munich new york oslo paris prague rome san francisco seattle stockholm toronto vienna
+warsaw zurich
+""".split())
+
+_matcher_cache = OrderedDict()
+_matcher_cache_lock = threading.Lock()
+
+
+def normalize_term(term):
+    """Lowercase a term and collapse its whitespace"""
+    return " ".join((term or "").lower().split())
+
+
+def _is_skill_token(token):
+    """Tell technology and product names apart from ordinary words"""
+    if token.lower() in STOPWORDS or len(token) < 2:
+        return False
+    return (
+        any(char in token for char in "+#./-")
+        or any(char.isdigit() for char in token)
+        or token.isupper()
+        or any(char.isupper() for char in token[1:])
+        or token[0].isupper()
+    )
+
+
+def _lower_with_offsets(text):
+    """
+    Lowercase a text and map each lowered character back to its index in the text
+
+    Lowercasing can change the length of a text (e.g. "İ" becomes two
+    characters), so positions found in the lowered text must be mapped.
+    """
+    lowered = []
+    offsets = []
+    for index, char in enumerate(text):
+        lower = char.lower()
+        lowered.append(lower)
+        offsets.extend([index] * len(lower))
+    return "".join(lowered), offsets
+
+
+def _starts_sentence(text, start):
+    index = start - 1
+    while index >= 0 and text[index] in " \t\"'(":
+        index -= 1
+    return index < 0 or text[index] in ".!?:;\n•*-"
+
+
+def _iter_terms(text):
+    """Yield (start, normalized term, term as written) of the skill-like tokens of a text"""
+    for match in TOKEN_PATTERN.finditer(text or ""):
+        token = match.group()
+        if token.istitle() and not token.isupper() and _starts_sentence(text, match.start()):
+            continue
+        if _is_skill_token(token):
+            yield match.start(), normalize_term(token), token
+
+
+def extract_terms(text):
+    """
+    Extract skill-like terms from free text
+
+    Keeps acronyms, CamelCase and dotted names (AWS, PyTorch, Node.js) and
+    capitalized words that do not start a sentence or a line.
+    """
+    terms = {}
+    for _, term, written in _iter_terms(text):
+        terms.setdefault(term, written)
+    return terms
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton matching many terms in one pass over a text
+
+    Terms only match as whole words, so "go" is not found in "good".
+    Scanning costs O(len(text) + matches) whatever the number of terms.
+    """
+
+    def __init__(self, terms):
+        # State 0 is the root; every state has transitions, a failure link and outputs
+        self.transitions = [{}]
+        self.failure = [0]
+        self.outputs = [[]]
+        for term in terms:
+            self._add(term)
+        self._link()
+
+    def _add(self, term):
+        state = 0
+        for char in term:
+            next_state = self.transitions[state].get(char)
+            if next_state is None:
+                next_state = len(self.transitions)
+                self.transitions[state][char] = next_state
+                self.transitions.append({})
+                self.failure.append(0)
+                self.outputs.append([])
+            state = next_state
+        self.outputs[state].append(term)
+
+    def _link(self):
+        queue = deque(self.transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.transitions[state].items():
+                queue.append(next_state)
+                fallback = self.failure[state]
+                while fallback and char not in self.transitions[fallback]:
+                    fallback = self.failure[fallback]
+                self.failure[next_state] = self.transitions[fallback].get(char, 0)
+                self.outputs[next_state] = self.outputs[next_state] + self.outputs[self.failure[next_state]]
+
+    def scan(self, text):
+        """Yield (start, end, term) of every whole-word match in a lowercased text"""
+        state = 0
+        transitions, failure, outputs = self.transitions, self.failure, self.outputs
+        for index, char in enumerate(text):
+            while state and char not in transitions[state]:
+                state = failure[state]
+            state = transitions[state].get(char, 0)
+            for term in outputs[state]:
+                start, end = index - len(term) + 1, index + 1
+                if (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum()):
+                    yield start, end, term
+
+
+def build_portfolio_terms(structured_cv):
+    """Map the normalized terms of a portfolio to how they are written in it"""
+    terms = {}
+    for skill in (structured_cv.hard_skills or []) + (structured_cv.soft_skills or []):
+        if normalize_term(skill):
+            terms.setdefault(normalize_term(skill), skill.strip())
+    for entry in (structured_cv.experiences or []) + (structured_cv.projects or []):
+        for text in (entry.title, entry.description):
+            for term, written in extract_terms(text).items():
+                terms.setdefault(term, written)
+    return terms
+
+
+class PortfolioMatcher:
+    """The terms of one portfolio version and their automaton"""
+
+    def __init__(self, terms):
+        self.terms = terms
+        self.automaton = KeywordAutomaton(terms)
+
+    def match(self, job_description):
+        """
+        Score how well the portfolio covers a job description
+
+        Matched terms are portfolio terms found in the posting; missing terms
+        are skill-like terms of the posting that the portfolio never mentions,
+        leaving out the posting's own job title and company and the words of
+        POSTING_STOPWORDS (places, dates, legal forms).
+        """
+        text, offsets = _lower_with_offsets(job_description)
+        matched = {}
+        covered = set()
+        for start, end, term in self.automaton.scan(text):
+            matched.setdefault(term, self.terms[term])
+            covered.update(range(offsets[start], offsets[end - 1] + 1))
+
+        job_title, company_name, _ = extract_jd_information(job_description)
+        own_terms = {
+            normalize_term(token)
+            for value in (job_title, company_name) if value
+            for token in TOKEN_PATTERN.findall(value)
+        }
+        missing = {}
+        for start, term, written in _iter_terms(job_description):
+            if start in covered or term in self.terms or term in own_terms or term in POSTING_STOPWORDS:
+                continue
+            missing.setdefault(term, written)
+
+        total = len(matched) + len(missing)
+        return {
+            'coverage': len(matched) / total if total else 0.0,
+            'matched': sorted(matched.values(), key=str.lower),
+            'missing': sorted(missing.values(), key=str.lower),
+        }
+
+
+def get_portfolio_matcher(structured_cv):
+    """Get the matcher of a portfolio version, building its automaton once"""
+    snapshot_id = get_snapshot_id(structured_cv)
+    with _matcher_cache_lock:
+        if snapshot_id in _matcher_cache:
+            _matcher_cache.move_to_end(snapshot_id)
+            return _matcher_cache[snapshot_id]
+
+    matcher = PortfolioMatcher(build_portfolio_terms(structured_cv))
+    with _matcher_cache_lock:
+        _matcher_cache[snapshot_id] = matcher
+        while len(_matcher_cache) > MATCHER_CACHE_SIZE:
+            _matcher_cache.popitem(last=False)
+    return matcher
@@ -1,10 +1,79 @@
-from langchain_openai import ChatOpenAI
-from langchain_google_genai import ChatGoogleGenerativeAI
+# LangChain provider packages are slow to import, so they are loaded on first
+# use instead of when a page imports this module.
 
+# LLM calls of the pipeline; each one can run on its own model
+MODEL_TASKS = {
+    "extraction": "Portfolio extraction",
+    "jd_parsing": "Job description parsing",
+    "tailoring": "CV tailoring",
+    "cover_letter": "Cover letter writing",
+}
+
+# Schema filling (extraction, JD parsing) runs on smaller, faster models;
+# writing keeps the large ones
+DEFAULT_TASK_MODELS = {
+    "openai": {
+        "extraction": "gpt-4.1-mini",
+        "jd_parsing": "gpt-4.1-nano",
+        "tailoring": "gpt-4.1",
+        "cover_letter": "gpt-4.1",
+    },
+    "gemini": {
+        "extraction": "gemini-2.5-flash",
+        "jd_parsing": "gemini-2.5-flash-lite",
+        "tailoring": "gemini-2.5-pro",
+        "cover_letter": "gemini-2.5-pro",
+    },
+}
+
+# The model every task used before per-task tiers, the baseline of cost reports
+BASELINE_MODELS = {
+    "openai": "gpt-4.1",
+    "gemini": "gemini-2.5-pro",
+}
+
+# Models offered in Manage Settings, largest first
+PROVIDER_MODELS = {
+    "openai": ["gpt-4.1", "gpt-4.1-mini", "gpt-4.1-nano"],
+    "gemini": ["gemini-2.5-pro", "gemini-2.5-flash", "gemini-2.5-flash-lite"],
+}
+
+# USD per million (input, output) tokens, from the providers' price lists
+MODEL_PRICES = {
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gemini-2.5-pro": (1.25, 10.00),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.5-flash-lite": (0.10, 0.40),
+}
+
+
+def get_task_models(provider, overrides=None):
+    """Model name of each task for a provider, with the saved overrides applied"""
+    task_models = dict(DEFAULT_TASK_MODELS[provider])
+    task_models.update((overrides or {}).get(provider, {}))
+    return task_models
+
+
+def get_baseline_model(model_name):
+    """The large model of the provider serving a model"""
+    return BASELINE_MODELS["gemini" if model_name.startswith("gemini") else "openai"]
+
+
+def estimate_cost(model_name, input_tokens, output_tokens):
+    """Cost of a call in USD, or None for a model without a known price"""
+    if model_name not in MODEL_PRICES:
+        return None
+    input_price, output_price = MODEL_PRICES[model_name]
+    return (input_tokens * input_price + output_tokens * output_price) / 1e6
+
+
+def load_openAI_model(model_name="gpt-4.1"):
+    from langchain_openai import ChatOpenAI
 
-def load_openAI_model():
     MODEL = ChatOpenAI(
-        model="gpt-4.1",
+        model=model_name,
         temperature=0,
         top_p=0,
         max_tokens=None,
@@ -16,9 +85,11 @@ def load_openAI_model():
     return MODEL
 
 
-def load_gemini_model():
+def load_gemini_model(model_name="gemini-2.5-pro"):
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
     MODEL = ChatGoogleGenerativeAI(
-        model="gemini-2.5-pro",
+        model=model_name,
         temperature=0,
         top_p=0,
         timeout=None,
@@ -26,3 +97,11 @@ def load_gemini_model():
     )
 
     return MODEL
+
+
+def load_model(provider, task, overrides=None):
+    """Load the model configured for a task of the pipeline"""
+    model_name = get_task_models(provider, overrides)[task]
+    if provider == "gemini":
+        return load_gemini_model(model_name)
+    return load_openAI_model(model_name)
@@ -1,26 +1,28 @@
 import os
 import tempfile
 
-from markitdown import MarkItDown
 from support.logger_manager import logger
-from support.settings import dest_dir
+from support.namespace_manager import get_namespace_dir
+from support.persistence import atomic_write_text
+from support.tracing import set_span_attributes, span, traced
 
 
-def save_output(content):
-    with open(f"{dest_dir}/user_curriculum.md", "w", encoding="utf-8") as f:
-        f.write(content)
+def save_output(content, namespace=None):
+    atomic_write_text(f"{get_namespace_dir(namespace)}/user_curriculum.md", content)
     logger.debug("Markdown written to user_curriculum.md")
 
 
-def process_file(file):
+@traced("process_file")
+def process_file(file, namespace=None):
     filename = file.name
     ext = os.path.splitext(filename)[1].lower()
+    set_span_attributes(**{'file.extension': ext})
 
     if ext in ['.txt', '.md']:
         try:
             content = file.read().decode('utf-8')
             logger.debug(f"Read text content from {filename}")
-            save_output(content)
+            save_output(content, namespace)
             return content
         except Exception as e:
             logger.error(f"Error reading text file: {str(e)}")
@@ -33,10 +35,14 @@ def process_file(file):
             logger.debug(f"Temporary file created at: {tmp_path}")
 
         try:
+            # MarkItDown pulls in every converter backend, import it lazily
+            from markitdown import MarkItDown
+
             md = MarkItDown(enable_plugins=False)  # Set to True to enable plugins
-            result = md.convert(tmp_path)
+            with span("markitdown.convert"):
+                result = md.convert(tmp_path)
             markdown = result.text_content
-            save_output(markdown)
+            save_output(markdown, namespace)
             return markdown
         except Exception as e:
             logger.error(f"Error converting file: {str(e)}")
@@ -0,0 +1,81 @@
+import hashlib
+import os
+import re
+import secrets
+from support.settings import (
+    dest_dir, DEFAULT_NAMESPACE, max_submissions_per_namespace, max_upload_mb_per_namespace
+)
+
+NAMESPACES_DIR = f"{dest_dir}/users"
+# Logged-in users get "user-<hash of their e-mail>", anonymous private
+# workspaces "workspace-<token>"; the two prefixes can never collide
+NAMESPACE_PATTERN = re.compile(r"(?:user|workspace)-[A-Za-z0-9_-]{32,64}")
+WORKSPACE_TOKEN_PATTERN = re.compile(r"[A-Za-z0-9_-]{32,64}")
+
+
+class QuotaExceededError(Exception):
+    """Raised when a namespace would exceed one of its storage quotas"""
+
+
+def user_namespace(email):
+    """Namespace of a logged-in user, derived from the e-mail of the login"""
+    return f"user-{hashlib.sha256(email.strip().encode('utf-8')).hexdigest()[:40]}"
+
+
+def new_workspace_token():
+    """Unguessable token of a new private workspace"""
+    return secrets.token_urlsafe(32)
+
+
+def workspace_namespace(token):
+    """Namespace of a private workspace; raises ValueError for a malformed token"""
+    if not WORKSPACE_TOKEN_PATTERN.fullmatch(token or ""):
+        raise ValueError("Invalid workspace token")
+    return f"workspace-{token}"
+
+
+def workspace_token(namespace):
+    """Token of a private workspace namespace, or None for other namespaces"""
+    if namespace and namespace.startswith("workspace-"):
+        return namespace[len("workspace-"):]
+    return None
+
+
+def normalize_namespace(namespace=None):
+    """
+    Validate a namespace before it is used as a directory name or database key
+
+    Names are never rewritten, so two different names cannot end up in the
+    same namespace; anything but the default, user and workspace namespaces
+    raises ValueError.
+    """
+    if not namespace:
+        return DEFAULT_NAMESPACE
+    if not NAMESPACE_PATTERN.fullmatch(namespace):
+        raise ValueError(f"Invalid namespace '{namespace}'")
+    return namespace
+
+
+def get_namespace_dir(namespace=None):
+    """Get (and create) the data directory of a namespace"""
+    namespace = normalize_namespace(namespace)
+    namespace_dir = f"{NAMESPACES_DIR}/{namespace}" if namespace else dest_dir
+    os.makedirs(namespace_dir, exist_ok=True)
+    return namespace_dir
+
+
+def check_upload_quota(used_bytes, additional_bytes):
+    """Raise QuotaExceededError if an upload would exceed the namespace quota"""
+    limit_bytes = max_upload_mb_per_namespace * 1024 * 1024
+    if used_bytes + additional_bytes > limit_bytes:
+        raise QuotaExceededError(
+            f"Upload quota of {max_upload_mb_per_namespace} MB exceeded. Delete old files to upload new ones."
+        )
+
+
+def check_submission_quota(submission_count):
+    """Raise QuotaExceededError if the namespace cannot store another submission"""
+    if submission_count >= max_submissions_per_namespace:
+        raise QuotaExceededError(
+            f"Submission quota of {max_submissions_per_namespace} applications reached."
+        )
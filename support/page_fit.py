@@ -0,0 +1,256 @@
+import copy
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+from html.parser import HTMLParser
+from support.html_builder import CVBuilder
+from support.tracing import set_span_attributes, traced
+
+# Layout results kept in memory, keyed by the hash of the HTML
+PAGE_FIT_CACHE_SIZE = 128
+# Classes of the elements the CV templates wrap each section in
+SECTION_CLASSES = {"section", "section-block", "sidebar-section"}
+# Zero-height elements whose positions are read back from the laid out pages
+MARKER_PREFIX = "page-fit-"
+MARKER = '<div id="' + MARKER_PREFIX + '{name}" style="height:0;margin:0;padding:0;border:0"></div>'
+# Out of the flow at the top of the page area: its markers give the page
+# margin and the height of one line of body text
+LINE_PROBE = (
+    '<div style="position:absolute;top:0;left:0">'
+    + MARKER.format(name="line-top") + "M" + MARKER.format(name="line-bottom")
+    + "</div>"
+)
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"
+}
+
+_fit_cache = OrderedDict()
+_fit_cache_lock = threading.Lock()
+
+
+class _SectionMarker(HTMLParser):
+    """Copy a document, opening and closing every section with a marker"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.parts = []
+        self.titles = []
+        # (tag, section index or None) of the elements not closed yet
+        self.open_elements = []
+        # Sections whose heading (first text) has not been seen yet
+        self.untitled = []
+        self.probed = False
+
+    def handle_starttag(self, tag, attrs):
+        self.parts.append(self.get_starttag_text())
+        if tag in VOID_ELEMENTS:
+            return
+        index = None
+        if set((dict(attrs).get("class") or "").split()) & SECTION_CLASSES:
+            index = len(self.titles)
+            self.titles.append("")
+            self.untitled.append(index)
+            self.parts.append(MARKER.format(name=f"{index}-start"))
+        self.open_elements.append((tag, index))
+
+    def handle_startendtag(self, tag, attrs):
+        self.parts.append(self.get_starttag_text())
+
+    def handle_endtag(self, tag):
+        # Close the matching element and any child left open inside it
+        for position in range(len(self.open_elements) - 1, -1, -1):
+            if self.open_elements[position][0] == tag:
+                for _, index in reversed(self.open_elements[position:]):
+                    if index is not None:
+                        self.parts.append(MARKER.format(name=f"{index}-end"))
+                del self.open_elements[position:]
+                break
+        if tag == "body":
+            self.parts.append(LINE_PROBE)
+            self.probed = True
+        self.parts.append(f"</{tag}>")
+
+    def handle_data(self, data):
+        if data.strip() and self.untitled:
+            for index in self.untitled:
+                self.titles[index] = data.strip()
+            self.untitled.clear()
+        self.parts.append(data)
+
+    def handle_entityref(self, name):
+        self.parts.append(f"&{name};")
+
+    def handle_charref(self, name):
+        self.parts.append(f"&#{name};")
+
+    def handle_comment(self, data):
+        self.parts.append(f"<!--{data}-->")
+
+    def handle_decl(self, decl):
+        self.parts.append(f"<!{decl}>")
+
+    def handle_pi(self, data):
+        self.parts.append(f"<?{data}>")
+
+    def unknown_decl(self, data):
+        self.parts.append(f"<![{data}]>")
+
+
+def mark_sections(html):
+    """Add the layout markers to a document; returns (marked html, section titles)"""
+    parser = _SectionMarker()
+    parser.feed(html)
+    parser.close()
+    if not parser.probed:
+        parser.parts.append(LINE_PROBE)
+    return "".join(parser.parts), parser.titles
+
+
+def measure_layout(html, max_pages=1):
+    """
+    Lay out a document with WeasyPrint and measure what it puts beyond max_pages
+
+    Only public layout results are read: the page count, the page height
+    and the positions of the markers added by mark_sections (page.anchors).
+    Positions are mapped onto one continuous flow of page content areas,
+    assuming equal top and bottom page margins. Heights are in CSS pixels,
+    and overflow is also reported as a number of body text lines.
+    """
+    # WeasyPrint is slow to import, load it only when a layout is needed
+    import weasyprint
+
+    marked_html, titles = mark_sections(html)
+    document = weasyprint.HTML(string=marked_html).render()
+
+    positions = {}
+    for page_number, page in enumerate(document.pages):
+        for name, (_, y) in page.anchors.items():
+            if name.startswith(MARKER_PREFIX):
+                positions[name.removeprefix(MARKER_PREFIX)] = (page_number, y)
+
+    page_count = len(document.pages)
+    line_top = positions.get("line-top", (0, 0.0))[1]
+    line_height = positions.get("line-bottom", (0, line_top))[1] - line_top
+    content_height = document.pages[0].height - 2 * line_top
+    boundary = max_pages * content_height
+
+    def offset(position):
+        page_number, y = position
+        return page_number * content_height + y - line_top
+
+    def to_lines(height):
+        return math.ceil(round(height / line_height, 2)) if line_height else 0
+
+    sections = []
+    for index, title in enumerate(titles):
+        start, end = positions.get(f"{index}-start"), positions.get(f"{index}-end")
+        overflow_height = 0.0
+        if start and end:
+            overflow_height = max(0.0, offset(end) - max(offset(start), boundary))
+        sections.append({'title': title, 'overflow_height': overflow_height})
+
+    overflow_height = 0.0
+    if page_count > max_pages:
+        flow_end = max(
+            [offset(position) for name, position in positions.items() if not name.startswith("line-")]
+            + [(page_count - 1) * content_height]
+        )
+        overflow_height = max(0.0, flow_end - boundary)
+
+    return {
+        'pages': page_count,
+        'fits': page_count <= max_pages,
+        'overflow_height': overflow_height,
+        'overflow_lines': to_lines(overflow_height),
+        'line_height': line_height,
+        'sections': [
+            {**section, 'overflow_lines': to_lines(section['overflow_height'])}
+            for section in sections
+        ],
+    }
+
+
+def page_fit_key(html, max_pages=1):
+    """Cache key of the page fit of a document"""
+    return f"{hashlib.sha256(html.encode('utf-8')).hexdigest()}:{max_pages}"
+
+
+def get_cached_page_fit(key):
+    """Get a copy of a cached page fit, or None"""
+    with _fit_cache_lock:
+        if key not in _fit_cache:
+            return None
+        _fit_cache.move_to_end(key)
+        return copy.deepcopy(_fit_cache[key])
+
+
+def cache_page_fit(key, result):
+    """Keep a page fit in the in-memory LRU cache"""
+    with _fit_cache_lock:
+        _fit_cache[key] = result
+        _fit_cache.move_to_end(key)
+        while len(_fit_cache) > PAGE_FIT_CACHE_SIZE:
+            _fit_cache.popitem(last=False)
+
+
+@traced("estimate_page_fit")
+def estimate_page_fit(html, max_pages=1):
+    """
+    Check whether a document fits in max_pages without writing a PDF
+
+    Only WeasyPrint's layout pass (render()) runs, and results are cached by
+    the hash of the HTML, so unchanged documents cost a dictionary lookup.
+    Returns the page count and the overflow in total and per section.
+    """
+    key = page_fit_key(html, max_pages)
+    result = get_cached_page_fit(key)
+    set_span_attributes(**{'page_fit.cache_hit': result is not None})
+    if result is not None:
+        return result
+
+    result = measure_layout(html, max_pages)
+    set_span_attributes(**{'page_fit.pages': result['pages']})
+    cache_page_fit(key, result)
+    return copy.deepcopy(result)
+
+
+@traced("trim_projects_to_fit")
+def trim_projects_to_fit(cv, template_id="1", max_pages=1):
+    """
+    Drop the lowest-ranked projects until a CV fits in max_pages
+
+    Projects are ranked by their order in the tailored CV, most relevant
+    first. Fitting only gets easier with fewer projects, so the number to
+    keep is binary searched with O(log n) layout passes. When even dropping
+    every project is not enough the CV is left unchanged. Returns the
+    removed projects; cv.projects is trimmed in place.
+    """
+    projects = cv.projects
+    if not projects:
+        return []
+
+    builder = CVBuilder()
+
+    def fits(count):
+        cv.projects = projects[:count]
+        return estimate_page_fit(builder.build_html_from_cv(cv, template_id), max_pages)['fits']
+
+    try:
+        if fits(len(projects)) or not fits(0):
+            return []
+        # fits(low) holds and fits(high) does not
+        low, high = 0, len(projects)
+        while high - low > 1:
+            middle = (low + high) // 2
+            if fits(middle):
+                low = middle
+            else:
+                high = middle
+    finally:
+        cv.projects = projects
+
+    removed = projects[low:]
+    del projects[low:]
+    set_span_attributes(**{'page_fit.projects_removed': len(removed)})
+    return removed
@@ -0,0 +1,109 @@
+import os
+from support.job_queue import cancel_queued_jobs, submit_job
+from support.namespace_manager import get_namespace_dir, normalize_namespace
+from support.persistence import atomic_write_bytes
+from support.submission_manager import get_submission_revision, render_submission_pdfs
+from support.tracing import set_span_attributes
+
+# Submissions whose speculative renders are kept per namespace
+PRERENDER_RETENTION = 20
+
+
+def get_prerender_dir(namespace=None):
+    """Get (and create) the directory holding the speculative renders of a namespace"""
+    prerender_dir = f"{get_namespace_dir(namespace)}/prerendered"
+    os.makedirs(prerender_dir, exist_ok=True)
+    return prerender_dir
+
+
+def _dedupe_prefix(submission_id, namespace):
+    return f"prerender:{normalize_namespace(namespace)}:{submission_id}:"
+
+
+def _artifact_paths(submission_id, revision, namespace):
+    # A revision is rendered with the templates stored with it, so it names the render
+    prefix = f"{get_prerender_dir(namespace)}/{submission_id}_r{revision}"
+    return f"{prefix}_cv.pdf", f"{prefix}_cover_letter.pdf"
+
+
+def get_prerendered_pdfs(submission_id, namespace=None):
+    """Get (cv path, cover letter path) of the current revision's render, or None if not ready"""
+    revision = get_submission_revision(submission_id, namespace)
+    if revision is None:
+        return None
+    paths = _artifact_paths(submission_id, revision, namespace)
+    if all(os.path.exists(path) for path in paths):
+        return paths
+    return None
+
+
+def queue_pdf_prerender(submission_id, namespace=None, trace_id=None):
+    """
+    Queue a background render of both PDFs of a saved submission
+
+    Renders queued for older revisions of the submission are cancelled, and
+    queuing the same revision twice returns the pending job. Returns its id.
+    """
+    revision = get_submission_revision(submission_id, namespace)
+    if revision is None:
+        return None
+
+    prefix = _dedupe_prefix(submission_id, namespace)
+    dedupe_key = f"{prefix}{revision}"
+    cancel_queued_jobs(prefix, keep=dedupe_key)
+    return submit_job("prerender_pdfs", {
+        "submission_id": submission_id,
+        "revision": revision,
+        "namespace": namespace,
+        "trace_id": trace_id,
+    }, dedupe_key=dedupe_key)
+
+
+def remove_prerendered_pdfs(submission_id, namespace=None, keep=()):
+    """Delete the speculative renders of a submission, except the given paths"""
+    prerender_dir = get_prerender_dir(namespace)
+    for entry in os.scandir(prerender_dir):
+        # Renders stored with a lock also left a ".{name}.lock" sidecar file
+        name = entry.name
+        if name.startswith(".") and name.endswith(".lock"):
+            name = name[1:-len(".lock")]
+        if name.startswith(f"{submission_id}_r") and entry.path not in keep:
+            os.remove(entry.path)
+
+
+def prune_prerendered_pdfs(namespace=None, keep=PRERENDER_RETENTION):
+    """Delete the renders of all but the most recently rendered submissions"""
+    latest = {}
+    for entry in os.scandir(get_prerender_dir(namespace)):
+        if entry.name.endswith(".pdf") and not entry.name.startswith("."):
+            submission_id = entry.name.split("_r", 1)[0]
+            latest[submission_id] = max(latest.get(submission_id, 0), entry.stat().st_mtime)
+
+    for submission_id in sorted(latest, key=latest.get, reverse=True)[keep:]:
+        remove_prerendered_pdfs(submission_id, namespace)
+
+
+def prerender_submission_pdfs(submission_id, revision, namespace=None):
+    """
+    Render both PDFs of a submission revision into the prerender directory
+
+    A render whose revision was superseded before it started or while it ran
+    is dropped instead of stored, so downloads never serve outdated contents.
+    Returns (cv path, cover letter path).
+    """
+    set_span_attributes(**{'submission.id': submission_id, 'submission.revision': revision})
+    if get_submission_revision(submission_id, namespace) != revision:
+        raise ValueError(f"Submission {submission_id} was edited before its render started")
+
+    cv_pdf, cl_pdf = render_submission_pdfs(submission_id, namespace=namespace)
+    if get_submission_revision(submission_id, namespace) != revision:
+        raise ValueError(f"Submission {submission_id} was edited while it was rendering")
+
+    # A revision always renders to the same contents, so its paths need no lock
+    cv_path, cl_path = _artifact_paths(submission_id, revision, namespace)
+    atomic_write_bytes(cv_path, cv_pdf, locked=False)
+    atomic_write_bytes(cl_path, cl_pdf, locked=False)
+
+    remove_prerendered_pdfs(submission_id, namespace, keep=(cv_path, cl_path))
+    prune_prerendered_pdfs(namespace)
+    return cv_path, cl_path
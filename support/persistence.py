@@ -0,0 +1,201 @@
+import copy
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+_path_locks = {}
+_path_locks_guard = threading.Lock()
+_held_locks = threading.local()
+
+# (absolute path, kind) -> (file stamp, cached value), least recently used first
+READ_CACHE_SIZE = 64
+_read_cache = OrderedDict()
+_read_cache_lock = threading.Lock()
+
+
+def _get_path_lock(path):
+    """Get the in-process lock of a file path"""
+    with _path_locks_guard:
+        return _path_locks.setdefault(os.path.abspath(path), threading.Lock())
+
+
+@contextmanager
+def file_lock(path):
+    """
+    Hold an exclusive lock on a single file
+
+    Serializes writers of the same file across threads and processes (via a
+    sidecar .lock file) without blocking writers of any other file. The lock
+    is reentrant, so a read-modify-write can hold it around an atomic write.
+    """
+    key = os.path.abspath(path)
+    held = _held_locks.__dict__.setdefault("paths", set())
+    if key in held:
+        yield
+        return
+
+    with _get_path_lock(key):
+        held.add(key)
+        try:
+            if fcntl is None:
+                yield
+                return
+
+            directory, filename = os.path.split(key)
+            with open(os.path.join(directory, f".{filename}.lock"), "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        finally:
+            held.discard(key)
+
+
+def _fsync_directory(directory):
+    """Persist a rename by syncing its directory (no-op where unsupported)"""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write_bytes(path, data, locked=True):
+    """
+    Write bytes so readers see either the old or the new file, never a mix
+
+    The data goes to a temporary file in the same directory, is fsynced and
+    then renamed over the destination while holding the file's lock. Paths
+    that are never rewritten with other contents (e.g. named by a revision)
+    can skip the lock, which leaves no sidecar file behind.
+    """
+    directory, filename = os.path.split(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    with file_lock(path) if locked else nullcontext():
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{filename}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        _fsync_directory(directory)
+
+    return path
+
+
+def atomic_write_text(path, text, encoding="utf-8"):
+    """Atomically write a text file"""
+    return atomic_write_bytes(path, text.encode(encoding))
+
+
+def atomic_pickle_dump(obj, path):
+    """Atomically pickle an object to path and refresh its read cache"""
+    with file_lock(path):
+        atomic_write_bytes(path, pickle.dumps(obj))
+        _store_cached(path, "pickle", copy.deepcopy(obj))
+    return path
+
+
+def file_stamp(path):
+    """
+    Identify the version of a file on disk, or None if it does not exist
+
+    The inode is part of the stamp because atomic writes replace the file, so
+    a rewrite within the filesystem's mtime granularity is still detected.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+def _cache_entry(key, stamp, value):
+    """Store a read cache entry, evicting the least recently used ones (lock held)"""
+    _read_cache[key] = (stamp, value)
+    _read_cache.move_to_end(key)
+    while len(_read_cache) > READ_CACHE_SIZE:
+        _read_cache.popitem(last=False)
+
+
+def _store_cached(path, kind, value):
+    key = (os.path.abspath(path), kind)
+    stamp = file_stamp(path)
+    with _read_cache_lock:
+        if stamp is None:
+            _read_cache.pop(key, None)
+        else:
+            _cache_entry(key, stamp, value)
+
+
+def cached_read(path, loader, kind):
+    """
+    Return loader(path), reusing the last result while the file is unchanged
+
+    Entries are keyed on (path, kind) and validated against the file's
+    (mtime_ns, size, inode), so an unchanged file costs a single stat. At
+    most READ_CACHE_SIZE entries are kept. Missing files return None.
+    Callers must not mutate the returned value.
+    """
+    key = (os.path.abspath(path), kind)
+    stamp = file_stamp(path)
+    if stamp is None:
+        with _read_cache_lock:
+            _read_cache.pop(key, None)
+        return None
+
+    with _read_cache_lock:
+        entry = _read_cache.get(key)
+        if entry is not None and entry[0] == stamp:
+            _read_cache.move_to_end(key)
+            return entry[1]
+
+    value = loader(path)
+    # Stat again so a write racing with the load is not cached as current
+    if file_stamp(path) == stamp:
+        with _read_cache_lock:
+            _cache_entry(key, stamp, value)
+    return value
+
+
+def _pickle_load(path):
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def cached_pickle_load(path, default=None, mutable=False):
+    """
+    Unpickle a file, skipping the unpickle while it is unchanged on disk
+
+    The cached object is shared and must not be mutated. Callers that edit
+    it (e.g. in session state) pass mutable=True to get a private deep copy.
+    """
+    value = cached_read(path, _pickle_load, "pickle")
+    if value is None:
+        return default
+    return copy.deepcopy(value) if mutable else value
+
+
+def invalidate_cached(path):
+    """Drop every cached read of a path, e.g. after deleting it"""
+    path = os.path.abspath(path)
+    with _read_cache_lock:
+        for key in [key for key in _read_cache if key[0] == path]:
+            del _read_cache[key]
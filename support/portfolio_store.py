@@ -0,0 +1,122 @@
+import hashlib
+import pickle
+from datetime import datetime
+from support.supportClasses import Curriculum, FinalCurriculum
+
+# FinalCurriculum fields copied from the portfolio; the remaining ones are
+# tailored to each job description
+PORTFOLIO_FIELDS = ("personality", "hard_skills", "soft_skills", "education")
+TAILORED_FIELDS = ("job_title", "summary", "experiences", "projects")
+
+
+def get_snapshot_id(structured_cv):
+    """Identify a portfolio version by the hash of its content"""
+    return hashlib.sha256(structured_cv.model_dump_json().encode("utf-8")).hexdigest()
+
+
+def initialize_portfolio_store(conn):
+    """Create the portfolio snapshots table if it doesn't exist"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS portfolio_snapshots (
+            id TEXT NOT NULL,
+            namespace TEXT NOT NULL DEFAULT '',
+            created_at TEXT NOT NULL,
+            data BLOB NOT NULL,
+            PRIMARY KEY (namespace, id)
+        )
+    """)
+
+
+def save_snapshot(conn, structured_cv, namespace):
+    """
+    Store a portfolio snapshot and return its id
+
+    Snapshots are content-addressed, so saving an unchanged portfolio again
+    stores nothing and returns the existing id.
+    """
+    snapshot_id = get_snapshot_id(structured_cv)
+    conn.execute("""
+        INSERT OR IGNORE INTO portfolio_snapshots (id, namespace, created_at, data)
+        VALUES (?, ?, ?, ?)
+    """, (snapshot_id, namespace, datetime.now().isoformat(), pickle.dumps(structured_cv)))
+    return snapshot_id
+
+
+def load_snapshot(conn, snapshot_id, namespace):
+    """Load a portfolio snapshot, or None if it does not exist"""
+    row = conn.execute(
+        "SELECT data FROM portfolio_snapshots WHERE id = ? AND namespace = ?",
+        (snapshot_id, namespace)
+    ).fetchone()
+    return pickle.loads(row[0]) if row else None
+
+
+def list_snapshots(conn, namespace):
+    """List (id, created_at) of the snapshots of a namespace, newest first"""
+    return conn.execute(
+        "SELECT id, created_at FROM portfolio_snapshots WHERE namespace = ? ORDER BY created_at DESC",
+        (namespace,)
+    ).fetchall()
+
+
+def split_final_cv(final_cv, snapshot):
+    """
+    Reduce a final CV to what is not already stored in its snapshot
+
+    Tailored fields are always kept; portfolio fields only when they were
+    edited for this submission.
+    """
+    return {
+        'tailored': {field: getattr(final_cv, field) for field in TAILORED_FIELDS},
+        'overrides': {
+            field: getattr(final_cv, field) for field in PORTFOLIO_FIELDS
+            if getattr(final_cv, field) != getattr(snapshot, field)
+        },
+    }
+
+
+def join_final_cv(cv_data, snapshot):
+    """Rebuild a final CV from its stored sections and its snapshot"""
+    fields = {field: getattr(snapshot, field) for field in PORTFOLIO_FIELDS}
+    fields.update(cv_data['overrides'])
+    fields.update(cv_data['tailored'])
+    return FinalCurriculum(**fields)
+
+
+def _describe(value):
+    """Short label of a portfolio entry for diffs"""
+    if hasattr(value, "model_dump"):
+        values = value.model_dump()
+        label = " - ".join(str(values[key]) for key in ("title", "company", "school_name") if values.get(key))
+        return label or "Untitled"
+    return str(value)
+
+
+def diff_snapshots(old, new):
+    """
+    Compare two portfolio snapshots field by field
+
+    Returns {field: {'removed': [...], 'added': [...]}} for the changed fields.
+    List entries are compared whole, so an edited entry is both removed and
+    added; personal information is compared per attribute.
+    """
+    changes = {}
+    for field in Curriculum.model_fields:
+        old_value, new_value = getattr(old, field), getattr(new, field)
+        if old_value == new_value:
+            continue
+        if isinstance(old_value, list) or isinstance(new_value, list):
+            old_items, new_items = old_value or [], new_value or []
+            removed = [_describe(item) for item in old_items if item not in new_items]
+            added = [_describe(item) for item in new_items if item not in old_items]
+        elif hasattr(old_value, "model_dump") or hasattr(new_value, "model_dump"):
+            old_values = old_value.model_dump() if old_value else {}
+            new_values = new_value.model_dump() if new_value else {}
+            keys = [key for key in {**old_values, **new_values} if old_values.get(key) != new_values.get(key)]
+            removed = [f"{key}: {old_values[key]}" for key in keys if old_values.get(key)]
+            added = [f"{key}: {new_values[key]}" for key in keys if new_values.get(key)]
+        else:
+            removed = [str(old_value)] if old_value else []
+            added = [str(new_value)] if new_value else []
+        changes[field] = {'removed': removed, 'added': added}
+    return changes
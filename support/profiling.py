@@ -0,0 +1,226 @@
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from support.config_manager import ConfigManager
+from support.namespace_manager import get_namespace_dir
+from support.settings import (
+    profile_max_seconds, profile_retention, profile_sample_interval_ms, profiling_enabled
+)
+
+# Threads currently being sampled, so nested hooks do not start a second sampler
+_active_threads = set()
+_active_threads_lock = threading.Lock()
+
+
+def is_profiling_enabled(namespace=None):
+    """Check the TAILOR_CV_PROFILE env var and the namespace's settings"""
+    return profiling_enabled or bool(ConfigManager(namespace).get_config_value("profiling_enabled", False))
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ",")
+
+
+class StackSampler:
+    """
+    Statistical profiler sampling the stack of one thread from a helper thread
+
+    Every interval the target thread's stack is recorded as a collapsed stack
+    ("root;caller;callee"), the input format of flamegraph.pl and speedscope.
+    The profiled code runs at full speed; the cost is one stack walk per sample.
+    """
+
+    def __init__(self, thread_id, interval=None, max_seconds=None, until_frame_exits=None):
+        self.thread_id = thread_id
+        self.interval = (profile_sample_interval_ms if interval is None else interval) / 1000
+        self.max_seconds = profile_max_seconds if max_seconds is None else max_seconds
+        # Stop on our own once this frame is no longer on the target's stack
+        self.until_frame_exits = until_frame_exits
+        self.stacks = Counter()
+        self.samples = 0
+        self.started_at = None
+        self.duration = 0.0
+        self.finished = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self.started_at = time.time()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self
+
+    def _run(self):
+        start = time.perf_counter()
+        try:
+            while not self._stop.wait(self.interval):
+                frame = sys._current_frames().get(self.thread_id)
+                if frame is None or time.perf_counter() - start > self.max_seconds:
+                    break
+
+                labels = []
+                frame_found = self.until_frame_exits is None
+                while frame is not None:
+                    frame_found = frame_found or frame is self.until_frame_exits
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                if not frame_found:
+                    break
+
+                self.stacks[";".join(reversed(labels))] += 1
+                self.samples += 1
+        finally:
+            self.duration = time.perf_counter() - start
+            self.until_frame_exits = None
+            self.finished.set()
+
+
+def _claim_thread(thread_id):
+    with _active_threads_lock:
+        if thread_id in _active_threads:
+            return False
+        _active_threads.add(thread_id)
+        return True
+
+
+def _release_thread(thread_id):
+    with _active_threads_lock:
+        _active_threads.discard(thread_id)
+
+
+def get_profiles_dir(namespace=None):
+    """Get (and create) the directory holding the profiles of a namespace"""
+    profiles_dir = f"{get_namespace_dir(namespace)}/profiles"
+    os.makedirs(profiles_dir, exist_ok=True)
+    return profiles_dir
+
+
+def save_profile(sampler, kind, label, namespace=None):
+    """Write a sampler's collapsed stacks and metadata, then apply the retention limit"""
+    profiles_dir = get_profiles_dir(namespace)
+    started_at = datetime.fromtimestamp(sampler.started_at)
+    profile_id = f"{started_at.strftime('%Y%m%d_%H%M%S_%f')}_{kind}_{re.sub(r'[^A-Za-z0-9_.-]', '_', label)}"
+
+    with open(f"{profiles_dir}/{profile_id}.folded", "w", encoding="utf-8") as f:
+        for stack, count in sampler.stacks.most_common():
+            f.write(f"{stack} {count}\n")
+    with open(f"{profiles_dir}/{profile_id}.json", "w", encoding="utf-8") as f:
+        json.dump({
+            'id': profile_id,
+            'kind': kind,
+            'label': label,
+            'started_at': started_at.isoformat(),
+            'duration_ms': sampler.duration * 1000,
+            'samples': sampler.samples,
+            'interval_ms': sampler.interval * 1000,
+            'pid': os.getpid(),
+        }, f)
+
+    prune_profiles(namespace)
+    return profile_id
+
+
+def prune_profiles(namespace=None, keep=None):
+    """Delete the oldest profiles of a namespace beyond the retention limit"""
+    keep = profile_retention if keep is None else keep
+    profiles = sorted(
+        (entry for entry in os.scandir(get_profiles_dir(namespace)) if entry.name.endswith(".json")),
+        key=lambda entry: entry.name,
+        reverse=True
+    )
+    for entry in profiles[keep:]:
+        for path in (entry.path, entry.path[:-len(".json")] + ".folded"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+@contextmanager
+def profile_run(kind, label, namespace=None, enabled=True):
+    """Sample the current thread while the block runs and save the profile in a namespace"""
+    thread_id = threading.get_ident()
+    if not enabled or not _claim_thread(thread_id):
+        yield
+        return
+
+    sampler = StackSampler(thread_id).start()
+    try:
+        yield
+    finally:
+        sampler.stop()
+        _release_thread(thread_id)
+        save_profile(sampler, kind, label, namespace)
+
+
+def profile_script_run(label, frame, namespace=None):
+    """
+    Sample the current Streamlit script run until the page's frame returns
+
+    Pages cannot wrap their own run in a with block (st.stop and st.rerun
+    unwind it with exceptions), so the sampler stops by itself once the page
+    module's frame is gone from the stack and then saves the profile.
+    """
+    thread_id = threading.get_ident()
+    if not _claim_thread(thread_id):
+        return
+
+    sampler = StackSampler(thread_id, until_frame_exits=frame).start()
+
+    def save_when_finished():
+        sampler.finished.wait()
+        _release_thread(thread_id)
+        save_profile(sampler, "script", label, namespace)
+
+    threading.Thread(target=save_when_finished, name="profile-writer", daemon=True).start()
+
+
+def list_profiles(namespace=None):
+    """Get the metadata of the profiles recorded in a namespace, slowest first"""
+    profiles = []
+    for entry in os.scandir(get_profiles_dir(namespace)):
+        if entry.name.endswith(".json"):
+            try:
+                with open(entry.path, encoding="utf-8") as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+    profiles.sort(key=lambda profile: profile['duration_ms'], reverse=True)
+    return profiles
+
+
+def load_folded_stacks(profile_id, namespace=None):
+    """Read the collapsed stacks of a profile of a namespace"""
+    with open(f"{get_profiles_dir(namespace)}/{profile_id}.folded", encoding="utf-8") as f:
+        return f.read()
+
+
+def summarize_folded_stacks(folded, limit=25):
+    """Return the functions with the most samples as [(function, self, total)]"""
+    self_samples = Counter()
+    total_samples = Counter()
+    for line in folded.splitlines():
+        stack, _, count = line.rpartition(" ")
+        if not stack:
+            continue
+        frames = stack.split(";")
+        self_samples[frames[-1]] += int(count)
+        # A recursive function counts once per sample in its total
+        for label in set(frames):
+            total_samples[label] += int(count)
+
+    return sorted(
+        ((label, self_samples[label], total_samples[label]) for label in total_samples),
+        key=lambda item: (-item[1], -item[2])
+    )[:limit]
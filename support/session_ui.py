@@ -0,0 +1,775 @@
+import hashlib
+import json
+import os
+import sys
+import uuid
+import streamlit as st
+import streamlit.components.v1 as components
+
+from functools import partial
+from support.html_builder import CVBuilder, CoverLetterBuilder
+from support.job_queue import DONE, QUEUED, RUNNING, delete_job, get_job, start_workers, submit_job
+from support.namespace_manager import new_workspace_token, user_namespace, workspace_namespace, workspace_token
+from support.profiling import is_profiling_enabled, profile_script_run
+from support.settings import DEFAULT_NAMESPACE, private_workspaces
+from support.thumbnails import get_thumbnail_path, thumbnail_key, thumbnails_available
+from support.tracing import load_trace, span_tree, to_otlp_json
+from support.html_templates.template_registry import get_template
+
+# Streamlit helpers of a browser session: its namespace, background jobs,
+# debug panels and the document editors built on them.
+
+
+def file_download_button(label, file_path, file_name, mime="application/pdf", key=None):
+    """
+    Offer a file on disk for download
+
+    Streamlit's media file manager keeps a single copy of the file and serves
+    it as a regular HTTP download, instead of base64 data embedded in the page.
+    Returns False when the file cannot be read.
+    """
+    try:
+        with open(file_path, "rb") as f:
+            st.download_button(
+                label=label,
+                data=f,
+                file_name=file_name,
+                mime=mime,
+                key=key,
+                on_click="ignore"
+            )
+        return True
+    except OSError as e:
+        st.error(f"❌ Error reading {file_name}: {e}")
+        return False
+
+
+def profile_page(label):
+    """Profile the calling page's script run when profiling is enabled"""
+    if is_profiling_enabled(get_session_namespace()):
+        profile_script_run(label, sys._getframe(1), get_session_namespace())
+
+
+def get_session_namespace():
+    """
+    Get the storage namespace of the current browser session
+
+    Logged-in users get their own namespace, derived from the e-mail of the
+    login only. Anonymous sessions use the private workspace whose token is in
+    the ?workspace= query parameter (see create_private_workspace). Without
+    one they get a new private workspace, or the default shared namespace
+    when private workspaces are turned off.
+    """
+    if "namespace" not in st.session_state:
+        namespace = DEFAULT_NAMESPACE
+        if getattr(st.user, "is_logged_in", False) and st.user.get("email"):
+            namespace = user_namespace(st.user.get("email"))
+        elif st.query_params.get("workspace"):
+            try:
+                namespace = workspace_namespace(st.query_params.get("workspace"))
+            except ValueError:
+                fallback = "a new private workspace" if private_workspaces else "the shared workspace"
+                st.warning(f"⚠️ This workspace link is invalid, {fallback} is used instead.")
+        if namespace == DEFAULT_NAMESPACE and private_workspaces:
+            namespace = workspace_namespace(new_workspace_token())
+        st.session_state.namespace = namespace
+
+    # Page links drop query parameters, so the workspace link is restored on every page
+    token = workspace_token(st.session_state.namespace)
+    if token and st.query_params.get("workspace") != token:
+        st.query_params["workspace"] = token
+    return st.session_state.namespace
+
+
+def create_private_workspace():
+    """Move an anonymous session to a new private workspace reachable only through its link"""
+    token = new_workspace_token()
+    # Objects loaded from the previous namespace must not leak into the new one
+    st.session_state.clear()
+    st.query_params["workspace"] = token
+    st.session_state.namespace = workspace_namespace(token)
+    st.rerun()
+
+
+def submit_session_job(slot, kind, payload):
+    """
+    Submit a background job for this session, at most once per slot
+
+    The job id is kept in session state and the dedupe key is derived from the
+    session and slot, so reruns and double clicks reuse the pending job.
+    """
+    job_ids = st.session_state.setdefault("job_ids", {})
+    if slot in job_ids:
+        return job_ids[slot]
+
+    start_workers()
+    session_key = st.session_state.setdefault("session_key", uuid.uuid4().hex)
+    job_rounds = st.session_state.setdefault("job_rounds", {})
+    dedupe_key = f"{session_key}:{slot}:{job_rounds.get(slot, 0)}"
+
+    job_ids[slot] = submit_job(
+        kind, {**payload, "namespace": get_session_namespace()}, dedupe_key=dedupe_key
+    )
+    return job_ids[slot]
+
+
+def get_session_templates():
+    """Templates chosen in this session's editors, as keyword arguments of create_pdf"""
+    return {
+        'cv_template_id': st.session_state.get("template_id", "1"),
+        'cover_letter_template_id': st.session_state.get("cover_letter_template_id", "1"),
+    }
+
+
+def update_session_submission():
+    """
+    Save the documents of this session over the submission it created
+
+    The submission is the one recorded in current_submission_id, never the
+    latest row: background jobs such as triage tailoring save submissions
+    too. Returns whether a submission was updated.
+    """
+    from support.submission_manager import update_submission
+
+    submission_id = st.session_state.get("current_submission_id")
+    if not submission_id:
+        return False
+    information_extractor = st.session_state.information_extractor
+    updated = update_submission(
+        submission_id,
+        information_extractor.final_cv,
+        information_extractor.final_cover_letter,
+        information_extractor.jd_information,
+        namespace=get_session_namespace(),
+        **information_extractor.get_rendered_documents(**get_session_templates())
+    )
+    if updated:
+        prerender_session_pdfs(submission_id)
+    return updated
+
+
+def prerender_session_pdfs(submission_id):
+    """Start rendering a just saved submission's PDFs before the user asks for them"""
+    from support.pdf_prerender import queue_pdf_prerender
+
+    start_workers()
+    st.session_state.prerender_job_id = queue_pdf_prerender(
+        submission_id,
+        namespace=get_session_namespace(),
+        trace_id=st.session_state.get("trace_id")
+    )
+
+
+def has_session_job(slot):
+    """Check if a background job is pending for this session slot"""
+    return slot in st.session_state.get("job_ids", {})
+
+
+def pop_finished_session_job(slot, message, poll_interval=1):
+    """
+    Return the finished job of a session slot, or None
+
+    While the job is queued or running a progress message is shown and the
+    page is rerun every poll_interval seconds without blocking the script.
+    """
+    job_ids = st.session_state.get("job_ids", {})
+    if slot not in job_ids:
+        return None
+
+    job = get_job(job_ids[slot])
+    if job and job['status'] in (QUEUED, RUNNING):
+        start_workers()
+
+        @st.fragment(run_every=poll_interval)
+        def job_progress():
+            current = get_job(job_ids[slot])
+            if current and current['status'] in (QUEUED, RUNNING):
+                st.info(f"⏳ {message} ({current['status']})")
+            else:
+                st.rerun()
+
+        job_progress()
+        return None
+
+    del job_ids[slot]
+    job_rounds = st.session_state.setdefault("job_rounds", {})
+    job_rounds[slot] = job_rounds.get(slot, 0) + 1
+    if job:
+        # The outcome now lives in the session; drop the row and its pickled result
+        delete_job(job['id'])
+    return job
+
+
+def get_session_thumbnails(documents, slot="thumbnails"):
+    """
+    Get the first-page thumbnail path of each (key, build_html) document, or None if not ready
+
+    The key identifies the document's content (see thumbnail_key), so
+    build_html only runs for the documents without a stored thumbnail.
+    Those are rendered by a background worker in one job per batch of
+    content; a batch superseded by an edit is no longer waited for, and the
+    page reruns when the current one is ready.
+    """
+    paths = [get_thumbnail_path(key) for key, _ in documents]
+    errors = st.session_state.setdefault("thumbnail_errors", {})
+    if errors.get(slot):
+        st.caption(f"⚠️ Previews unavailable: {errors[slot]}")
+        return paths
+
+    missing = [(key, build_html) for (key, build_html), path in zip(documents, paths) if path is None]
+    batches = st.session_state.setdefault("thumbnail_batches", {})
+    batch_slot = None
+    if missing:
+        batch_hash = hashlib.sha256(" ".join(key for key, _ in missing).encode("utf-8")).hexdigest()[:16]
+        batch_slot = f"{slot}:{batch_hash}"
+
+    pending_slot = batches.get(slot)
+    if pending_slot and pending_slot != batch_slot:
+        # The content changed since this batch was queued; its thumbnails are still stored when done
+        st.session_state.get("job_ids", {}).pop(pending_slot, None)
+        del batches[slot]
+    if batch_slot and not has_session_job(batch_slot):
+        submit_session_job(
+            batch_slot, "render_thumbnails",
+            {"documents": [(key, build_html()) for key, build_html in missing]}
+        )
+        batches[slot] = batch_slot
+
+    if slot in batches:
+        job = pop_finished_session_job(batches[slot], "Rendering previews...")
+        if job:
+            del batches[slot]
+            if job['status'] != DONE:
+                # Do not retry a failing render on every run
+                errors[slot] = job['error'].splitlines()[0]
+            paths = [get_thumbnail_path(key) for key, _ in documents]
+    return paths
+
+
+def render_trace_panel(trace_id):
+    """Show where the time of a traced run went, in a collapsed debug panel"""
+    spans = load_trace(trace_id, get_session_namespace())
+    with st.expander(f"🐞 Debug: trace {trace_id or 'n/a'}", expanded=False):
+        if not spans:
+            st.info("No spans recorded for this run yet.")
+            return
+
+        start = min(record['startTimeUnixNano'] for record in spans)
+        end = max(record['endTimeUnixNano'] for record in spans)
+        st.markdown(f"**{len(spans)} spans, {(end - start) / 1e6:,.0f} ms end to end**")
+
+        totals = {}
+        for record in spans:
+            duration_ms = (record['endTimeUnixNano'] - record['startTimeUnixNano']) / 1e6
+            count, total_ms = totals.get(record['name'], (0, 0.0))
+            totals[record['name']] = (count + 1, total_ms + duration_ms)
+        st.dataframe(
+            [
+                {'span': name, 'calls': count, 'total ms': round(total_ms, 1)}
+                for name, (count, total_ms) in sorted(totals.items(), key=lambda item: -item[1][1])
+            ],
+            hide_index=True,
+            use_container_width=True
+        )
+
+        llm_calls = [record for record in spans if record['name'] == "llm.invoke"]
+        if llm_calls:
+            st.markdown("**LLM calls per task** (baseline: the provider's large model for every task)")
+            st.dataframe(
+                [
+                    {
+                        'task': record['attributes'].get('llm.task'),
+                        'model': record['attributes'].get('llm.model'),
+                        'ms': round((record['endTimeUnixNano'] - record['startTimeUnixNano']) / 1e6, 1),
+                        'tokens in/out': (
+                            f"{record['attributes'].get('llm.input_tokens', '?')}"
+                            f"/{record['attributes'].get('llm.output_tokens', '?')}"
+                        ),
+                        'cost $': record['attributes'].get('llm.cost_usd'),
+                        'baseline cost $': record['attributes'].get('llm.baseline_cost_usd'),
+                    }
+                    for record in llm_calls
+                ],
+                hide_index=True,
+                use_container_width=True
+            )
+
+        st.dataframe(
+            [
+                {
+                    'span': f"{'  ' * depth}{record['name']}",
+                    'start ms': round((record['startTimeUnixNano'] - start) / 1e6, 1),
+                    'duration ms': round((record['endTimeUnixNano'] - record['startTimeUnixNano']) / 1e6, 1),
+                    'status': record['status']['code'].removeprefix("STATUS_CODE_"),
+                    'attributes': ", ".join(
+                        f"{key}={value}" for key, value in record['attributes'].items()
+                        if key not in ('service.name', 'process.pid')
+                    ),
+                }
+                for depth, record in span_tree(spans)
+            ],
+            hide_index=True,
+            use_container_width=True
+        )
+        st.download_button(
+            "⬇️ Download trace (OTLP/JSON)",
+            data=json.dumps(to_otlp_json(spans)),
+            file_name=f"trace_{trace_id}.json",
+            mime="application/json",
+            key=f"download_trace_{trace_id}"
+        )
+
+
+# Preview component: receives the template skeleton once, then only the
+# placeholder values that changed since the version the browser holds.
+_document_preview = components.declare_component(
+    "document_preview",
+    path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "preview_component")
+)
+
+
+def render_document_preview(kind, document, template_id="1", key="document_preview", height=1300):
+    """
+    Render a live preview of a CV or cover letter
+
+    The browser rewrites the preview frame at most every 150 ms. This only
+    debounces the repaint: each committed edit still reruns the script and
+    sends the changed placeholder values.
+
+    Args:
+        kind: 'cv' or 'cover_letter'
+        document: FinalCurriculum or FinalCoverLetter to preview
+        template_id: ID of template to use
+        key: Unique component key within the page
+        height: Height of the preview frame in pixels
+    """
+    builder = CVBuilder() if kind == "cv" else CoverLetterBuilder()
+    template = get_template(kind, template_id)
+    if not template:
+        raise ValueError(f"Template '{template_id}' not found.")
+
+    fields = template.prepare(builder.build_template_data(document))
+    digest = hashlib.sha1(f"{kind}:{template_id}".encode("utf-8"))
+    for field_name in sorted(fields):
+        digest.update(b"\0")
+        digest.update(fields[field_name].encode("utf-8"))
+    version = digest.hexdigest()
+
+    state_key = f"_{key}_state"
+    state = st.session_state.get(state_key)
+    client_value = st.session_state.get(key) or {}
+    need_full = client_value.get("need_full")
+
+    if (
+        state is None
+        or state["template"] != (kind, template_id)
+        or (need_full and need_full != state["need_full"])
+    ):
+        # First render, template switch or the browser lost its copy
+        args = {
+            "version": version,
+            "base": None,
+            "skeleton": [list(segment) for segment in template.segments],
+            "tail": template.tail,
+            "fields": fields,
+        }
+    elif version == state["version"]:
+        # Nothing changed: keep the payload minimal
+        args = {"version": version, "base": None, "fields": {}}
+    else:
+        changed = {
+            field_name: value for field_name, value in fields.items()
+            if state["fields"].get(field_name) != value
+        }
+        args = {"version": version, "base": state["version"], "fields": changed}
+
+    st.session_state[state_key] = {
+        "template": (kind, template_id),
+        "version": version,
+        "fields": fields,
+        "need_full": need_full,
+    }
+    _document_preview(height=height, key=key, default=None, **args)
+
+
+def get_session_page_fit(html, max_pages=1):
+    """
+    Get the page fit of a document, or None while a background worker measures it
+
+    Layouts run as jobs keyed by the hash of the HTML, so the script thread
+    never waits for WeasyPrint. A measurement superseded by an edit is no
+    longer waited for, and the page reruns when the current one is ready.
+    """
+    from support.page_fit import cache_page_fit, get_cached_page_fit, page_fit_key
+
+    key = page_fit_key(html, max_pages)
+    fit = get_cached_page_fit(key)
+    if fit is not None:
+        return fit
+
+    slot = f"page_fit:{key}"
+    pending_slot = st.session_state.get("page_fit_slot")
+    if pending_slot and pending_slot != slot:
+        st.session_state.get("job_ids", {}).pop(pending_slot, None)
+    if not has_session_job(slot):
+        submit_session_job(slot, "estimate_page_fit", {"html": html, "max_pages": max_pages})
+    st.session_state.page_fit_slot = slot
+
+    job = pop_finished_session_job(slot, "Checking the page fit...")
+    if job is None:
+        return None
+    st.session_state.page_fit_slot = None
+    if job['status'] != DONE:
+        st.caption(f"⚠️ Page fit unavailable: {job['error'].splitlines()[0]}")
+        return None
+    cache_page_fit(key, job['result'])
+    return job['result']
+
+
+def render_page_fit(final_cv, template_id="1", max_pages=1):
+    """Show whether the CV fits in max_pages, with a button trimming projects until it does"""
+    page_label = "page" if max_pages == 1 else "pages"
+    trim_job = pop_finished_session_job("trim_projects", "Trimming projects to fit...")
+    if trim_job:
+        if trim_job['status'] != DONE:
+            st.error(f"❌ Trimming failed: {trim_job['error'].splitlines()[0]}")
+        elif trim_job['result'] >= len(final_cv.projects or []):
+            st.info(f"💡 Removing projects is not enough to fit on {max_pages} {page_label}, shorten other sections.")
+        else:
+            removed = final_cv.projects[trim_job['result']:]
+            del final_cv.projects[trim_job['result']:]
+            if "information_extractor" in st.session_state:
+                st.session_state.generated_html = st.session_state.information_extractor.build_final_cv(
+                    update_final_cv=True,
+                    template_id=template_id
+                )
+            st.toast(f"✂️ Removed {len(removed)} project(s): " + ", ".join(p.title or "Untitled" for p in removed))
+            st.rerun()
+    if has_session_job("trim_projects"):
+        return
+
+    fit = get_session_page_fit(CVBuilder().build_html_from_cv(final_cv, template_id), max_pages)
+    if fit is None:
+        return
+    if fit['fits']:
+        st.success(f"✅ Fits on {max_pages} {page_label}")
+        return
+
+    st.warning(f"⚠️ Overflows by {fit['overflow_lines']} lines ({fit['pages']} pages)")
+    overflowing = [
+        f"{section['title']}: {section['overflow_lines']} lines"
+        for section in fit['sections'] if section['overflow_lines']
+    ]
+    if overflowing:
+        st.caption("Overflowing sections: " + ", ".join(overflowing))
+
+    if final_cv.projects and st.button("✂️ Trim lowest-ranked projects to fit", key="trim_projects_btn"):
+        submit_session_job("trim_projects", "trim_projects_to_fit", {
+            "final_cv": final_cv,
+            "template_id": template_id,
+            "max_pages": max_pages,
+        })
+        st.rerun()
+
+
+def render_editable_cv(final_cv):
+    # Ensure session lists are initialized
+    if "exps" not in st.session_state:
+        st.session_state.exps = final_cv.experiences or []
+    if "projs" not in st.session_state:
+        st.session_state.projs = final_cv.projects or []
+    if "edus" not in st.session_state:
+        st.session_state.edus = final_cv.education or []
+
+    # Callback to add new empty entry
+    def add_entry(entry_type):
+        if entry_type == "exp":
+            st.session_state.exps.append(type(final_cv.experiences[0])())  # or empty dataclass
+        elif entry_type == "proj":
+            st.session_state.projs.append(type(final_cv.projects[0])())
+        else:
+            st.session_state.edus.append(type(final_cv.education[0])())
+
+    # Callback to delete entry at index
+    def delete_entry(entry_type, idx):
+        if entry_type == "exp":
+            st.session_state.exps.pop(idx)
+        elif entry_type == "proj":
+            st.session_state.projs.pop(idx)
+        else:
+            st.session_state.edus.pop(idx)
+
+    with st.expander("🧍‍♂️ Personality"):
+        final_cv.personality.name = st.text_input("Name", value=final_cv.personality.name or "")
+        final_cv.personality.surname = st.text_input("Surname", value=final_cv.personality.surname or "")
+        final_cv.job_title = st.text_input("Job Title", value=final_cv.job_title or "")
+        final_cv.personality.e_mail = st.text_input("Email", value=final_cv.personality.e_mail or "")
+        final_cv.personality.telephone = st.text_input("Telephone", value=final_cv.personality.telephone or "")
+        final_cv.personality.linkedin_link = st.text_input("LinkedIn", value=final_cv.personality.linkedin_link or "")
+        final_cv.personality.address = st.text_input("Address", value=final_cv.personality.address or "")
+
+    with st.expander("📝 Summary"):
+        final_cv.summary = st.text_area("Summary", value=final_cv.summary or "", height=100)
+
+    with st.expander("💼 Work Experience"):
+        for i, exp in enumerate(st.session_state.exps):
+            with st.container():
+                st.markdown(f"**Experience #{i+1}**")
+                exp.title = st.text_input("Title", exp.title or "", key=f"exp_title_{i}")
+                exp.company = st.text_input("Company", exp.company or "", key=f"exp_company_{i}")
+                exp.start_date = st.text_input("Start Date", exp.start_date or "", key=f"exp_start_{i}")
+                exp.end_date = st.text_input("End Date", exp.end_date or "", key=f"exp_end_{i}")
+                exp.description = st.text_area("Description", exp.description or "", key=f"exp_desc_{i}")
+                st.button("❌ Remove Experience", key=f"del_exp_{i}", on_click=delete_entry, args=("exp", i))
+                st.markdown("---")  # Horizontal line separator
+
+        st.button("➕ Add Experience", on_click=add_entry, args=("exp",), key="add_exp_btn")
+
+    with st.expander("🛠️ Projects"):
+        for i, proj in enumerate(st.session_state.projs):
+            with st.container():
+                st.markdown(f"**Project #{i+1}**")
+                proj.title = st.text_input("Title", proj.title or "", key=f"proj_title_{i}")
+                proj.company = st.text_input("Company", proj.company or "", key=f"proj_company_{i}")
+                proj.start_date = st.text_input("Start Date", proj.start_date or "", key=f"proj_start_{i}")
+                proj.end_date = st.text_input("End Date", proj.end_date or "", key=f"proj_end_{i}")
+                proj.description = st.text_area("Description", proj.description or "", key=f"proj_desc_{i}")
+                st.button("❌ Remove Project", key=f"del_proj_{i}", on_click=delete_entry, args=("proj", i))
+                st.markdown("---")
+        st.button("➕ Add Project", on_click=add_entry, args=("proj",))
+
+    with st.expander("🎓 Education"):
+        for i, edu in enumerate(st.session_state.edus):
+            with st.container():
+                st.markdown(f"**Experience #{i+1}**")
+                edu.title = st.text_input("Title", edu.title or "", key=f"edu_title_{i}")
+                edu.school_name = st.text_input("School", edu.school_name or "", key=f"edu_school_{i}")
+                edu.start_date = st.text_input("Start Date", edu.start_date or "", key=f"edu_start_{i}")
+                edu.end_date = st.text_input("End Date", edu.end_date or "", key=f"edu_end_{i}")
+                edu.description = st.text_area("Description", edu.description or "", key=f"edu_desc_{i}")
+                st.button("❌ Remove Education", key=f"del_edu_{i}", on_click=delete_entry, args=("edu", i))
+                st.markdown("---")
+        st.button("➕ Add Education", on_click=add_entry, args=("edu",))
+
+    with st.expander("🧩 Skills"):
+        hard_skills_input = st.text_area(
+            "Hard Skills (comma-separated)",
+            value=", ".join(final_cv.hard_skills or []),
+            key="hard_skills_input"
+        )
+        soft_skills_input = st.text_area(
+            "Soft Skills (comma-separated)",
+            value=", ".join(final_cv.soft_skills or []),
+            key="soft_skills_input"
+        )
+
+    with st.expander("🧾 Template Selection", expanded=True):
+        template_options = {
+            "Template 1": "1",
+            "Template 2": "2",
+            # Add new templates
+        }
+        selected_template_label = st.selectbox("Choose a template", list(template_options.keys()))
+        st.session_state.template_id = template_options[selected_template_label]
+
+        # First page of the CV in every template, rendered in the background
+        if thumbnails_available():
+            cv_builder = CVBuilder()
+            cv_digest = hashlib.sha256(final_cv.model_dump_json().encode("utf-8")).hexdigest()
+            thumbnails = get_session_thumbnails(
+                [
+                    (
+                        thumbnail_key(f"cv:{template_id}:{get_template('cv', template_id).digest}:{cv_digest}"),
+                        partial(cv_builder.build_html_from_cv, final_cv, template_id)
+                    )
+                    for template_id in template_options.values()
+                ],
+                slot="template_thumbnails"
+            )
+            for column, label, thumbnail in zip(st.columns(len(template_options)), template_options, thumbnails):
+                with column:
+                    if thumbnail:
+                        st.image(thumbnail, caption=label, use_container_width=True)
+                    else:
+                        st.caption(f"⏳ {label} preview pending")
+
+    if st.button("✅ Apply Modifications"):
+        final_cv.hard_skills = [s.strip() for s in hard_skills_input.split(",") if s.strip()]
+        final_cv.soft_skills = [s.strip() for s in soft_skills_input.split(",") if s.strip()]
+
+        st.success("Changes applied. CV updated.")
+        st.session_state.information_extractor.final_cv = final_cv
+        st.session_state.generated_html = st.session_state.information_extractor.build_final_cv(
+            update_final_cv=True,
+            template_id=st.session_state.template_id
+        )
+        
+        # Update database if submission exists
+        try:
+            if update_session_submission():
+                st.success("✅ Database updated with CV changes!")
+        except Exception as e:
+            st.warning(f"⚠️ Database update failed: {e}")
+
+    if st.button("📄 Generate PDF"):
+        if st.session_state.get("is_new_submission", True):
+            with st.spinner("Saving submission..."):
+                submission_id = st.session_state.information_extractor.create_pdf(**get_session_templates())
+            st.session_state.is_new_submission = False
+            st.session_state.current_submission_id = submission_id
+            prerender_session_pdfs(submission_id)
+
+        # The page's download section renders the PDFs in a background worker
+        st.session_state.show_downloads = True
+        st.session_state.download_generated = False
+        st.rerun()
+
+
+def render_editable_cover_letter(final_cover_letter):
+    """Render editable cover letter interface"""
+    # Ensure session state is initialized
+    if "cover_letter_paragraphs" not in st.session_state:
+        st.session_state.cover_letter_paragraphs = final_cover_letter.body_paragraphs or []
+    
+    # Callback to add new paragraph
+    def add_paragraph():
+        st.session_state.cover_letter_paragraphs.append("")
+    
+    # Callback to delete paragraph at index
+    def delete_paragraph(idx):
+        st.session_state.cover_letter_paragraphs.pop(idx)
+    
+    # Personal Information
+    with st.expander("👤 Personal Information", expanded=True):
+        final_cover_letter.name = st.text_input(
+            "Name", 
+            value=final_cover_letter.name or "",
+            key="cl_name"
+        )
+        final_cover_letter.surname = st.text_input(
+            "Surname", 
+            value=final_cover_letter.surname or "",
+            key="cl_surname"
+        )
+        final_cover_letter.current_position = st.text_input(
+            "Current Position", 
+            value=final_cover_letter.current_position or "",
+            key="cl_position"
+        )
+        final_cover_letter.email = st.text_input(
+            "Email", 
+            value=final_cover_letter.email or "",
+            key="cl_email"
+        )
+        final_cover_letter.phone = st.text_input(
+            "Phone", 
+            value=final_cover_letter.phone or "",
+            key="cl_phone"
+        )
+        final_cover_letter.linkedin = st.text_input(
+            "LinkedIn", 
+            value=final_cover_letter.linkedin or "",
+            key="cl_linkedin"
+        )
+        final_cover_letter.github = st.text_input(
+            "GitHub", 
+            value=final_cover_letter.github or "",
+            key="cl_github"
+        )
+    
+    # Cover Letter Content
+    with st.expander("✉️ Cover Letter Content", expanded=True):
+        final_cover_letter.salutation = st.text_input(
+            "Salutation", 
+            value=final_cover_letter.salutation or "Dear Hiring Manager,",
+            key="cl_salutation"
+        )
+        
+        st.markdown("**Body Paragraphs:**")
+        for i, paragraph in enumerate(st.session_state.cover_letter_paragraphs):
+            col1, col2 = st.columns([0.9, 0.1])
+            with col1:
+                st.session_state.cover_letter_paragraphs[i] = st.text_area(
+                    f"Paragraph {i+1}", 
+                    paragraph, 
+                    key=f"cl_para_{i}",
+                    height=100
+                )
+            with col2:
+                st.button("❌", key=f"cl_del_para_{i}", on_click=delete_paragraph, args=(i,))
+        
+        st.button("➕ Add Paragraph", on_click=add_paragraph, key="cl_add_para_btn")
+        
+        final_cover_letter.closing = st.text_input(
+            "Closing", 
+            value=final_cover_letter.closing or "Thank you for considering my application. I look forward to hearing from you.",
+            key="cl_closing"
+        )
+    
+    # Job Information
+    with st.expander("💼 Job Information", expanded=True):
+        final_cover_letter.position_title = st.text_input(
+            "Position Title", 
+            value=final_cover_letter.position_title or "",
+            key="cl_job_title"
+        )
+        final_cover_letter.company_name = st.text_input(
+            "Company Name", 
+            value=final_cover_letter.company_name or "",
+            key="cl_company"
+        )
+        final_cover_letter.recipient_name = st.text_input(
+            "Recipient Name (optional)", 
+            value=final_cover_letter.recipient_name or "",
+            key="cl_recipient"
+        )
+        final_cover_letter.company_address = st.text_input(
+            "Company Address (optional)", 
+            value=final_cover_letter.company_address or "",
+            key="cl_address"
+        )
+    
+    # Template Selection
+    with st.expander("🎨 Template Selection", expanded=True):
+        template_options = {
+            "Template 1": "1",
+            #"Template 2": "2",
+            # Add more templates as needed
+        }
+        selected_template_label = st.selectbox(
+            "Choose a template", 
+            list(template_options.keys()),
+            key="cl_template_select"
+        )
+        st.session_state.cover_letter_template_id = template_options[selected_template_label]
+    
+    # Apply Changes Button
+    if st.button("✅ Apply Cover Letter Changes", key="cl_apply_btn"):
+        # Update body paragraphs
+        final_cover_letter.body_paragraphs = st.session_state.cover_letter_paragraphs
+        
+        # Update job description information to match cover letter
+        if "information_extractor" in st.session_state:
+            # Use the new method to update job description information
+            success = st.session_state.information_extractor.update_jd_from_cover_letter(final_cover_letter)
+            if success:
+                st.success("✅ Job description information also updated!")
+            else:
+                st.warning("⚠️ Job description information update failed, but cover letter changes were applied.")
+        
+        st.success("✅ Cover letter changes applied!")
+        
+        # Update session state
+        if "information_extractor" in st.session_state:
+            st.session_state.information_extractor.final_cover_letter = final_cover_letter
+            st.session_state.generated_html_cover_letter = st.session_state.information_extractor.build_final_cover_letter(
+                update_final_cover_letter=True,
+                template_id=st.session_state.cover_letter_template_id
+            )
+            
+            # Update database if submission exists
+            try:
+                if update_session_submission():
+                    st.success("✅ Database updated with cover letter changes!")
+            except Exception as e:
+                st.warning(f"⚠️ Database update failed: {e}")
@@ -21,5 +21,36 @@ else:
         if "GEMINI" in config and "API_KEY" in config["GEMINI"]:
             gemini_api_key_value = config.get('GEMINI', 'API_KEY')
 
+# Each user (or workspace) stores its data in its own namespace under
+# {dest_dir}/users; the default namespace keeps the single-user layout.
+DEFAULT_NAMESPACE = ""
+# Anonymous sessions get their own private workspace instead of the default
+# namespace; set TAILOR_CV_PRIVATE_WORKSPACES=0 for a single-user install
+private_workspaces = os.environ.get("TAILOR_CV_PRIVATE_WORKSPACES", "1") != "0"
+max_submissions_per_namespace = int(os.environ.get("TAILOR_CV_MAX_SUBMISSIONS", "1000"))
+max_upload_mb_per_namespace = int(os.environ.get("TAILOR_CV_MAX_UPLOAD_MB", "100"))
+
+# Number of background worker processes serving LLM and PDF jobs
+job_workers = int(os.environ.get("TAILOR_CV_JOB_WORKERS", "2"))
+# Finished jobs not collected by their page are deleted after this many hours
+job_retention_hours = float(os.environ.get("TAILOR_CV_JOB_RETENTION_HOURS", "24"))
+
+# Tracing of submissions (spans exported as JSON lines to the traces directory of each namespace)
+tracing_enabled = os.environ.get("TAILOR_CV_TRACING", "1") != "0"
+trace_retention = int(os.environ.get("TAILOR_CV_TRACE_RETENTION", "200"))
+
+# Sampling profiler for script runs and jobs (also switchable in Manage Settings)
+profiling_enabled = os.environ.get("TAILOR_CV_PROFILE", "0") == "1"
+profile_retention = int(os.environ.get("TAILOR_CV_PROFILE_RETENTION", "100"))
+profile_sample_interval_ms = float(os.environ.get("TAILOR_CV_PROFILE_INTERVAL_MS", "5"))
+profile_max_seconds = float(os.environ.get("TAILOR_CV_PROFILE_MAX_SECONDS", "600"))
+
+# Disk budget of the first-page thumbnails in {dest_dir}/thumbnails (LRU eviction)
+thumbnail_cache_mb = int(os.environ.get("TAILOR_CV_THUMBNAIL_CACHE_MB", "50"))
+
+# Job title and company are read locally from the job description when the
+# heuristics are at least this confident; below it the LLM is asked instead
+jd_local_confidence_threshold = float(os.environ.get("TAILOR_CV_JD_LOCAL_THRESHOLD", "0.8"))
+
 if not os.path.exists(dest_dir):
     os.makedirs(dest_dir)
@@ -2,12 +2,19 @@ import sqlite3
 import pickle
 import tempfile
 import os
+import zlib
 from datetime import datetime
 from support.settings import dest_dir
+from support.tracing import current_trace_id, set_span_attributes, span, traced
 from support.html_builder import CVBuilder, CoverLetterBuilder
-import weasyprint
+from support.namespace_manager import check_submission_quota, normalize_namespace
+from support.portfolio_store import (
+    initialize_portfolio_store, join_final_cv, list_snapshots, load_snapshot,
+    save_snapshot, split_final_cv
+)
 
 DB_PATH = f"{dest_dir}/cv_submissions.db"
+DB_SPAN_ATTRIBUTES = {'db.system': "sqlite", 'db.name': "cv_submissions"}
 
 
 def initialize_db():
@@ -24,46 +31,185 @@ def initialize_db():
                 submission_date TEXT NOT NULL,
                 cv_data BLOB NOT NULL,
                 cover_letter_data BLOB NOT NULL,
-                jd_information_data BLOB NOT NULL
+                jd_information_data BLOB NOT NULL,
+                namespace TEXT NOT NULL DEFAULT ''
             )
         """)
+
+        # Databases created before namespaces existed belong to the default one
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(submissions)")]
+        if "namespace" not in columns:
+            conn.execute("ALTER TABLE submissions ADD COLUMN namespace TEXT NOT NULL DEFAULT ''")
+        # Rows without a snapshot keep the full FinalCurriculum in cv_data
+        if "portfolio_snapshot_id" not in columns:
+            conn.execute("ALTER TABLE submissions ADD COLUMN portfolio_snapshot_id TEXT")
+        # Trace of the run that created the submission (see support.tracing)
+        if "trace_id" not in columns:
+            conn.execute("ALTER TABLE submissions ADD COLUMN trace_id TEXT")
+        # Bumped on every update, so renders of older contents can be told apart
+        if "revision" not in columns:
+            conn.execute("ALTER TABLE submissions ADD COLUMN revision INTEGER NOT NULL DEFAULT 0")
+        # Templates and zlib-compressed HTML the documents were last rendered with;
+        # older rows have none and are rebuilt from their objects with template 1
+        for column in ("cv_template_id TEXT", "cover_letter_template_id TEXT",
+                       "cv_html BLOB", "cover_letter_html BLOB"):
+            if column.split()[0] not in columns:
+                conn.execute(f"ALTER TABLE submissions ADD COLUMN {column}")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_submissions_namespace ON submissions (namespace, id)")
+        initialize_portfolio_store(conn)
         conn.commit()
 
 
-def save_submission(company, position, cv_object, cover_letter_object, jd_information_object):
-    """Save a submission with structured objects to the database"""
-    # Ensure database is initialized
+@traced("db.save_portfolio_snapshot", **DB_SPAN_ATTRIBUTES)
+def save_portfolio_snapshot(structured_cv, namespace=None):
+    """Store a version of the portfolio and return its snapshot id"""
     initialize_db()
-    
+
+    with sqlite3.connect(DB_PATH) as conn:
+        snapshot_id = save_snapshot(conn, structured_cv, normalize_namespace(namespace))
+        conn.commit()
+        return snapshot_id
+
+
+@traced("db.get_portfolio_snapshots", **DB_SPAN_ATTRIBUTES)
+def get_portfolio_snapshots(namespace=None):
+    """List (snapshot id, created_at) of the portfolio versions, newest first"""
+    initialize_db()
+
+    with sqlite3.connect(DB_PATH) as conn:
+        return list_snapshots(conn, normalize_namespace(namespace))
+
+
+@traced("db.get_portfolio_snapshot", **DB_SPAN_ATTRIBUTES)
+def get_portfolio_snapshot(snapshot_id, namespace=None):
+    """Load a version of the portfolio, or None if it does not exist"""
+    initialize_db()
+
+    with sqlite3.connect(DB_PATH) as conn:
+        return load_snapshot(conn, snapshot_id, normalize_namespace(namespace))
+
+
+def _dump_cv(conn, cv_object, snapshot_id, namespace):
+    """Pickle a final CV, leaving out what its portfolio snapshot already holds"""
+    snapshot = load_snapshot(conn, snapshot_id, namespace) if snapshot_id else None
+    if snapshot is None:
+        return pickle.dumps(cv_object)
+    return pickle.dumps(split_final_cv(cv_object, snapshot))
+
+
+def _compress_html(html):
+    return zlib.compress(html.encode("utf-8"))
+
+
+def _decompress_html(blob):
+    return zlib.decompress(blob).decode("utf-8")
+
+
+def _dump_html(cv_object, cover_letter_object, cv_template_id, cover_letter_template_id, cv_html=None,
+               cover_letter_html=None):
+    """Compress the final HTML of both documents, rendering what was not passed in"""
+    if cv_html is None:
+        cv_html = CVBuilder().build_html_from_cv(cv_object, cv_template_id)
+    if cover_letter_html is None:
+        cover_letter_html = CoverLetterBuilder().build_html_from_cover_letter(
+            cover_letter_object, cover_letter_template_id
+        )
+    return _compress_html(cv_html), _compress_html(cover_letter_html)
+
+
+@traced("db.count_submissions", **DB_SPAN_ATTRIBUTES)
+def count_submissions(namespace=None):
+    """Count the submissions stored in a namespace"""
+    initialize_db()
+
     with sqlite3.connect(DB_PATH) as conn:
+        return conn.execute(
+            "SELECT COUNT(*) FROM submissions WHERE namespace = ?",
+            (normalize_namespace(namespace),)
+        ).fetchone()[0]
+
+
+@traced("db.save_submission", **DB_SPAN_ATTRIBUTES)
+def save_submission(company, position, cv_object, cover_letter_object, jd_information_object, namespace=None,
+                    portfolio=None, cv_template_id="1", cover_letter_template_id="1", cv_html=None,
+                    cover_letter_html=None):
+    """
+    Save a submission with structured objects to the database
+
+    When the portfolio the CV was tailored from is given, it is stored as a
+    deduplicated snapshot and the CV blob only keeps the tailored sections.
+    The templates and the final HTML built with them are kept too, so PDFs
+    are rendered from that HTML. Returns the id of the new submission.
+    """
+    # Ensure database is initialized
+    initialize_db()
+    namespace = normalize_namespace(namespace)
+    cv_html_blob, cover_letter_html_blob = _dump_html(
+        cv_object, cover_letter_object, cv_template_id, cover_letter_template_id, cv_html, cover_letter_html
+    )
+
+    with sqlite3.connect(DB_PATH, timeout=30) as conn:
+        # Count and insert in one write transaction, so concurrent saves cannot both pass the quota
+        conn.execute("BEGIN IMMEDIATE")
+        check_submission_quota(conn.execute(
+            "SELECT COUNT(*) FROM submissions WHERE namespace = ?", (namespace,)
+        ).fetchone()[0])
+        snapshot_id = save_snapshot(conn, portfolio, namespace) if portfolio is not None else None
+
         # Pickle the structured objects
-        cv_blob = pickle.dumps(cv_object)
+        cv_blob = _dump_cv(conn, cv_object, snapshot_id, namespace)
         cover_letter_blob = pickle.dumps(cover_letter_object)
         jd_info_blob = pickle.dumps(jd_information_object)
 
-        conn.execute("""
+        cursor = conn.execute("""
             INSERT INTO submissions (company, position, submission_date, 
-            cv_data, cover_letter_data, jd_information_data)
-            VALUES (?, ?, ?, ?, ?, ?)
+            cv_data, cover_letter_data, jd_information_data, namespace, portfolio_snapshot_id, trace_id,
+            cv_template_id, cover_letter_template_id, cv_html, cover_letter_html)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """, (company, position, datetime.now().isoformat(), 
-              cv_blob, cover_letter_blob, jd_info_blob))
+              cv_blob, cover_letter_blob, jd_info_blob, namespace, snapshot_id, current_trace_id(),
+              cv_template_id, cover_letter_template_id, cv_html_blob, cover_letter_html_blob))
         conn.commit()
+        return cursor.lastrowid
+
 
+@traced("db.update_submission", **DB_SPAN_ATTRIBUTES)
+def update_submission(submission_id, cv_object, cover_letter_object, jd_information_object, namespace=None,
+                      cv_template_id=None, cover_letter_template_id=None, cv_html=None, cover_letter_html=None):
+    """
+    Update an existing submission with new structured objects
 
-def update_submission(submission_id, cv_object, cover_letter_object, jd_information_object):
-    """Update an existing submission with new structured objects"""
+    Templates that are not given stay as stored, and the HTML that is not
+    given is rebuilt from the new objects.
+    """
     try:
+        namespace = normalize_namespace(namespace)
         with sqlite3.connect(DB_PATH) as conn:
+            row = conn.execute(
+                "SELECT portfolio_snapshot_id, cv_template_id, cover_letter_template_id "
+                "FROM submissions WHERE id = ? AND namespace = ?",
+                (submission_id, namespace)
+            ).fetchone()
+            if not row:
+                return False
+            cv_template_id = cv_template_id or row[1] or "1"
+            cover_letter_template_id = cover_letter_template_id or row[2] or "1"
+
             # Pickle the updated structured objects
-            cv_blob = pickle.dumps(cv_object)
+            cv_blob = _dump_cv(conn, cv_object, row[0], namespace)
             cover_letter_blob = pickle.dumps(cover_letter_object)
             jd_info_blob = pickle.dumps(jd_information_object)
+            cv_html_blob, cover_letter_html_blob = _dump_html(
+                cv_object, cover_letter_object, cv_template_id, cover_letter_template_id, cv_html, cover_letter_html
+            )
 
             conn.execute("""
                 UPDATE submissions 
-                SET cv_data = ?, cover_letter_data = ?, jd_information_data = ?
-                WHERE id = ?
-            """, (cv_blob, cover_letter_blob, jd_info_blob, submission_id))
+                SET cv_data = ?, cover_letter_data = ?, jd_information_data = ?, revision = revision + 1,
+                    cv_template_id = ?, cover_letter_template_id = ?, cv_html = ?, cover_letter_html = ?
+                WHERE id = ? AND namespace = ?
+            """, (cv_blob, cover_letter_blob, jd_info_blob, cv_template_id, cover_letter_template_id,
+                  cv_html_blob, cover_letter_html_blob, submission_id, namespace))
             conn.commit()
             return True
     except Exception as e:
@@ -71,15 +217,17 @@ def update_submission(submission_id, cv_object, cover_letter_object, jd_informat
         return False
 
 
-def get_all_submissions():
-    """Get all submissions from the database"""
+@traced("db.get_all_submissions", **DB_SPAN_ATTRIBUTES)
+def get_all_submissions(namespace=None):
+    """Get all submissions of a namespace from the database"""
     try:
         # Ensure database is initialized
         initialize_db()
         
         with sqlite3.connect(DB_PATH) as conn:
             result = conn.execute(
-                "SELECT id, company, position, submission_date FROM submissions"
+                "SELECT id, company, position, submission_date FROM submissions WHERE namespace = ? ORDER BY id",
+                (normalize_namespace(namespace),)
             ).fetchall()
             return result
     except sqlite3.OperationalError as e:
@@ -91,17 +239,22 @@ def get_all_submissions():
         return []
 
 
-def get_submission_objects(submission_id):
+@traced("db.get_submission_objects", **DB_SPAN_ATTRIBUTES)
+def get_submission_objects(submission_id, namespace=None):
     """Get structured objects for a specific submission"""
     try:
+        namespace = normalize_namespace(namespace)
         with sqlite3.connect(DB_PATH) as conn:
             result = conn.execute(
-                "SELECT cv_data, cover_letter_data, jd_information_data FROM submissions WHERE id = ?", 
-                (submission_id,)
+                "SELECT cv_data, cover_letter_data, jd_information_data, portfolio_snapshot_id "
+                "FROM submissions WHERE id = ? AND namespace = ?", 
+                (submission_id, namespace)
             ).fetchone()
             
             if result:
                 cv_object = pickle.loads(result[0])
+                if result[3]:
+                    cv_object = join_final_cv(cv_object, load_snapshot(conn, result[3], namespace))
                 cover_letter_object = pickle.loads(result[1])
                 jd_info_object = pickle.loads(result[2])
                 return cv_object, cover_letter_object, jd_info_object
@@ -111,28 +264,122 @@ def get_submission_objects(submission_id):
         return None, None, None
 
 
-def generate_pdf_from_submission(submission_id, template_id="1"):
-    """Generate PDFs from stored structured objects and return file paths"""
-    try:
-        cv_object, cover_letter_object, jd_info_object = get_submission_objects(submission_id)
-        
+@traced("db.get_submissions_between", **DB_SPAN_ATTRIBUTES)
+def get_submissions_between(start_date, end_date, namespace=None):
+    """Get (id, company, position, submission_date) of the submissions made between two dates (inclusive)"""
+    initialize_db()
+
+    with sqlite3.connect(DB_PATH) as conn:
+        return conn.execute("""
+            SELECT id, company, position, submission_date FROM submissions
+            WHERE namespace = ? AND substr(submission_date, 1, 10) BETWEEN ? AND ?
+            ORDER BY id
+        """, (normalize_namespace(namespace), start_date.isoformat(), end_date.isoformat())).fetchall()
+
+
+def get_submission_revision(submission_id, namespace=None):
+    """Get the revision of a submission's contents, or None if it does not exist"""
+    initialize_db()
+
+    with sqlite3.connect(DB_PATH) as conn:
+        row = conn.execute(
+            "SELECT revision FROM submissions WHERE id = ? AND namespace = ?",
+            (submission_id, normalize_namespace(namespace))
+        ).fetchone()
+    return row[0] if row else None
+
+
+@traced("db.get_submission_html", **DB_SPAN_ATTRIBUTES)
+def get_submission_html(submission_id, template_id=None, namespace=None, cover_letter_template_id=None):
+    """
+    Get the final (cv html, cover letter html) of a submission
+
+    Without template ids the stored templates are used. The HTML stored at
+    save time is returned as it is; only documents asked for in another
+    template, or saved before HTML was stored, are rebuilt from their objects.
+    """
+    initialize_db()
+
+    with sqlite3.connect(DB_PATH) as conn:
+        row = conn.execute(
+            "SELECT cv_template_id, cover_letter_template_id, cv_html, cover_letter_html "
+            "FROM submissions WHERE id = ? AND namespace = ?",
+            (submission_id, normalize_namespace(namespace))
+        ).fetchone()
+    if not row:
+        raise ValueError(f"Could not retrieve submission {submission_id}")
+
+    stored_cv_template_id, stored_cover_letter_template_id = row[0] or "1", row[1] or "1"
+    template_id = template_id or stored_cv_template_id
+    cover_letter_template_id = cover_letter_template_id or stored_cover_letter_template_id
+    cv_html = _decompress_html(row[2]) if row[2] and template_id == stored_cv_template_id else None
+    cl_html = (
+        _decompress_html(row[3])
+        if row[3] and cover_letter_template_id == stored_cover_letter_template_id else None
+    )
+    set_span_attributes(**{'submission.html_reused': cv_html is not None and cl_html is not None})
+
+    if cv_html is None or cl_html is None:
+        cv_object, cover_letter_object, jd_info_object = get_submission_objects(submission_id, namespace)
         if not all([cv_object, cover_letter_object, jd_info_object]):
-            raise ValueError("Could not retrieve submission objects")
+            raise ValueError(f"Could not retrieve submission {submission_id}")
+        if cv_html is None:
+            cv_html = CVBuilder().build_html_from_cv(cv_object, template_id)
+        if cl_html is None:
+            cl_html = CoverLetterBuilder().build_html_from_cover_letter(cover_letter_object, cover_letter_template_id)
+
+    return cv_html, cl_html
+
+
+@traced("render_submission_pdfs")
+def render_submission_pdfs(submission_id, template_id=None, namespace=None, cover_letter_template_id=None):
+    """Render the CV and cover letter PDFs of a submission in memory and return their bytes"""
+    import weasyprint
+
+    cv_html, cl_html = get_submission_html(submission_id, template_id, namespace, cover_letter_template_id)
+
+    with span("weasyprint.write_pdf", document="cv"):
+        cv_pdf = weasyprint.HTML(string=cv_html).write_pdf()
+
+    with span("weasyprint.write_pdf", document="cover_letter"):
+        cl_pdf = weasyprint.HTML(string=cl_html).write_pdf()
+
+    return cv_pdf, cl_pdf
+
+
+def get_submission_trace_id(submission_id, namespace=None):
+    """Get the id of the trace recorded when a submission was created"""
+    initialize_db()
+
+    with sqlite3.connect(DB_PATH) as conn:
+        row = conn.execute(
+            "SELECT trace_id FROM submissions WHERE id = ? AND namespace = ?",
+            (submission_id, normalize_namespace(namespace))
+        ).fetchone()
+    return row[0] if row else None
+
+
+@traced("generate_pdf_from_submission")
+def generate_pdf_from_submission(submission_id, template_id=None, namespace=None):
+    """Generate PDFs from a submission's stored HTML and return file paths"""
+    # WeasyPrint is slow to import, load it only when a PDF is requested
+    import weasyprint
+
+    try:
+        cv_html, cl_html = get_submission_html(submission_id, template_id, namespace)
         
         # Create temporary directory for PDF generation
         temp_dir = tempfile.mkdtemp(prefix="cv_builder_")
         
         # Generate CV PDF
-        cv_builder = CVBuilder()
-        cv_html = cv_builder.build_html_from_cv(cv_object, template_id, temp_dir)
         cv_pdf_path = f"{temp_dir}/cv_{submission_id}.pdf"
-        weasyprint.HTML(string=cv_html).write_pdf(cv_pdf_path)
+        with span("weasyprint.write_pdf", document="cv"):
+            weasyprint.HTML(string=cv_html).write_pdf(cv_pdf_path)
         
         # Generate Cover Letter PDF
-        cover_letter_builder = CoverLetterBuilder()
-        cl_html = cover_letter_builder.build_html_from_cover_letter(cover_letter_object, template_id, temp_dir)
         cl_pdf_path = f"{temp_dir}/cover_letter_{submission_id}.pdf"
-        weasyprint.HTML(string=cl_html).write_pdf(cl_pdf_path)
+        with span("weasyprint.write_pdf", document="cover_letter"):
+            weasyprint.HTML(string=cl_html).write_pdf(cl_pdf_path)
         
         return cv_pdf_path, cl_pdf_path, temp_dir
         
@@ -152,17 +399,10 @@ def cleanup_temp_files(temp_dir):
         print(f"Error cleaning up temp files: {e}")
 
 
-def has_submissions():
+def has_submissions(namespace=None):
     """Check if there are any submissions in the database"""
     try:
-        # Ensure database is initialized
-        initialize_db()
-        
-        with sqlite3.connect(DB_PATH) as conn:
-            result = conn.execute(
-                "SELECT COUNT(*) FROM submissions"
-            ).fetchone()
-            return result[0] > 0 if result else False
+        return count_submissions(namespace) > 0
     except Exception as e:
         print(f"Error checking submissions: {e}")
         return False
@@ -0,0 +1,117 @@
+import hashlib
+import importlib.util
+import io
+import os
+from support.persistence import atomic_write_bytes
+from support.settings import dest_dir, thumbnail_cache_mb
+from support.tracing import set_span_attributes, traced
+
+# Thumbnails are addressed by the hash of the rendered HTML, so identical
+# documents of any namespace share one file
+THUMBNAILS_DIR = f"{dest_dir}/thumbnails"
+# Width of the first-page images in pixels
+THUMBNAIL_WIDTH = 240
+
+
+def thumbnail_key(content, width=THUMBNAIL_WIDTH):
+    """
+    Content address of the thumbnail of a document
+
+    content is the document's HTML, or any string that changes whenever it
+    does (e.g. template digest plus data digest) when building the HTML just
+    to look up the thumbnail would be wasteful.
+    """
+    return hashlib.sha256(f"{width}:{content}".encode("utf-8")).hexdigest()
+
+
+def thumbnails_available():
+    """Check if the optional pypdfium2 package needed to render thumbnails is installed"""
+    return importlib.util.find_spec("pypdfium2") is not None
+
+
+def _thumbnail_path(key):
+    return f"{THUMBNAILS_DIR}/{key}.png"
+
+
+def get_thumbnail_path(key):
+    """Get the path of a stored thumbnail, or None; marks it as recently used"""
+    path = _thumbnail_path(key)
+    try:
+        # The modification time orders the LRU eviction
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return path
+
+
+@traced("render_thumbnail")
+def render_thumbnail(html, width=THUMBNAIL_WIDTH):
+    """
+    Rasterize the first page of a document into PNG bytes
+
+    WeasyPrint lays out the document but only writes its first page, which
+    pypdfium2 (an optional dependency) renders at thumbnail resolution.
+    """
+    import weasyprint
+    try:
+        import pypdfium2
+    except ImportError as e:
+        raise RuntimeError("Thumbnails need the optional pypdfium2 package: pip install pypdfium2") from e
+
+    document = weasyprint.HTML(string=html).render()
+    first_page_pdf = document.copy(document.pages[:1]).write_pdf()
+
+    pdf = pypdfium2.PdfDocument(first_page_pdf)
+    try:
+        page = pdf[0]
+        image = page.render(scale=width / page.get_width()).to_pil()
+    finally:
+        pdf.close()
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+def prune_thumbnails(max_bytes=None):
+    """Evict the least recently used thumbnails beyond the cache size"""
+    max_bytes = thumbnail_cache_mb * 1024 * 1024 if max_bytes is None else max_bytes
+    entries = sorted(
+        (
+            (entry.stat(), entry.path) for entry in os.scandir(THUMBNAILS_DIR)
+            if entry.name.endswith(".png") and not entry.name.startswith(".")
+        ),
+        key=lambda item: item[0].st_mtime,
+        reverse=True
+    )
+
+    total_bytes = 0
+    evicted = 0
+    for stat, path in entries:
+        total_bytes += stat.st_size
+        if total_bytes > max_bytes:
+            directory, filename = os.path.split(path)
+            # Also drop the sidecar lock file left by atomic_write_bytes
+            for evicted_path in (path, os.path.join(directory, f".{filename}.lock")):
+                try:
+                    os.remove(evicted_path)
+                except FileNotFoundError:
+                    pass
+            evicted += 1
+    return evicted
+
+
+@traced("render_thumbnails")
+def render_thumbnails(documents):
+    """Render and store the thumbnails of (key, html) documents that are not cached yet"""
+    os.makedirs(THUMBNAILS_DIR, exist_ok=True)
+
+    rendered = 0
+    for key, html in documents:
+        if get_thumbnail_path(key) is None:
+            atomic_write_bytes(_thumbnail_path(key), render_thumbnail(html))
+            rendered += 1
+
+    evicted = prune_thumbnails()
+    set_span_attributes(**{'thumbnails.rendered': rendered, 'thumbnails.evicted': evicted})
+    return rendered
@@ -0,0 +1,251 @@
+import contextvars
+import functools
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from support.namespace_manager import get_namespace_dir
+from support.settings import trace_retention, tracing_enabled
+
+SERVICE_NAME = "tailor-your-cv"
+# Attributes describing the process rather than the span, the OTLP resource
+RESOURCE_ATTRIBUTES = ('service.name', 'process.pid')
+OTLP_SPAN_KINDS = {"SPAN_KIND_INTERNAL": 1}
+OTLP_STATUS_CODES = {"STATUS_CODE_UNSET": 0, "STATUS_CODE_OK": 1, "STATUS_CODE_ERROR": 2}
+
+# Spans are stored per namespace as JSON lines with the OpenTelemetry field
+# names but flat attribute mappings, which the debug panel reads directly;
+# to_otlp_json converts a trace into OTLP/JSON for OpenTelemetry tools.
+_current_trace_id = contextvars.ContextVar("current_trace_id", default=None)
+_current_namespace = contextvars.ContextVar("current_namespace", default=None)
+_current_span = contextvars.ContextVar("current_span", default=None)
+_export_lock = threading.Lock()
+
+
+def new_trace_id():
+    """Generate a W3C/OpenTelemetry trace id (32 hex characters)"""
+    return secrets.token_hex(16)
+
+
+def current_trace_id():
+    """Get the trace id of the running code, or None outside a trace"""
+    current = _current_span.get()
+    return current['traceId'] if current else _current_trace_id.get()
+
+
+@contextmanager
+def use_trace(trace_id, namespace=None):
+    """Record the spans opened inside the block under trace_id, in the traces of a namespace"""
+    token = _current_trace_id.set(trace_id if tracing_enabled else None)
+    namespace_token = _current_namespace.set(namespace)
+    try:
+        yield trace_id
+    finally:
+        _current_namespace.reset(namespace_token)
+        _current_trace_id.reset(token)
+
+
+@contextmanager
+def span(name, **attributes):
+    """
+    Time a block of code as a span of the current trace
+
+    Outside of a trace (see use_trace) this is a no-op, so hot paths such as
+    the live preview can be instrumented without producing traces on every
+    rerun.
+    """
+    parent = _current_span.get()
+    trace_id = parent['traceId'] if parent else _current_trace_id.get()
+    if trace_id is None:
+        yield None
+        return
+
+    namespace = _current_namespace.get()
+    record = {
+        'traceId': trace_id,
+        'spanId': secrets.token_hex(8),
+        'parentSpanId': parent['spanId'] if parent else None,
+        'name': name,
+        'kind': "SPAN_KIND_INTERNAL",
+        'startTimeUnixNano': time.time_ns(),
+        'endTimeUnixNano': None,
+        'attributes': {'service.name': SERVICE_NAME, 'process.pid': os.getpid(), **attributes},
+        'events': [],
+        'status': {'code': "STATUS_CODE_UNSET"},
+    }
+    token = _current_span.set(record)
+    try:
+        yield record
+    except BaseException as e:
+        record['status'] = {'code': "STATUS_CODE_ERROR", 'message': str(e)}
+        record['events'].append({
+            'name': "exception",
+            'timeUnixNano': time.time_ns(),
+            'attributes': {'exception.type': type(e).__name__, 'exception.message': str(e)},
+        })
+        raise
+    else:
+        record['status'] = {'code': "STATUS_CODE_OK"}
+    finally:
+        record['endTimeUnixNano'] = time.time_ns()
+        _current_span.reset(token)
+        export_span(record, namespace)
+
+
+def traced(name=None, **attributes):
+    """Decorator running a function inside a span (named after the function by default)"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, **attributes):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def set_span_attributes(**attributes):
+    """Add attributes to the current span (no-op outside a trace)"""
+    current = _current_span.get()
+    if current is not None:
+        current['attributes'].update(attributes)
+
+
+def get_traces_dir(namespace=None):
+    """Get (and create) the directory holding the traces of a namespace"""
+    traces_dir = f"{get_namespace_dir(namespace)}/traces"
+    os.makedirs(traces_dir, exist_ok=True)
+    return traces_dir
+
+
+def _trace_path(trace_id, namespace=None):
+    return f"{get_traces_dir(namespace)}/{trace_id}.jsonl"
+
+
+def export_span(record, namespace=None):
+    """
+    Append a finished span to the JSON-lines file of its trace
+
+    Each span is written with a single append, so the app and the worker
+    processes can export to the same trace concurrently.
+    """
+    try:
+        path = _trace_path(record['traceId'], namespace)
+        is_new_trace = not os.path.exists(path)
+        with _export_lock, open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+        if is_new_trace:
+            prune_traces(namespace)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error exporting span {record['name']}: {e}")
+
+
+def prune_traces(namespace=None, keep=None):
+    """Delete the oldest traces of a namespace beyond the retention limit"""
+    keep = trace_retention if keep is None else keep
+    traces = sorted(
+        (entry for entry in os.scandir(get_traces_dir(namespace)) if entry.name.endswith(".jsonl")),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True
+    )
+    for entry in traces[keep:]:
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            pass
+
+
+def load_trace(trace_id, namespace=None):
+    """Load the spans of a trace of a namespace ordered by start time"""
+    if not trace_id:
+        return []
+    path = _trace_path(trace_id, namespace)
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        spans = [json.loads(line) for line in f if line.strip()]
+    spans.sort(key=lambda record: record['startTimeUnixNano'])
+    return spans
+
+
+def span_tree(spans):
+    """Yield (depth, span) in depth-first order for display"""
+    children = {}
+    span_ids = {record['spanId'] for record in spans}
+    for record in spans:
+        parent_id = record['parentSpanId'] if record['parentSpanId'] in span_ids else None
+        children.setdefault(parent_id, []).append(record)
+
+    def walk(parent_id, depth):
+        for record in children.get(parent_id, []):
+            yield depth, record
+            yield from walk(record['spanId'], depth + 1)
+
+    yield from walk(None, 0)
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def _otlp_attributes(attributes):
+    return [
+        {'key': key, 'value': _otlp_value(value)}
+        for key, value in attributes.items() if value is not None
+    ]
+
+
+def to_otlp_json(spans):
+    """
+    Convert the spans of a trace into an OTLP/JSON ExportTraceServiceRequest
+
+    Spans are grouped into one resource per process, with typed attribute
+    lists, integer enums and 64-bit nanosecond times encoded as strings, as
+    in the OTLP/JSON protobuf mapping.
+    """
+    processes = {}
+    for record in spans:
+        resource = tuple(record['attributes'].get(key) for key in RESOURCE_ATTRIBUTES)
+        processes.setdefault(resource, []).append({
+            'traceId': record['traceId'],
+            'spanId': record['spanId'],
+            'parentSpanId': record['parentSpanId'] or "",
+            'name': record['name'],
+            'kind': OTLP_SPAN_KINDS.get(record['kind'], 0),
+            'startTimeUnixNano': str(record['startTimeUnixNano']),
+            'endTimeUnixNano': str(record['endTimeUnixNano']),
+            'attributes': _otlp_attributes({
+                key: value for key, value in record['attributes'].items() if key not in RESOURCE_ATTRIBUTES
+            }),
+            'events': [
+                {
+                    'name': event['name'],
+                    'timeUnixNano': str(event['timeUnixNano']),
+                    'attributes': _otlp_attributes(event['attributes']),
+                }
+                for event in record['events']
+            ],
+            'status': {
+                'code': OTLP_STATUS_CODES.get(record['status']['code'], 0),
+                **({'message': record['status']['message']} if record['status'].get('message') else {}),
+            },
+        })
+
+    return {
+        'resourceSpans': [
+            {
+                'resource': {'attributes': _otlp_attributes(dict(zip(RESOURCE_ATTRIBUTES, resource)))},
+                'scopeSpans': [{'scope': {'name': __name__}, 'spans': otlp_spans}],
+            }
+            for resource, otlp_spans in processes.items()
+        ]
+    }
@@ -0,0 +1,103 @@
+import re
+import numpy as np
+from support.keyword_matcher import STOPWORDS
+from support.tracing import set_span_attributes, traced
+
+# BM25 parameters: term frequency saturation, length normalization and
+# query term saturation
+BM25_K1 = 1.5
+BM25_B = 0.75
+BM25_K3 = 8.0
+# Lines made of dashes separate the postings pasted in one text area
+POSTING_SEPARATOR = re.compile(r"^\s*-{3,}\s*$", re.MULTILINE)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[./\-][a-z0-9+#]+)*")
+
+
+def tokenize(text):
+    """Lowercase words of a text without stopwords"""
+    return [token for token in TOKEN_PATTERN.findall((text or "").lower()) if token not in STOPWORDS]
+
+
+def split_postings(text):
+    """Split pasted text into job descriptions at lines of dashes"""
+    return [posting.strip() for posting in POSTING_SEPARATOR.split(text or "") if posting.strip()]
+
+
+def posting_title(job_description, max_length=80):
+    """First non-empty line of a job description, shortened"""
+    title = next((line.strip() for line in job_description.splitlines() if line.strip()), "")
+    return title if len(title) <= max_length else title[:max_length - 1] + "…"
+
+
+def portfolio_query(structured_cv):
+    """
+    Words of a portfolio used as the triage query
+
+    Skills are listed twice, so they weigh more than words that only occur
+    in experience and project descriptions.
+    """
+    skills = " ".join((structured_cv.hard_skills or []) + (structured_cv.soft_skills or []))
+    parts = [skills, skills, structured_cv.summary or ""]
+    for entry in (structured_cv.experiences or []) + (structured_cv.projects or []):
+        parts += [entry.title or "", entry.description or ""]
+    for education in structured_cv.education or []:
+        parts.append(education.title or "")
+    return tokenize(" ".join(parts))
+
+
+def bm25_scores(documents, query):
+    """
+    Score tokenized documents against a tokenized query with Okapi BM25
+
+    The whole batch is scored at once: the documents become a term-frequency
+    matrix and the scores a single matrix-vector product.
+    """
+    vocabulary = {}
+    rows, columns = [], []
+    for row, tokens in enumerate(documents):
+        for token in tokens:
+            rows.append(row)
+            columns.append(vocabulary.setdefault(token, len(vocabulary)))
+
+    term_frequencies = np.zeros((len(documents), max(len(vocabulary), 1)))
+    np.add.at(term_frequencies, (np.array(rows, dtype=int), np.array(columns, dtype=int)), 1.0)
+
+    lengths = term_frequencies.sum(axis=1)
+    average_length = lengths.mean() if len(documents) and lengths.mean() > 0 else 1.0
+    document_frequencies = (term_frequencies > 0).sum(axis=0)
+    idf = np.log1p((len(documents) - document_frequencies + 0.5) / (document_frequencies + 0.5))
+
+    normalization = BM25_K1 * (1 - BM25_B + BM25_B * lengths / average_length)
+    weights = term_frequencies * (BM25_K1 + 1) / (term_frequencies + normalization[:, None]) * idf
+
+    query_frequencies = np.zeros(term_frequencies.shape[1])
+    for token in query:
+        if token in vocabulary:
+            query_frequencies[vocabulary[token]] += 1
+    query_weights = query_frequencies * (BM25_K3 + 1) / (query_frequencies + BM25_K3)
+
+    return weights @ query_weights
+
+
+@traced("rank_job_descriptions")
+def rank_job_descriptions(job_descriptions, structured_cv):
+    """
+    Rank job descriptions by how well they fit a portfolio, best first
+
+    Returns one dict per posting with its index in the input, title, BM25
+    score and the score relative to the best posting.
+    """
+    scores = bm25_scores([tokenize(text) for text in job_descriptions], portfolio_query(structured_cv))
+    best = scores.max() if len(scores) and scores.max() > 0 else 1.0
+    set_span_attributes(**{'triage.postings': len(job_descriptions)})
+
+    return [
+        {
+            'index': int(index),
+            'title': posting_title(job_descriptions[index]),
+            'score': float(scores[index]),
+            'relative_fit': float(scores[index] / best),
+        }
+        for index in np.argsort(-scores, kind="stable")
+    ]
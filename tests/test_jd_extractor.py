@@ -0,0 +1,54 @@
+import json
+import os
+import unittest
+
+from support.jd_extractor import extract_jd_information
+
+SAMPLES_PATH = os.path.join(os.path.dirname(__file__), "..", "benchmarks", "data", "jd_samples.jsonl")
+
+
+class ExtractJdInformationTest(unittest.TestCase):
+    def test_heading_with_company(self):
+        job_title, company_name, confidence = extract_jd_information(
+            "Senior Data Engineer at Northwind Analytics\n\n"
+            "Northwind Analytics is looking for a Senior Data Engineer to build our streaming platform."
+        )
+        self.assertEqual(job_title, "Senior Data Engineer")
+        self.assertEqual(company_name, "Northwind Analytics")
+        self.assertGreaterEqual(confidence, 0.8)
+
+    def test_labeled_lines(self):
+        job_title, company_name, _ = extract_jd_information(
+            "Job Title: Backend Developer\nCompany: Fabrikam Inc.\nLocation: Berlin (Hybrid)"
+        )
+        self.assertEqual(job_title, "Backend Developer")
+        self.assertEqual(company_name, "Fabrikam Inc")
+
+    def test_sentence_ending_after_title(self):
+        # The title must stop at the end of the sentence
+        job_title, _, _ = extract_jd_information("Contoso is looking for a Platform Engineer. You will own our CI.")
+        self.assertEqual(job_title, "Platform Engineer")
+
+    def test_missing_company_has_no_confidence(self):
+        job_title, company_name, confidence = extract_jd_information("We need someone who knows Python.")
+        self.assertIsNone(company_name)
+        self.assertEqual(confidence, 0.0)
+
+    def test_empty_text(self):
+        self.assertEqual(extract_jd_information(""), (None, None, 0.0))
+        self.assertEqual(extract_jd_information(None), (None, None, 0.0))
+
+    def test_confident_answers_are_correct_on_benchmark_samples(self):
+        with open(SAMPLES_PATH, encoding="utf-8") as f:
+            samples = [json.loads(line) for line in f if line.strip()]
+
+        for sample in samples:
+            job_title, company_name, confidence = extract_jd_information(sample['job_description'])
+            if confidence >= 0.8:
+                with self.subTest(job_description=sample['job_description'][:40]):
+                    self.assertEqual(job_title, sample['job_title'])
+                    self.assertEqual(company_name, sample['company_name'])
+
+
+if __name__ == "__main__":
+    unittest.main()
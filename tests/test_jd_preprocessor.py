@@ -0,0 +1,95 @@
+import unittest
+from unittest import mock
+
+from support import jd_preprocessor
+from support.jd_preprocessor import normalize_text, preprocess_job_description, split_blocks
+
+JOB_DESCRIPTION = """Senior Backend Engineer at Acme
+
+About Acme
+Acme builds logistics software for retailers. We were founded in 2010 and our offices span three continents.
+
+Responsibilities
+- Design and maintain Python services on AWS
+- Build data pipelines with Kafka
+
+Requirements
+- 5+ years of experience with Python and PostgreSQL
+
+What we offer
+Flexible hours, a learning budget and a yearly team retreat.
+
+Acme is an equal opportunity employer and does not discriminate on the basis of race, religion or gender.
+
+We use cookies to improve your experience. Accept all cookies.
+"""
+
+
+class NormalizeTextTest(unittest.TestCase):
+    def test_bullets_whitespace_and_zero_width_characters(self):
+        self.assertEqual(
+            normalize_text("\u2022\tPython\u200b  skills\r\n\r\n\r\n\r\n\u00b7 Go  "),
+            "- Python skills\n\n- Go"
+        )
+
+    def test_empty_text(self):
+        self.assertEqual(normalize_text(None), "")
+
+
+class SplitBlocksTest(unittest.TestCase):
+    def test_headings_open_sections(self):
+        blocks = split_blocks("Benefits:\n- Learning Budget\n- Gym\n\nYou will build APIs.")
+        self.assertEqual(blocks, [("Benefits", "Benefits:\n- Learning Budget\n- Gym"), ("Benefits", "You will build APIs.")])
+
+    def test_list_items_are_not_headings(self):
+        blocks = split_blocks("## Perks\nFree lunch\nLearning Budget")
+        self.assertEqual([heading for heading, _ in blocks], ["Perks"])
+
+
+class PreprocessJobDescriptionTest(unittest.TestCase):
+    def setUp(self):
+        self.result = preprocess_job_description(JOB_DESCRIPTION)
+        self.reasons = {block['reason'] for block in self.result['removed']}
+
+    def test_job_content_is_kept(self):
+        for text in ("Senior Backend Engineer at Acme", "Design and maintain Python services on AWS",
+                     "5+ years of experience with Python and PostgreSQL"):
+            self.assertIn(text, self.result['text'])
+
+    def test_boilerplate_is_removed(self):
+        self.assertIn("equal opportunity statement", self.reasons)
+        self.assertIn("cookie banner", self.reasons)
+        self.assertIn("benefits", self.reasons)
+        self.assertNotIn("cookies", self.result['text'])
+        self.assertNotIn("retreat", self.result['text'])
+
+    def test_about_section_keeps_its_first_sentence(self):
+        self.assertIn("About Acme\nAcme builds logistics software for retailers.", self.result['text'])
+        self.assertNotIn("three continents", self.result['text'])
+
+    def test_duplicate_paragraphs_are_removed(self):
+        result = preprocess_job_description("You will build APIs in Go.\n\nYou will build APIs in Go.")
+        self.assertEqual(result['text'], "You will build APIs in Go.")
+        self.assertEqual([block['reason'] for block in result['removed']], ["duplicate"])
+
+    def test_token_counts_shrink(self):
+        self.assertLess(self.result['tokens_after'], self.result['tokens_before'])
+
+    def test_token_counts_use_one_encoder_while_it_loads(self):
+        # The encoder finishing its load between the two counts must not mix estimates and real counts
+        encoder = mock.Mock()
+        encoder.encode.side_effect = lambda text, **kwargs: text.split()
+        with mock.patch.object(jd_preprocessor, "prefetch_encoder"), \
+                mock.patch.object(jd_preprocessor, "_get_encoder", return_value=encoder), \
+                mock.patch.object(jd_preprocessor, "encoder_ready", side_effect=[False, True]):
+            result = preprocess_job_description(JOB_DESCRIPTION)
+        self.assertEqual(result['tokens_before'], len(JOB_DESCRIPTION) // 4)
+        self.assertEqual(result['tokens_after'], len(result['text']) // 4)
+
+    def test_relevant_paragraph_with_boilerplate_wording_is_kept(self):
+        text = "Send your CV if you have 3+ years of experience with Python, Django and AWS."
+        self.assertIn(text, preprocess_job_description(text)['text'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from support import job_queue, tracing
+from support.job_queue import (
+    CANCELLED, DONE, FAILED, QUEUED, RUNNING, cancel_queued_jobs, claim_next_job, delete_job, fail_orphaned_jobs,
+    finish_job, get_job, purge_finished_jobs, run_job, submit_job
+)
+
+
+class JobQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        patcher = mock.patch.object(job_queue, "JOBS_DB_PATH", os.path.join(self.tmp_dir.name, "jobs.db"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp_dir.cleanup)
+        # Jobs would otherwise export their spans to the traces of the real output directory
+        patcher = mock.patch.object(tracing, "tracing_enabled", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def stored_payload(self, job_id):
+        with sqlite3.connect(job_queue.JOBS_DB_PATH) as conn:
+            return conn.execute("SELECT payload FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+
+    def test_dedupe_key_returns_the_existing_job(self):
+        job_id = submit_job("render", {"n": 1}, dedupe_key="session:render:0")
+        self.assertEqual(submit_job("render", {"n": 2}, dedupe_key="session:render:0"), job_id)
+        self.assertNotEqual(submit_job("render", {"n": 3}, dedupe_key="session:render:1"), job_id)
+        self.assertNotEqual(submit_job("render", {"n": 4}), submit_job("render", {"n": 4}))
+
+    def test_claims_oldest_queued_job_once(self):
+        first = submit_job("render", {"n": 1})
+        second = submit_job("render", {"n": 2})
+
+        self.assertEqual(claim_next_job(worker_pid=1), (first, "render", {"n": 1}))
+        self.assertEqual(claim_next_job(worker_pid=2), (second, "render", {"n": 2}))
+        self.assertIsNone(claim_next_job(worker_pid=3))
+        self.assertEqual(get_job(first)['status'], RUNNING)
+
+    def test_payload_is_dropped_when_claimed(self):
+        job_id = submit_job("generate", {"api_key": "secret"})
+        self.assertIsNotNone(self.stored_payload(job_id))
+        claim_next_job(worker_pid=1)
+        self.assertIsNone(self.stored_payload(job_id))
+
+    def test_run_job_records_result_or_error(self):
+        handlers = {"double": lambda payload: payload["n"] * 2, "fail": lambda payload: 1 / 0}
+        with mock.patch.dict(job_queue.HANDLERS, handlers, clear=True):
+            done_id = submit_job("double", {"n": 21})
+            failed_id = submit_job("fail", {})
+            run_job(*claim_next_job(worker_pid=1))
+            run_job(*claim_next_job(worker_pid=1))
+
+        self.assertEqual(get_job(done_id)['status'], DONE)
+        self.assertEqual(get_job(done_id)['result'], 42)
+        self.assertEqual(get_job(failed_id)['status'], FAILED)
+        self.assertTrue(get_job(failed_id)['error'].startswith("ZeroDivisionError"))
+
+    def test_cancel_queued_jobs_by_prefix(self):
+        old = submit_job("prerender", {}, dedupe_key="prerender:1:1")
+        new = submit_job("prerender", {}, dedupe_key="prerender:1:2")
+        other = submit_job("prerender", {}, dedupe_key="prerender:2:1")
+
+        self.assertEqual(cancel_queued_jobs("prerender:1:", keep="prerender:1:2"), 1)
+        self.assertEqual(get_job(old)['status'], CANCELLED)
+        self.assertEqual(get_job(new)['status'], QUEUED)
+        self.assertEqual(get_job(other)['status'], QUEUED)
+
+    def test_orphaned_jobs_fail_when_their_lease_expires(self):
+        job_id = submit_job("render", {})
+        claim_next_job(worker_pid=1)
+        self.assertEqual(fail_orphaned_jobs(), 0)
+
+        with mock.patch.object(job_queue, "HEARTBEAT_TIMEOUT", -1):
+            self.assertEqual(fail_orphaned_jobs(), 1)
+        self.assertEqual(get_job(job_id)['status'], FAILED)
+
+    def test_finished_jobs_are_deleted_and_free_their_dedupe_key(self):
+        job_id = submit_job("render", {}, dedupe_key="render:0")
+        delete_job(job_id)
+        self.assertIsNotNone(get_job(job_id), "queued jobs are not deleted")
+
+        claim_next_job(worker_pid=1)
+        finish_job(job_id, result="ok")
+        delete_job(job_id)
+        self.assertIsNone(get_job(job_id))
+        self.assertNotEqual(submit_job("render", {}, dedupe_key="render:0"), job_id)
+
+    def test_purge_keeps_recent_and_unfinished_jobs(self):
+        finished = submit_job("render", {})
+        queued = submit_job("render", {})
+        claim_next_job(worker_pid=1)
+        finish_job(finished, result=None)
+
+        self.assertEqual(purge_finished_jobs(max_age_hours=1), 0)
+        self.assertEqual(purge_finished_jobs(max_age_hours=0), 1)
+        self.assertIsNone(get_job(finished))
+        self.assertEqual(get_job(queued)['status'], QUEUED)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+
+from support.keyword_matcher import KeywordAutomaton, PortfolioMatcher, extract_terms, get_portfolio_matcher
+from support.supportClasses import Curriculum, Experience
+
+
+class ExtractTermsTest(unittest.TestCase):
+    def test_skill_like_tokens(self):
+        terms = extract_terms("We use Node.js, C++ and AWS with PyTorch on our k8s cluster.")
+        self.assertEqual(set(terms), {"node.js", "c++", "aws", "pytorch", "k8s"})
+        self.assertEqual(terms["pytorch"], "PyTorch")
+
+    def test_sentence_starts_and_stopwords_are_skipped(self):
+        self.assertEqual(extract_terms("Experience with Docker. Strong Skills required."), {"docker": "Docker"})
+
+
+class KeywordAutomatonTest(unittest.TestCase):
+    def test_whole_words_only(self):
+        automaton = KeywordAutomaton(["go", "machine learning", "learning"])
+        matches = list(automaton.scan("good go and machine learning"))
+        self.assertEqual(
+            sorted(matches),
+            [(5, 7, "go"), (12, 28, "machine learning"), (20, 28, "learning")]
+        )
+
+
+class PortfolioMatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.matcher = PortfolioMatcher({
+            "python": "Python",
+            "machine learning": "Machine Learning",
+            "kubernetes": "Kubernetes",
+        })
+
+    def test_matched_and_missing_terms(self):
+        result = self.matcher.match("You know Python and Kubernetes, ideally Terraform and AWS too.")
+        self.assertEqual(result['matched'], ["Kubernetes", "Python"])
+        self.assertEqual(result['missing'], ["AWS", "Terraform"])
+        self.assertEqual(result['coverage'], 0.5)
+
+    def test_positions_survive_length_changing_lowercase(self):
+        # "İ".lower() is two characters long, which used to shift every match
+        result = self.matcher.match("İİİİ team: you apply Machine Learning daily.")
+        self.assertEqual(result['matched'], ["Machine Learning"])
+        self.assertEqual(result['missing'], [])
+
+    def test_own_title_company_and_places_are_not_missing(self):
+        result = self.matcher.match(
+            "Data Engineer at Northwind Analytics\n\n"
+            "Our office in Berlin works with Python and Snowflake, remote days on Friday."
+        )
+        self.assertEqual(result['missing'], ["Snowflake"])
+
+    def test_empty_posting(self):
+        self.assertEqual(self.matcher.match(""), {'coverage': 0.0, 'matched': [], 'missing': []})
+
+
+class GetPortfolioMatcherTest(unittest.TestCase):
+    def test_terms_of_skills_and_entries_and_cache(self):
+        portfolio = Curriculum(
+            hard_skills=["Python", "SQL"],
+            soft_skills=["Mentoring"],
+            experiences=[Experience(title="Backend Engineer", description="Built services with FastAPI on GCP.")],
+            projects=[],
+        )
+        matcher = get_portfolio_matcher(portfolio)
+        self.assertTrue({"python", "sql", "mentoring", "fastapi", "gcp"} <= set(matcher.terms))
+        self.assertIs(get_portfolio_matcher(portfolio), matcher)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+from support.namespace_manager import (
+    QuotaExceededError, check_submission_quota, new_workspace_token, normalize_namespace, user_namespace,
+    workspace_namespace, workspace_token
+)
+from support.settings import DEFAULT_NAMESPACE, max_submissions_per_namespace
+
+
+class NormalizeNamespaceTest(unittest.TestCase):
+    def test_default_namespace(self):
+        self.assertEqual(normalize_namespace(None), DEFAULT_NAMESPACE)
+        self.assertEqual(normalize_namespace(""), DEFAULT_NAMESPACE)
+
+    def test_valid_namespaces_are_not_rewritten(self):
+        for namespace in (user_namespace("ada@example.com"), workspace_namespace(new_workspace_token())):
+            self.assertEqual(normalize_namespace(namespace), namespace)
+
+    def test_invalid_namespaces_are_rejected(self):
+        token = "a" * 40
+        for namespace in (
+            "alice", "../etc", f"user-{token}/..", f"workspace-{token}\n", f"WORKSPACE-{token}",
+            f"team-{token}", "user-short",
+        ):
+            with self.subTest(namespace=namespace):
+                with self.assertRaises(ValueError):
+                    normalize_namespace(namespace)
+
+
+class UserNamespaceTest(unittest.TestCase):
+    def test_derived_from_the_login(self):
+        self.assertEqual(user_namespace("ada@example.com"), user_namespace(" ada@example.com "))
+        self.assertTrue(user_namespace("ada@example.com").startswith("user-"))
+
+    def test_e_mails_differing_in_case_do_not_collide(self):
+        self.assertNotEqual(user_namespace("Ada@example.com"), user_namespace("ada@example.com"))
+
+
+class WorkspaceNamespaceTest(unittest.TestCase):
+    def test_tokens_are_unique_and_valid(self):
+        first, second = new_workspace_token(), new_workspace_token()
+        self.assertNotEqual(first, second)
+        self.assertEqual(workspace_namespace(first), f"workspace-{first}")
+
+    def test_malformed_tokens_are_rejected(self):
+        for token in (None, "", "short", "a" * 31, "a" * 65, "a" * 40 + "/", "a" * 40 + "\n"):
+            with self.subTest(token=token):
+                with self.assertRaises(ValueError):
+                    workspace_namespace(token)
+
+    def test_token_is_read_back_from_workspace_namespaces_only(self):
+        token = new_workspace_token()
+        self.assertEqual(workspace_token(workspace_namespace(token)), token)
+        self.assertIsNone(workspace_token(user_namespace("ada@example.com")))
+        self.assertIsNone(workspace_token(""))
+
+    def test_user_and_workspace_namespaces_never_collide(self):
+        token = user_namespace("ada@example.com").removeprefix("user-")
+        self.assertNotEqual(workspace_namespace(token), user_namespace("ada@example.com"))
+
+
+class QuotaTest(unittest.TestCase):
+    def test_submission_quota(self):
+        check_submission_quota(max_submissions_per_namespace - 1)
+        with self.assertRaises(QuotaExceededError):
+            check_submission_quota(max_submissions_per_namespace)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import pickle
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from streamlit.testing.v1 import AppTest
+
+from support import namespace_manager, submission_manager
+from support.namespace_manager import new_workspace_token, workspace_namespace
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pages")
+
+
+class MySubmissionsPageTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        patcher = mock.patch.object(
+            submission_manager, "DB_PATH", os.path.join(self.tmp_dir.name, "cv_submissions.db")
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp_dir.cleanup)
+        patcher = mock.patch.object(namespace_manager, "NAMESPACES_DIR", os.path.join(self.tmp_dir.name, "users"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # A page run on its own has no multipage navigation to link to
+        patcher = mock.patch("streamlit.page_link")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        submission_manager.initialize_db()
+        # Anonymous sessions are opened in this private workspace through its link
+        self.token = new_workspace_token()
+
+    def add_submission(self, company, position, submission_date):
+        with sqlite3.connect(submission_manager.DB_PATH) as conn:
+            conn.execute(
+                "INSERT INTO submissions (company, position, submission_date, cv_data, cover_letter_data, "
+                "jd_information_data, namespace) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (company, position, submission_date, pickle.dumps(None), pickle.dumps(None), pickle.dumps(None),
+                 workspace_namespace(self.token))
+            )
+
+    def run_page(self):
+        app = AppTest.from_file(os.path.join(PAGES_DIR, "my_submissions.py"), default_timeout=30)
+        app.query_params["workspace"] = self.token
+        app.run()
+        self.assertFalse(app.exception, [e.message for e in app.exception])
+        return app
+
+    def test_renders_without_submissions(self):
+        app = self.run_page()
+        self.assertIn("No applications yet", app.info[0].value)
+
+    def test_renders_bulk_export_range_of_submission_dates(self):
+        self.add_submission("Acme", "Data Engineer", "2025-03-02T10:15:00")
+        self.add_submission("Globex", "Backend Developer", "2025-04-20T08:00:00")
+
+        app = self.run_page()
+        export_range = app.date_input(key="export_range")
+        self.assertEqual([d.isoformat() for d in export_range.value], ["2025-03-02", "2025-04-20"])
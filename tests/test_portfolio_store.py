@@ -0,0 +1,104 @@
+import sqlite3
+import unittest
+
+from support.portfolio_store import (
+    diff_snapshots, get_snapshot_id, initialize_portfolio_store, join_final_cv, list_snapshots, load_snapshot,
+    save_snapshot, split_final_cv
+)
+from support.supportClasses import Curriculum, EducationExperience, Experience, FinalCurriculum, Personality
+
+
+def make_portfolio(**overrides):
+    fields = {
+        'personality': Personality(name="Ada", surname="Lovelace", e_mail="ada@example.com"),
+        'experiences': [Experience(title="Analyst", company="Babbage & Co", description="Engine programs")],
+        'projects': [],
+        'hard_skills': ["Mathematics", "Python"],
+        'soft_skills': ["Writing"],
+        'education': [EducationExperience(title="Mathematics", school_name="Home tutoring")],
+        'summary': "Mathematician",
+    }
+    fields.update(overrides)
+    return Curriculum(**fields)
+
+
+def make_final_cv(portfolio, **overrides):
+    fields = {
+        'personality': portfolio.personality,
+        'job_title': "Data Analyst",
+        'summary': "Tailored summary",
+        'experiences': portfolio.experiences,
+        'projects': [],
+        'education': portfolio.education,
+        'hard_skills': portfolio.hard_skills,
+        'soft_skills': portfolio.soft_skills,
+    }
+    fields.update(overrides)
+    return FinalCurriculum(**fields)
+
+
+class SplitJoinTest(unittest.TestCase):
+    def test_unedited_portfolio_fields_are_not_stored(self):
+        portfolio = make_portfolio()
+        cv_data = split_final_cv(make_final_cv(portfolio), portfolio)
+        self.assertEqual(cv_data['overrides'], {})
+        self.assertEqual(cv_data['tailored']['job_title'], "Data Analyst")
+
+    def test_round_trip_keeps_edits(self):
+        portfolio = make_portfolio()
+        final_cv = make_final_cv(portfolio, hard_skills=["Python", "SQL"])
+        cv_data = split_final_cv(final_cv, portfolio)
+        self.assertEqual(set(cv_data['overrides']), {"hard_skills"})
+
+        joined = join_final_cv(cv_data, portfolio)
+        for field in vars(final_cv):
+            self.assertEqual(getattr(joined, field), getattr(final_cv, field), field)
+
+
+class SnapshotStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        initialize_portfolio_store(self.conn)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_snapshots_are_content_addressed_per_namespace(self):
+        portfolio = make_portfolio()
+        snapshot_id = save_snapshot(self.conn, portfolio, "")
+        self.assertEqual(snapshot_id, get_snapshot_id(portfolio))
+        self.assertEqual(save_snapshot(self.conn, make_portfolio(), ""), snapshot_id)
+        self.assertEqual(len(list_snapshots(self.conn, "")), 1)
+
+        self.assertEqual(load_snapshot(self.conn, snapshot_id, ""), portfolio)
+        self.assertIsNone(load_snapshot(self.conn, snapshot_id, "workspace-" + "a" * 40))
+
+    def test_changed_portfolio_gets_a_new_snapshot(self):
+        first = save_snapshot(self.conn, make_portfolio(), "")
+        second = save_snapshot(self.conn, make_portfolio(summary="Poet"), "")
+        self.assertNotEqual(first, second)
+        self.assertEqual({row[0] for row in list_snapshots(self.conn, "")}, {first, second})
+
+
+class DiffSnapshotsTest(unittest.TestCase):
+    def test_identical_snapshots(self):
+        self.assertEqual(diff_snapshots(make_portfolio(), make_portfolio()), {})
+
+    def test_changes_per_field(self):
+        old = make_portfolio()
+        new = make_portfolio(
+            personality=Personality(name="Ada", surname="King", e_mail="ada@example.com"),
+            hard_skills=["Python", "Statistics"],
+            projects=[Experience(title="Difference Engine notes")],
+            summary="Mathematician and writer",
+        )
+        self.assertEqual(diff_snapshots(old, new), {
+            'personality': {'removed': ["surname: Lovelace"], 'added': ["surname: King"]},
+            'projects': {'removed': [], 'added': ["Difference Engine notes"]},
+            'hard_skills': {'removed': ["Mathematics"], 'added': ["Statistics"]},
+            'summary': {'removed': ["Mathematician"], 'added': ["Mathematician and writer"]},
+        })
+
+
+if __name__ == "__main__":
+    unittest.main()
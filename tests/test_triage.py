@@ -0,0 +1,82 @@
+import math
+import unittest
+
+from support.supportClasses import Curriculum, Experience
+from support.triage import (
+    BM25_B, BM25_K1, BM25_K3, bm25_scores, posting_title, rank_job_descriptions, split_postings, tokenize
+)
+
+
+def reference_bm25(documents, query):
+    """Okapi BM25 computed term by term, to check the vectorized version"""
+    average_length = sum(len(document) for document in documents) / len(documents)
+    scores = []
+    for document in documents:
+        score = 0.0
+        for term in set(query):
+            frequency = document.count(term)
+            if not frequency:
+                continue
+            document_frequency = sum(term in other for other in documents)
+            idf = math.log1p((len(documents) - document_frequency + 0.5) / (document_frequency + 0.5))
+            normalization = BM25_K1 * (1 - BM25_B + BM25_B * len(document) / average_length)
+            query_frequency = query.count(term)
+            score += (
+                idf * frequency * (BM25_K1 + 1) / (frequency + normalization)
+                * query_frequency * (BM25_K3 + 1) / (query_frequency + BM25_K3)
+            )
+        scores.append(score)
+    return scores
+
+
+class SplitPostingsTest(unittest.TestCase):
+    def test_lines_of_dashes_separate_postings(self):
+        text = "First posting\nPython\n---\n\n  -----  \nSecond posting\n---\n"
+        self.assertEqual(split_postings(text), ["First posting\nPython", "Second posting"])
+
+    def test_empty_text(self):
+        self.assertEqual(split_postings(None), [])
+
+    def test_posting_title_is_shortened(self):
+        self.assertEqual(posting_title("\n  Data Engineer  \nMore"), "Data Engineer")
+        self.assertEqual(posting_title("x" * 100, max_length=10), "x" * 9 + "…")
+
+
+class Bm25ScoresTest(unittest.TestCase):
+    def test_matches_reference_implementation(self):
+        documents = [
+            tokenize("Python engineer building Django services and Python tooling"),
+            tokenize("Java developer for Spring services"),
+            tokenize("Data scientist with Python, pandas and SQL"),
+        ]
+        query = tokenize("Python Python SQL Django")
+        for score, expected in zip(bm25_scores(documents, query), reference_bm25(documents, query)):
+            self.assertAlmostEqual(float(score), expected)
+
+    def test_no_overlap_scores_zero(self):
+        scores = bm25_scores([tokenize("Rust embedded firmware")], tokenize("Marketing"))
+        self.assertEqual(list(scores), [0.0])
+
+
+class RankJobDescriptionsTest(unittest.TestCase):
+    def test_best_fit_first(self):
+        portfolio = Curriculum(
+            hard_skills=["Python", "Django", "PostgreSQL"],
+            soft_skills=[],
+            experiences=[Experience(title="Backend Engineer", description="Django APIs on PostgreSQL")],
+        )
+        postings = [
+            "Java Developer\nSpring Boot and Oracle.",
+            "Backend Engineer\nPython, Django and PostgreSQL.",
+            "Frontend Developer\nReact and Python scripting.",
+        ]
+        ranking = rank_job_descriptions(postings, portfolio)
+
+        self.assertEqual([entry['index'] for entry in ranking], [1, 2, 0])
+        self.assertEqual(ranking[0]['title'], "Backend Engineer")
+        self.assertEqual(ranking[0]['relative_fit'], 1.0)
+        self.assertEqual(ranking[-1]['score'], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()